@@ -1,6 +1,9 @@
 import streamlit as st
+import gc
 import json
+import math
 import os
+import time
 from streamlit_folium import st_folium
 import folium
 from src.engine import LogisticsEngine
@@ -19,27 +22,58 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- SESSION STATE INITIALIZATION ---
-if 'engine' not in st.session_state:
-    engine = LogisticsEngine()
-    
-    # Load mock data if it exists
-    data_path = "data/mock_data.json"
-    if os.path.exists(data_path):
-        with open(data_path, "r") as f:
-            data = json.load(f)
-            for loc in data["locations"]:
-                engine.add_location(loc)
-            for d in data["drivers"]:
-                engine.add_driver(d["id"], tuple(d["coords"]))
-    
-    st.session_state.engine = engine
+# --- SHARED ENGINE ---
+@st.cache_resource
+def load_engine(data_path="data/mock_data.json", snapshot_path="data/engine.snapshot"):
+    """
+    One engine for every browser session (it is thread-safe). A snapshot
+    newer than the JSON data loads several times faster than a rebuild;
+    otherwise the engine is rebuilt from JSON and a snapshot is written
+    for the next start.
+    """
+    if os.path.exists(snapshot_path) and (not os.path.exists(data_path) or
+                                          os.path.getmtime(snapshot_path) >= os.path.getmtime(data_path)):
+        # Metrics cost about 5 µs (~5%) per dispatch and feed the System Status panel
+        engine = LogisticsEngine.load_snapshot(snapshot_path, metrics=True)
+    else:
+        engine = LogisticsEngine(metrics=True)
+        
+        # Load mock data if it exists
+        if os.path.exists(data_path):
+            with open(data_path, "r") as f:
+                data = json.load(f)
+                for loc in data["locations"]:
+                    engine.add_location(loc)
+                engine.add_drivers((d["id"], tuple(d["coords"])) for d in data["drivers"])
+            engine.save_snapshot(snapshot_path)
+
+    # Shared blacklist published with BloomFilter.save(); mapped, not loaded, so startup stays instant
+    blacklist_path = "data/blacklist.bloom"
+    if engine.shared_blacklist is None and os.path.exists(blacklist_path):
+        engine.load_shared_blacklist(blacklist_path)
+
+    # Keep the loaded indexes out of future full GC passes, which would otherwise
+    # rescan millions of long-lived nodes and stall map redraws for hundreds of ms.
+    # A snapshot's layers are still packed, so build their nodes first to freeze them too
+    engine.thaw()
+    gc.freeze()
+    return engine
+
+st.session_state.engine = load_engine()
+if 'logs' not in st.session_state:
     st.session_state.logs = []
+    st.session_state.map_bounds = (0.0, 0.0, 100.0, 100.0)
+
+# Pick up a newly published blacklist file on the next rerun
+st.session_state.engine.refresh_shared_blacklist()
 
 # --- SIDEBAR: CONTROLS & INPUT ---
 st.sidebar.header("Control Center")
 user_id = st.sidebar.text_input("Customer ID", "User_77")
 dest_query = st.sidebar.text_input("Destination Search", "North Street")
+suggestions = st.session_state.engine.suggest_locations(dest_query)
+if suggestions and dest_query not in suggestions:
+    st.sidebar.caption("Did you mean: " + ", ".join(suggestions))
 
 st.sidebar.subheader("User Coordinates")
 ux = st.sidebar.slider("Latitude (X)", 0.0, 100.0, 50.0)
@@ -55,17 +89,25 @@ st.write("Real-time optimization using R-Trees, Radix Trees, Fibonacci Heaps, an
 
 col1, col2 = st.columns([2, 1])
 
+# --- MAP PROJECTION ---
+# The engine's 100x100 plane is drawn as a 50x50 degree square, well inside
+# the latitudes a web map can show
+DEGREES_PER_UNIT = 0.5
+METERS_PER_DEGREE = 111_320
+# Above this many drivers in view, the map shows grid clusters instead of markers
+MAX_MARKERS = 500
+
+def to_map(x, y):
+    return [x * DEGREES_PER_UNIT, y * DEGREES_PER_UNIT]
+
+def from_map_bounds(bounds):
+    """Leaflet bounds returned by st_folium -> (min_x, min_y, max_x, max_y) on the plane."""
+    south_west, north_east = bounds["_southWest"], bounds["_northEast"]
+    return (south_west["lat"] / DEGREES_PER_UNIT, south_west["lng"] / DEGREES_PER_UNIT,
+            north_east["lat"] / DEGREES_PER_UNIT, north_east["lng"] / DEGREES_PER_UNIT)
+
 with col1:
     st.subheader("🗺️ Spatial Driver Dispatch")
-    
-    # Initialize Folium Map (Representing our 100x100 grid)
-    m = folium.Map(location=[ux, uy], zoom_start=6, tiles="CartoDB positron")
-    
-    # Mark User Location
-    folium.Marker([ux, uy], popup="You", icon=folium.Icon(color='red', icon='user')).add_to(m)
-    
-    # Draw Search Radius (Visualizing R-Tree query range)
-    folium.Circle([ux, uy], radius=10000, color='blue', fill=True, opacity=0.2).add_to(m)
 
     if st.button("🔍 Find Optimal Driver"):
         # Execution of the engine logic
@@ -78,14 +120,83 @@ with col1:
             else:
                 st.error(result)
 
-    st_folium(m, width=800, height=500)
-
-with col2:
-    st.subheader("System Status")
+    # Initialize Folium Map (Representing our 100x100 grid). It never changes, so panning
+    # and zooming survive reruns; everything that moves lives in the layer below
+    m = folium.Map(location=to_map(50, 50), zoom_start=5, tiles="CartoDB positron")
+
+    # Only the drivers inside the viewport the map reported last time (the whole plane at first)
+    start = time.perf_counter()
+    view = st.session_state.engine.drivers_in_view(st.session_state.map_bounds, max_markers=MAX_MARKERS)
+    layer = folium.FeatureGroup(name="Fleet")
+    for (x, y), d_id, busy in view["drivers"]:
+        folium.CircleMarker(to_map(x, y), radius=5, color="gray" if busy else "green", fill=True,
+                            tooltip=f"{d_id} (busy)" if busy else d_id).add_to(layer)
+    for x, y, count in view["clusters"]:
+        folium.CircleMarker(to_map(x, y), radius=6 + 4 * math.log10(count), color="#3186cc", fill=True,
+                            fill_opacity=0.5, weight=1, tooltip=f"{count:,} drivers").add_to(layer)
+    
+    # Mark User Location
+    folium.Marker(to_map(ux, uy), popup="You", icon=folium.Icon(color='red', icon='user')).add_to(layer)
     
+    # Draw Search Radius: the area find_best_driver would search from here
+    radius = st.session_state.engine.search_radius((ux, uy))
+    if radius is not None:
+        folium.Circle(to_map(ux, uy), radius=radius * DEGREES_PER_UNIT * METERS_PER_DEGREE,
+                      color='blue', fill=True, opacity=0.2, tooltip=f"Search radius {radius:.2f} units").add_to(layer)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    state = st_folium(m, key="fleet_map", feature_group_to_add=layer, returned_objects=["bounds"],
+                      width=800, height=500)
+    mode = "individual drivers" if view["drivers"] or not view["total"] else f"{len(view['clusters'])} clusters"
+    st.caption(f"{view['total']:,} drivers in view, shown as {mode} (prepared in {elapsed_ms:.0f} ms).")
+
+    # The user panned or zoomed: redraw for the new viewport
+    bounds = (state or {}).get("bounds")
+    if bounds and bounds["_southWest"]["lat"] is not None:
+        new_bounds = from_map_bounds(bounds)
+        if new_bounds != st.session_state.map_bounds:
+            st.session_state.map_bounds = new_bounds
+            st.rerun()
+
+def micros(seconds):
+    return "-" if seconds is None else f"{seconds * 1e6:,.0f}"
+
+# Redrawn on its own every few seconds, without rerunning the rest of the page
+@st.fragment(run_every="3s")
+def system_status():
+    engine = st.session_state.engine
+    snap = engine.metrics_snapshot()
+    gauges = snap["gauges"]
+    st.subheader("System Status")
+
     # Metrics
-    st.metric(label="Bloom Filter Size", value=f"{st.session_state.engine.security_filter.m} bits")
-    st.metric(label="Radix Tree Nodes", value="Compressed")
+    m1, m2 = st.columns(2)
+    m1.metric(label="Bloom Filter Size", value=f"{engine.security_filter.m:,} bits")
+    m1.metric(label="Bloom Est. FP Rate", value=f"{gauges['bloom_estimated_false_positive_rate']:.3%}")
+    m2.metric(label="Radix Tree Nodes", value=f"{gauges['radix_nodes']:,}",
+              help=f"{gauges['locations']:,} locations, edge-compressed")
+    m2.metric(label="Active Drivers", value=f"{gauges['drivers']:,}")
+
+    # Per-stage latency; p50/p99 are histogram bucket upper bounds
+    st.markdown("**Dispatch latency (µs)**")
+    stages = dict(snap["stage_seconds"], total=snap["request_seconds"])
+    st.dataframe([{"stage": stage, "requests": h["count"], "mean": micros(h["mean"]),
+                   "p50 ≤": micros(h["p50"]), "p99 ≤": micros(h["p99"])}
+                  for stage, h in stages.items()], hide_index=True)
+
+    work = snap["work"]
+    mean = lambda name: work[name]["mean"] or 0
+    requests = snap["requests"]
+    st.caption(f"{sum(requests.values())} requests: {requests['assigned']} assigned, {requests['denied']} denied, "
+               f"{requests['unknown_location']} unknown location, {requests['no_driver']} without driver. "
+               f"Per search: {mean('rtree_nodes_visited'):.1f} R-tree nodes, "
+               f"{mean('rtree_entries_visited'):.1f} entries, {mean('candidates'):.1f} candidates, "
+               f"heap size {mean('heap_size'):.1f}.")
+    with st.expander("Prometheus metrics"):
+        st.code(engine.metrics_text(), language="text")
+
+with col2:
+    system_status()
     
     st.subheader("Event Log")
     for log in st.session_state.logs[:5]:
@@ -0,0 +1,82 @@
+"""
+Ranked autocomplete: RadixTree.complete vs. a sorted-list bisect baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_autocomplete --addresses 1000000
+
+The baseline keeps every address in a sorted list, finds the prefix range
+with two bisects and picks the k heaviest with heapq.nlargest, so its cost
+grows with the number of matches. The RadixTree answers from the top-k
+cache of the node the prefix ends on. Short prefixes (the first keystrokes)
+match the most addresses and show the gap best.
+"""
+import argparse
+import bisect
+import heapq
+import random
+import time
+
+from src.radix_tree import RadixTree
+
+STREETS = ["North", "South", "East", "West", "Main", "Oak", "Pine", "Maple", "Cedar", "Elm",
+           "Lake", "Hill", "River", "Park", "Church", "Market", "Station", "Mill", "King", "Queen"]
+SUFFIXES = ["Street", "Avenue", "Road", "Lane", "Boulevard", "Drive", "Court", "Place"]
+
+def make_addresses(count, seed):
+    rng = random.Random(seed)
+    addresses = {}
+    while len(addresses) < count:
+        name = f"{rng.choice(STREETS)} {rng.choice(SUFFIXES)} {rng.randint(1, 99999)}"
+        # Zipf-like popularity: a few addresses are searched far more often
+        addresses[name] = int(1000 / rng.randint(1, 1000) ** 1.2) + 1
+    return addresses
+
+def run(count, k, queries, seed):
+    addresses = make_addresses(count, seed)
+
+    start = time.perf_counter()
+    tree = RadixTree(top_k=k)
+    for name, weight in addresses.items():
+        tree.insert(name, weight)
+    tree_build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    keys = sorted(addresses)
+    list_build_s = time.perf_counter() - start
+
+    def baseline(prefix):
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + "\U0010ffff")
+        best = heapq.nsmallest(k, ((-addresses[w], w) for w in keys[lo:hi]))
+        return [w for _, w in best]
+
+    print(f"{count:,} addresses, k={k}: build RadixTree {tree_build_s:.1f}s, sorted list {list_build_s:.1f}s")
+    print(f"{'prefix len':>10} {'matches':>9} {'radix us/q':>11} {'bisect us/q':>12}")
+    rng = random.Random(seed + 1)
+    sample = rng.sample(keys, queries)
+    for length in (1, 3, 6, 10, 14):
+        prefixes = [w[:length] for w in sample]
+        matches = sum(bisect.bisect_left(keys, p + "\U0010ffff") - bisect.bisect_left(keys, p)
+                      for p in prefixes) / len(prefixes)
+
+        start = time.perf_counter()
+        radix = [tree.complete(p, k) for p in prefixes]
+        radix_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        base = [baseline(p) for p in prefixes]
+        base_s = time.perf_counter() - start
+        assert radix == base
+        print(f"{length:>10} {matches:>9.0f} {radix_s / queries * 1e6:>11.1f} {base_s / queries * 1e6:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--addresses", type=int, default=1000000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.addresses, args.k, args.queries, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Security-layer Bloom filter: throughput, memory and false positive rate.
+
+Run from the repository root:
+    python -m benchmarks.bench_bloom_filter --blacklist 10000000
+
+Measures single and batched checks per second, bytes per blacklisted ID,
+and the false positive rate observed on IDs that were never added,
+next to the rate get_stats() predicts. Also times save() and
+open(mmap=True) against open(mmap=False).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.bloom_filter import BloomFilter
+
+def run(blacklist, probes, fp_rate, batch):
+    bf = BloomFilter(expected_elements=blacklist, false_positive_rate=fp_rate)
+    start = time.perf_counter()
+    for lo in range(0, blacklist, batch):
+        bf.add_many(f"blacklisted_{i}" for i in range(lo, min(lo + batch, blacklist)))
+    add_s = time.perf_counter() - start
+
+    clean = [f"customer_{i}" for i in range(probes)]
+    start = time.perf_counter()
+    single_hits = sum(bf.check(item) for item in clean)
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_hits = 0
+    for lo in range(0, probes, batch):
+        batch_hits += sum(bf.check_many(clean[lo:lo + batch]))
+    batch_s = time.perf_counter() - start
+    assert single_hits == batch_hits
+
+    stats = bf.get_stats()
+    print(f"blacklisted IDs:        {blacklist:,}  (added in {add_s:.1f}s, {blacklist / add_s:,.0f}/s)")
+    print(f"bits / hash functions:  {stats['size_bits']:,} / {stats['hash_functions']}")
+    print(f"bytes per element:      {stats['size_bytes'] / blacklist:.2f}")
+    print(f"check():                {probes / single_s:,.0f} checks/s")
+    print(f"check_many({batch}):    {probes / batch_s:,.0f} checks/s")
+    print(f"false positive rate:    measured {single_hits / probes:.4%}, "
+          f"predicted {stats['estimated_false_positive_rate']:.4%} (target {fp_rate:.2%})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blacklist.bloom")
+        start = time.perf_counter()
+        bf.save(path)
+        save_s = time.perf_counter() - start
+        for use_mmap in (True, False):
+            start = time.perf_counter()
+            opened = BloomFilter.open(path, mmap=use_mmap)
+            open_s = time.perf_counter() - start
+            assert sum(opened.check_many(clean[:batch])) == sum(bf.check_many(clean[:batch]))
+            print(f"open(mmap={use_mmap!s:<5}):       {open_s * 1000:.2f} ms")
+            opened.close()
+        print(f"save():                 {save_s * 1000:.2f} ms ({os.path.getsize(path):,} bytes)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blacklist", type=int, default=10000000)
+    parser.add_argument("--probes", type=int, default=1000000)
+    parser.add_argument("--fp-rate", type=float, default=0.01)
+    parser.add_argument("--batch", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.blacklist, args.probes, args.fp_rate, args.batch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+STR bulk load vs. one-by-one insertion for the driver R-Tree.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_load --sizes 10000 100000
+
+Reports build time, the average number of nodes a search visits (which
+drops when the packed tree has tighter, less overlapping MBRs), and the
+cost of the GPS updates that follow a build: each one moves a random
+driver a short way, which splits nodes when the leaves are full.
+"""
+import argparse
+import random
+import time
+
+from src.r_tree import RTree
+
+def nodes_per_query(tree, centers, radius):
+    tree.nodes_visited = 0
+    for x, y in centers:
+        tree.search(x, y, radius)
+    return tree.nodes_visited / len(centers)
+
+def update_us(tree, ids, updates, rng):
+    """Mean µs per update() moving a random driver by up to one unit."""
+    moves = []
+    for _ in range(updates):
+        d = rng.choice(ids)
+        x, y = tree.get(d)
+        moves.append((d, (x + rng.uniform(-1, 1), y + rng.uniform(-1, 1))))
+    start = time.perf_counter()
+    for d, p in moves:
+        tree.update(d, p)
+    return (time.perf_counter() - start) / updates * 1e6
+
+def run(sizes, max_entries, queries, updates, fill, seed):
+    print(f"{'drivers':>10} {'method':>12} {'build s':>9} {'height':>6} {'nodes/query':>12} {'update µs':>10}")
+    for n in sizes:
+        rng = random.Random(seed)
+        points = [((rng.uniform(0, 100), rng.uniform(0, 100)), i) for i in range(n)]
+        centers = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(queries)]
+        radius = 5.0 * (1000 / n) ** 0.5
+
+        incremental = RTree(max_entries=max_entries)
+        start = time.perf_counter()
+        for p, d in points:
+            incremental.insert(p, d)
+        insert_s = time.perf_counter() - start
+
+        packed = RTree(max_entries=max_entries)
+        start = time.perf_counter()
+        packed.bulk_load(points, fill)
+        bulk_s = time.perf_counter() - start
+
+        for name, tree, build_s in (("insert", incremental, insert_s), ("STR bulk", packed, bulk_s)):
+            visited = nodes_per_query(tree, centers, radius)
+            moved = update_us(tree, list(range(n)), updates, rng)
+            print(f"{n:>10} {name:>12} {build_s:>9.3f} {tree.height():>6} {visited:>12.1f} {moved:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--max-entries", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=20000, help="GPS updates timed after each build")
+    parser.add_argument("--fill", type=float, default=0.7, help="STR node fill factor")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.sizes, args.max_entries, args.queries, args.updates, args.fill, args.seed)
+
+if __name__ == "__main__":
+    main()
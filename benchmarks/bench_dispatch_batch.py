@@ -0,0 +1,62 @@
+"""
+Batch dispatch vs. calling find_best_driver in a loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_dispatch_batch --drivers 20000 --batch 100 500
+
+Both paths see the same peak-hour burst of orders. The loop is a pure
+lookup (it cannot reserve drivers), so the benchmark also counts how many
+drivers it would have promised to more than one customer. Both count
+the customers left without a driver.
+"""
+import argparse
+import random
+import re
+import time
+
+from src.engine import LogisticsEngine
+
+def build_engine(drivers, seed):
+    rng = random.Random(seed)
+    engine = LogisticsEngine(candidate_pool=8)
+    engine.add_location("Downtown")
+    engine.add_drivers((f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(drivers))
+    return engine
+
+def run(drivers, batches, seed):
+    print(f"{'orders':>7} {'loop req/s':>11} {'batch req/s':>12} {'loop dup drivers':>17} {'loop unserved':>14} "
+          f"{'batch unserved':>15} {'loop total':>11} {'batch total':>12}")
+    for size in batches:
+        rng = random.Random(seed + size)
+        # Peak hour: orders cluster downtown
+        orders = [(f"user_{i}", "Downtown", (rng.gauss(50, 8), rng.gauss(50, 8))) for i in range(size)]
+
+        engine = build_engine(drivers, seed)
+        start = time.perf_counter()
+        loop_results = [engine.find_best_driver(*order) for order in orders]
+        loop_s = time.perf_counter() - start
+
+        engine = build_engine(drivers, seed)
+        start = time.perf_counter()
+        batch_results = engine.dispatch_batch(orders)
+        batch_s = time.perf_counter() - start
+
+        pattern = re.compile(r"Driver (\S+) assigned\. \w+(?: \w+)?: ([\d.]+)")
+        loop_hits = [pattern.search(r).groups() for r in loop_results if r.startswith("Success")]
+        batch_hits = [pattern.search(r).groups() for r in batch_results if r.startswith("Success")]
+        duplicates = len(loop_hits) - len({d for d, _ in loop_hits})
+        loop_total = sum(float(c) for _, c in loop_hits)
+        batch_total = sum(float(c) for _, c in batch_hits)
+        print(f"{size:>7} {size / loop_s:>11.0f} {size / batch_s:>12.0f} {duplicates:>17} "
+              f"{size - len(loop_hits):>14} {size - len(batch_hits):>15} {loop_total:>11.1f} {batch_total:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=20000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.drivers, args.batch, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+High-rate GPS ping benchmark for the driver R-Tree.
+
+Run from the repository root:
+    python -m benchmarks.bench_driver_updates --drivers 100000 --pings 500000
+
+Every driver jitters around its position (as consecutive GPS pings do) while
+box queries are interleaved, and the sustained update rate is reported.
+"""
+import argparse
+import random
+import time
+
+from src.r_tree import RTree
+
+def run(drivers, pings, jitter, query_every, max_entries, seed):
+    rng = random.Random(seed)
+    tree = RTree(max_entries=max_entries)
+    positions = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(drivers)]
+    tree.bulk_load((p, i) for i, p in enumerate(positions))
+
+    in_place = 0
+    queries = 0
+    start = time.perf_counter()
+    for n in range(pings):
+        d = rng.randrange(drivers)
+        x, y = positions[d]
+        new = (min(100.0, max(0.0, x + rng.uniform(-jitter, jitter))),
+               min(100.0, max(0.0, y + rng.uniform(-jitter, jitter))))
+        leaf = tree._leaf_of[d]
+        if leaf.mbr.contains(new[0], new[1]):
+            in_place += 1
+        tree.update(d, new)
+        positions[d] = new
+        if n % query_every == 0:
+            tree.search(rng.uniform(0, 100), rng.uniform(0, 100), 1.0)
+            queries += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"drivers={drivers} pings={pings} queries={queries}")
+    print(f"updates/s: {pings / elapsed:,.0f}")
+    print(f"in-place fast path: {in_place / pings:.1%}")
+    print(f"index size after run: {len(tree)} (expected {drivers})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=100000)
+    parser.add_argument("--pings", type=int, default=500000)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--query-every", type=int, default=10)
+    parser.add_argument("--max-entries", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.drivers, args.pings, args.jitter, args.query_every, args.max_entries, args.seed)
+
+if __name__ == "__main__":
+    main()
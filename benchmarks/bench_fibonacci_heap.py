@@ -0,0 +1,88 @@
+"""
+FibonacciHeap vs. heapq with lazy deletion on decrease-key-heavy workloads.
+
+Run from the repository root:
+    python -m benchmarks.bench_fibonacci_heap --items 100000 --decreases-per-item 1 4 16
+
+Models ETA refinement: every driver enters with an estimate, its estimate
+is lowered several times, and the best drivers are popped as we go.
+heapq cannot lower a key in place, so it pushes a fresh entry and skips
+stale ones when they surface; the peak heap size shows that overhead.
+"""
+import argparse
+import heapq
+import random
+import time
+
+from src.fibonacci_heap import FibonacciHeap
+
+def workload(items, decreases, seed):
+    rng = random.Random(seed)
+    ops = [("insert", i, rng.uniform(1000, 2000)) for i in range(items)]
+    for step in range(items * decreases):
+        ops.append(("decrease", rng.randrange(items), rng.uniform(0, 1)))
+        if step % (decreases * 4) == 0:
+            ops.append(("pop", None, None))
+    return ops
+
+def run_fibonacci(ops):
+    heap = FibonacciHeap()
+    popped = set()
+    peak = 0
+    for op, value, key in ops:
+        if op == "insert":
+            heap.insert(key, value)
+        elif op == "decrease":
+            node = heap.handle(value)
+            if node is not None:
+                # Lower by a fraction so the key always goes down
+                heap.decrease_key(node, node.key * key)
+        elif len(heap):
+            popped.add(heap.extract_min().value)
+        peak = max(peak, len(heap))
+    return popped, peak
+
+def run_heapq(ops):
+    heap, current, popped = [], {}, set()
+    peak = 0
+    for op, value, key in ops:
+        if op == "insert":
+            current[value] = key
+            heapq.heappush(heap, (key, value))
+        elif op == "decrease":
+            if value in current:
+                current[value] *= key
+                heapq.heappush(heap, (current[value], value))  # old entry becomes stale
+        else:
+            while heap:
+                k, v = heapq.heappop(heap)
+                if current.get(v) == k:
+                    del current[v]
+                    popped.add(v)
+                    break
+        peak = max(peak, len(heap))
+    return popped, peak
+
+def run(items, decreases_list, seed):
+    print(f"{'items':>8} {'dec/item':>8} {'fib s':>8} {'heapq s':>8} {'fib peak':>9} {'heapq peak':>11}")
+    for decreases in decreases_list:
+        ops = workload(items, decreases, seed)
+        start = time.perf_counter()
+        fib_popped, fib_peak = run_fibonacci(ops)
+        fib_s = time.perf_counter() - start
+        start = time.perf_counter()
+        hq_popped, hq_peak = run_heapq(ops)
+        hq_s = time.perf_counter() - start
+        assert len(fib_popped) == len(hq_popped)
+        print(f"{items:>8} {decreases:>8} {fib_s:>8.2f} {hq_s:>8.2f} {fib_peak:>9} {hq_peak:>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--decreases-per-item", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.items, args.decreases_per_item, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Typo-tolerant lookup: RadixTree.fuzzy_search vs. brute-force edit distance.
+
+Run from the repository root:
+    python -m benchmarks.bench_fuzzy_search --names 1000000 --max-edits 1 2
+
+Queries are registered names with one random typo (insert, delete or
+substitute a character). Brute force computes the Levenshtein distance
+to every name, so it only runs on a few queries.
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks.bench_autocomplete import make_addresses
+from src.radix_tree import RadixTree
+
+def edit_distance(a, b, max_edits):
+    """Levenshtein distance, giving up early once it must exceed max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return max_edits + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(cur[j - 1] + 1, prev[j] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > max_edits:
+            return max_edits + 1
+        prev = cur
+    return prev[-1]
+
+def add_typo(word, rng):
+    pos = rng.randrange(len(word))
+    kind = rng.choice("isd")
+    if kind == "i":
+        return word[:pos] + rng.choice(string.ascii_lowercase) + word[pos:]
+    if kind == "s":
+        return word[:pos] + rng.choice(string.ascii_lowercase) + word[pos + 1:]
+    return word[:pos] + word[pos + 1:]
+
+def run(count, edit_budgets, queries, brute_queries, seed):
+    names = make_addresses(count, seed)
+    tree = RadixTree()
+    for name, weight in names.items():
+        tree.insert(name, weight)
+
+    rng = random.Random(seed + 1)
+    typos = [add_typo(w, rng) for w in rng.sample(list(names), queries)]
+    print(f"{count:,} names, {queries} misspelled queries")
+    print(f"{'max edits':>9} {'radix ms/q':>11} {'brute ms/q':>11} {'avg matches':>12}")
+    for max_edits in edit_budgets:
+        start = time.perf_counter()
+        found = [tree.fuzzy_search(q, max_edits) for q in typos]
+        radix_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q, hits in zip(typos[:brute_queries], found):
+            brute = sorted((d, -names[w], w) for w in names
+                           for d in (edit_distance(q, w, max_edits),) if d <= max_edits)
+            assert [(d, w) for d, _, w in brute] == hits
+        brute_s = time.perf_counter() - start
+
+        matches = sum(len(hits) for hits in found) / len(found)
+        print(f"{max_edits:>9} {radix_s / queries * 1000:>11.2f} "
+              f"{brute_s / brute_queries * 1000:>11.1f} {matches:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=1000000)
+    parser.add_argument("--max-edits", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--brute-queries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.names, args.max_edits, args.queries, args.brute_queries, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Sustained GPS-ping ingestion rate through src/ingest.py.
+
+Run from the repository root:
+    python -m benchmarks.bench_ingest --drivers 10000 --pings 500000 --windows 0 0.1 1
+
+The synthetic stream from data/generate_data.py (unthrottled) is piped into
+the ingestion pipeline, which micro-batches pings into a LogisticsEngine.
+A wider coalescing window folds more repeat pings per driver into one
+index update. The last row applies every ping on its own, without
+batching, for comparison.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from src.engine import LogisticsEngine
+from src.ingest import ingest, read_pings
+
+def stream(drivers, pings, seed):
+    return subprocess.Popen([sys.executable, "data/generate_data.py", "--ping-stream", "--rate", "0",
+                             "--drivers", str(drivers), "--count", str(pings), "--seed", str(seed)],
+                            stdout=subprocess.PIPE, text=True, bufsize=1 << 16)
+
+def run(drivers, pings, windows, max_batch, seed):
+    print(f"{pings:,} pings from {drivers:,} drivers, max batch {max_batch}")
+    print(f"{'window s':>8} {'pings/s':>10} {'updates':>10} {'batches':>8}")
+    for window in windows:
+        engine = LogisticsEngine()
+        proc = stream(drivers, pings, seed)
+        stats = ingest(proc.stdout, engine.update_drivers, window, max_batch)
+        proc.wait()
+        print(f"{window:>8} {stats['pings_per_sec']:>10,.0f} {stats['applied']:>10,} {stats['batches']:>8,}")
+
+    engine = LogisticsEngine()
+    proc = stream(drivers, pings, seed)
+    start = time.perf_counter()
+    for driver_id, x, y, _ in read_pings(proc.stdout):
+        engine.update_driver(driver_id, (x, y))
+    proc.wait()
+    print(f"{'per-ping':>8} {pings / (time.perf_counter() - start):>10,.0f} {pings:>10,} {'-':>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=10000)
+    parser.add_argument("--pings", type=int, default=500000)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 0.1, 1.0])
+    parser.add_argument("--max-batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.drivers, args.pings, args.windows, args.max_batch, args.seed)
+
+if __name__ == "__main__":
+    main()
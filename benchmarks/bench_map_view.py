@@ -0,0 +1,103 @@
+"""
+Map redraw latency: LogisticsEngine.drivers_in_view at several zoom levels.
+
+Run from the repository root:
+    python -m benchmarks.bench_map_view --drivers 1000000 --budget-ms 100
+
+Each zoom level is a square viewport of the given side (100 = the whole
+plane) placed at random. Between redraws a batch of GPS pings moves
+drivers a short way (--step), so cached subtree counts are partly
+invalidated as they would be in production. Nothing forces a garbage
+collection, so any GC pass that lands in a redraw is part of its time.
+
+The engine is prepared the two ways app.py does it: built from data, then
+saved and reloaded from a snapshot (thawed up front). Both are then
+frozen with gc.freeze(). Reports p50/p99 latency and how many markers or
+clusters the map would receive for each, and fails if a p99 exceeds the
+budget.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import datasets
+from src.engine import LogisticsEngine
+
+def moves(engine, ids, count, step, rng):
+    """`count` pings, each moving a random driver by about `step` units."""
+    for _ in range(count):
+        d_id = rng.choice(ids)
+        x, y = engine.driver_index.get(d_id)
+        yield d_id, (min(100.0, max(0.0, x + rng.gauss(0, step))), min(100.0, max(0.0, y + rng.gauss(0, step))))
+
+def redraws_per_side(engine, ids, sides, redraws, pings, step, max_markers, grid, rng):
+    """Prints one row per view side and returns the worst p99 in ms."""
+    start = time.perf_counter()
+    engine.drivers_in_view((0, 0, 100, 100), max_markers, grid)
+    print(f"first redraw (fills subtree counts): {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"{'view side':>9} {'p50 ms':>8} {'p99 ms':>8} {'in view':>10} {'markers':>8} {'clusters':>8}")
+
+    worst = 0.0
+    for side in sides:
+        latencies, shown = [], []
+        for _ in range(redraws):
+            engine.update_drivers(list(moves(engine, ids, pings, step, rng)))
+            x, y = rng.uniform(0, 100 - side), rng.uniform(0, 100 - side)
+            start = time.perf_counter()
+            view = engine.drivers_in_view((x, y, x + side, y + side), max_markers, grid)
+            latencies.append((time.perf_counter() - start) * 1000)
+            shown.append((view["total"], len(view["drivers"]), len(view["clusters"])))
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+        worst = max(worst, p99)
+        total, markers, clusters = (statistics.median(s[i] for s in shown) for i in range(3))
+        print(f"{side:>9g} {statistics.median(latencies):>8.1f} {p99:>8.1f} {total:>10,.0f} {markers:>8,.0f} "
+              f"{clusters:>8,.0f}")
+    return worst
+
+def run(drivers, sides, redraws, pings, step, max_markers, grid, budget_ms, seed):
+    rng = random.Random(seed)
+    ids = datasets.driver_ids(drivers)
+    engine = LogisticsEngine()
+    engine.add_drivers(zip(ids, datasets.driver_positions(drivers, "clustered", seed)))
+
+    worst = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "engine.snapshot")
+        engine.save_snapshot(path)
+        for source in ("built", "snapshot"):
+            if source == "snapshot":
+                gc.unfreeze()
+                del engine
+                gc.collect()
+                # As load_engine in app.py: load, build every layer, then freeze
+                engine = LogisticsEngine.load_snapshot(path)
+                engine.thaw()
+            gc.freeze()
+            print(f"\n{drivers:,} drivers, engine {source}")
+            worst = max(worst, redraws_per_side(engine, ids, sides, redraws, pings, step, max_markers, grid, rng))
+    if worst > budget_ms:
+        print(f"p99 {worst:.1f} ms is over the {budget_ms} ms budget")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=1000000)
+    parser.add_argument("--sides", type=float, nargs="+", default=[100, 50, 20, 5, 1])
+    parser.add_argument("--redraws", type=int, default=50)
+    parser.add_argument("--pings", type=int, default=200, help="GPS pings applied between redraws")
+    parser.add_argument("--step", type=float, default=0.2, help="typical distance a ping moves a driver")
+    parser.add_argument("--max-markers", type=int, default=500)
+    parser.add_argument("--grid", type=int, default=24)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.drivers, args.sides, args.redraws, args.pings, args.step, args.max_markers, args.grid, args.budget_ms, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+R-Tree insertion/query benchmark.
+
+Run from the repository root:
+    python -m benchmarks.bench_r_tree --sizes 10000 100000 1000000
+
+If inserts and queries are O(log n), the per-operation cost should grow
+only a little while n grows by orders of magnitude.
+"""
+import argparse
+import random
+import time
+
+from src.r_tree import RTree
+
+def run(sizes, max_entries, queries, radius, seed):
+    print(f"{'drivers':>10} {'height':>6} {'insert us/op':>13} {'query us/op':>12} {'hits/query':>10} {'5-NN us/op':>11}")
+    for n in sizes:
+        rng = random.Random(seed)
+        tree = RTree(max_entries=max_entries)
+        points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(n)]
+
+        start = time.perf_counter()
+        for i, p in enumerate(points):
+            tree.insert(p, i)
+        insert_us = (time.perf_counter() - start) / n * 1e6
+
+        # Shrink the query box as the fleet grows so each query returns a similar number of hits
+        r = radius * (1000 / n) ** 0.5
+        centers = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(queries)]
+        hits = 0
+        start = time.perf_counter()
+        for x, y in centers:
+            hits += len(tree.search(x, y, r))
+        query_us = (time.perf_counter() - start) / queries * 1e6
+
+        start = time.perf_counter()
+        for x, y in centers:
+            tree.nearest(x, y, 5)
+        knn_us = (time.perf_counter() - start) / queries * 1e6
+
+        print(f"{n:>10} {tree.height():>6} {insert_us:>13.2f} {query_us:>12.2f} {hits / queries:>10.1f} {knn_us:>11.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--max-entries", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.sizes, args.max_entries, args.queries, args.radius, args.seed)
+
+if __name__ == "__main__":
+    main()
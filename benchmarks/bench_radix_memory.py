@@ -0,0 +1,75 @@
+"""
+RadixTree memory per key and lookup speed, mutable vs. frozen.
+
+Run from the repository root:
+    python -m benchmarks.bench_radix_memory --addresses 1000000
+
+Compares the object tree (RadixNode per edge) with FrozenRadixTree in
+memory and memory-mapped from disk: bytes per key, time to load,
+exact searches per second and top-k completions per second.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_autocomplete import make_addresses
+from src.radix_tree import RadixTree, FrozenRadixTree
+
+def frozen_bytes(frozen):
+    return len(frozen.labels) + sum(memoryview(getattr(frozen, name)).nbytes for name, _, _ in FrozenRadixTree.COLUMNS)
+
+def throughput(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+def run(count, k, queries, seed):
+    addresses = make_addresses(count, seed)
+
+    tracemalloc.start()
+    tree = RadixTree(top_k=k)
+    for name, weight in addresses.items():
+        tree.insert(name, weight)
+    tree_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    frozen = tree.freeze()
+    freeze_s = time.perf_counter() - start
+
+    rng = random.Random(seed + 1)
+    words = rng.sample(list(addresses), queries)
+    prefixes = [w[:rng.randint(1, 8)] for w in words]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "registry.rx")
+        frozen.save(path)
+        file_bytes = os.path.getsize(path)
+        start = time.perf_counter()
+        mapped = FrozenRadixTree.open(path, mmap=True)
+        open_s = time.perf_counter() - start
+
+        print(f"{count:,} addresses, k={k}; freeze() {freeze_s:.1f}s, open(mmap=True) {open_s * 1000:.2f} ms")
+        print(f"{'':<18} {'bytes/key':>10} {'search/s':>10} {'complete/s':>11}")
+        for label, t, size in (("RadixTree", tree, tree_bytes),
+                               ("frozen (memory)", frozen, frozen_bytes(frozen)),
+                               ("frozen (mmap)", mapped, file_bytes)):
+            print(f"{label:<18} {size / count:>10.0f} {throughput(t.search, words):>10,.0f} "
+                  f"{throughput(lambda p: t.complete(p, k), prefixes):>11,.0f}")
+        mapped.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--addresses", type=int, default=1000000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.addresses, args.k, args.queries, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Candidate ranking: Python distance loop + FibonacciHeap vs. DriverStore.
+
+Run from the repository root:
+    python -m benchmarks.bench_ranking --candidates 10 100 500 2000
+
+Mirrors Step 4 of LogisticsEngine.find_best_driver for a dense downtown
+query that returns many candidates, and times picking the closest 1 and 5.
+"""
+import argparse
+import random
+import time
+
+from src.driver_store import DriverStore
+from src.fibonacci_heap import FibonacciHeap
+
+def rank_with_heap(user, candidates, k):
+    heap = FibonacciHeap()
+    for coords, d_id in candidates:
+        dist = ((coords[0] - user[0]) ** 2 + (coords[1] - user[1]) ** 2) ** 0.5
+        heap.insert(dist, d_id)
+    return [heap.extract_min().value for _ in range(min(k, len(candidates)))]
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def run(sizes, repeats, seed):
+    rng = random.Random(seed)
+    print(f"{'candidates':>10} {'k':>3} {'loop+heap us':>13} {'columnar us':>12} {'speedup':>8}")
+    for n in sizes:
+        store = DriverStore()
+        candidates = []
+        for i in range(n):
+            p = (rng.uniform(45, 55), rng.uniform(45, 55))
+            store.upsert(i, p)
+            candidates.append((p, i))
+        ids = [d for _, d in candidates]
+        user = (50.0, 50.0)
+        for k in (1, 5):
+            heap_us = timed(lambda: rank_with_heap(user, candidates, k), repeats)
+            store_us = timed(lambda: store.rank(user, ids, k), repeats)
+            print(f"{n:>10} {k:>3} {heap_us:>13.1f} {store_us:>12.1f} {heap_us / store_us:>7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.candidates, args.repeats, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Road-network ranking: one multi-target Dijkstra vs. one search per driver.
+
+Run from the repository root:
+    python -m benchmarks.bench_routing --grid 200 --candidates 5 20
+
+Builds a grid city with data/generate_data.py, then ranks the k nearest
+drivers around random customers by travel time.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from data.generate_data import generate_road_network
+from src.road_graph import RoadGraph
+
+def run(grid, candidates_list, queries, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "roads.txt")
+        generate_road_network(grid, grid, path, seed=seed)
+        start = time.perf_counter()
+        graph = RoadGraph.load(path)
+        print(f"loaded {len(graph)} junctions / {graph.arc_count} arcs in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(seed)
+    reverse = graph.reversed()
+    graph.nearest_node(0, 0)  # build the snapping index outside the timed loop
+    print(f"{'candidates':>10} {'multi ms':>9} {'per-driver ms':>14} {'A* per-driver ms':>17}")
+    for k in candidates_list:
+        multi = single = astar = 0.0
+        for _ in range(queries):
+            cx, cy = rng.uniform(20, 80), rng.uniform(20, 80)
+            customer = graph.nearest_node(cx, cy)
+            drivers = [graph.nearest_node(cx + rng.uniform(-10, 10), cy + rng.uniform(-10, 10)) for _ in range(k)]
+
+            start = time.perf_counter()
+            a = graph.travel_times_to(customer, drivers)
+            multi += time.perf_counter() - start
+
+            start = time.perf_counter()
+            b = {d: reverse.dijkstra(customer, targets=[d])[d] for d in drivers}
+            single += time.perf_counter() - start
+
+            start = time.perf_counter()
+            c = {d: graph.astar(d, customer)[0] for d in drivers}
+            astar += time.perf_counter() - start
+            assert all(abs(a[d] - b[d]) < 1e-6 and abs(a[d] - c[d]) < 1e-6 for d in drivers)
+        print(f"{k:>10} {multi / queries * 1e3:>9.2f} {single / queries * 1e3:>14.2f} {astar / queries * 1e3:>17.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", type=int, default=200, help="junctions per side")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.grid, args.candidates, args.queries, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Load generator for the JSON-lines dispatch server (src/server.py).
+
+Run from the repository root (starts its own server unless --port is given):
+    python -m benchmarks.bench_server --drivers 20000 --connections 8 --pipeline 32
+
+Each connection keeps up to --pipeline requests in flight. The mix is
+dispatch lookups, GPS updates and blacklist additions. Prints throughput
+and latency percentiles per operation, measured from send to response.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def make_request(rng, drivers, request_id, mix):
+    roll = rng.random()
+    if roll < mix["dispatch"]:
+        return {"id": request_id, "op": "dispatch", "user_id": f"user_{rng.randrange(10**6)}",
+                "destination": "Downtown", "coords": [rng.uniform(0, 100), rng.uniform(0, 100)]}
+    if roll < mix["dispatch"] + mix["update"]:
+        return {"id": request_id, "op": "update", "driver_id": f"Driver_{rng.randrange(drivers)}",
+                "coords": [rng.uniform(0, 100), rng.uniform(0, 100)]}
+    return {"id": request_id, "op": "blacklist", "user_id": f"bot_{rng.randrange(10**6)}"}
+
+async def client(host, port, count, pipeline, drivers, mix, seed, latencies):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    rng = random.Random(seed)
+    window = asyncio.Semaphore(pipeline)
+    sent = deque()  # (op, send time), answered in the same order
+
+    async def send():
+        for i in range(count):
+            await window.acquire()
+            request = make_request(rng, drivers, i, mix)
+            sent.append((request["op"], time.perf_counter()))
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            if window.locked():
+                await writer.drain()
+        await writer.drain()
+
+    async def receive():
+        for _ in range(count):
+            line = await reader.readline()
+            op, started = sent.popleft()
+            latencies.setdefault(op, []).append(time.perf_counter() - started)
+            if not json.loads(line)["ok"]:
+                raise RuntimeError(line)
+            window.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+    await writer.wait_closed()
+
+async def drive(host, port, args, mix):
+    latencies = {}
+    per_connection = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_connection, args.pipeline, args.drivers, mix,
+                                  args.seed + c, latencies) for c in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    total = per_connection * args.connections
+    print(f"{total:,} requests over {args.connections} connections, pipeline {args.pipeline}: "
+          f"{total / elapsed:,.0f} req/s")
+    print(f"{'op':<10} {'count':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8}")
+    for op, values in sorted(latencies.items()):
+        values.sort()
+        cells = [percentile(values, q) * 1000 for q in (0.5, 0.9, 0.99, 0.999)] + [values[-1] * 1000]
+        print(f"{op:<10} {len(values):>8} " + " ".join(f"{c:>8.2f}" for c in cells[:3])
+              + f" {cells[3]:>9.2f} {cells[4]:>8.2f}")
+
+def start_server(drivers, workers, seed):
+    """Launches `python -m src.server` on a free port with a synthetic fleet."""
+    rng = random.Random(seed)
+    data = {"locations": ["Downtown", "Airport"],
+            "drivers": [{"id": f"Driver_{i}", "coords": [rng.uniform(0, 100), rng.uniform(0, 100)]}
+                        for i in range(drivers)]}
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    proc = subprocess.Popen([sys.executable, "-m", "src.server", "--port", "0", "--data", path,
+                             "--workers", str(workers)], stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    os.unlink(path)
+    if not line.startswith("listening on "):
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    host, port = line.split()[-1].rsplit(":", 1)
+    return proc, host, int(port)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="existing server; omit to start one")
+    parser.add_argument("--drivers", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--pipeline", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=40000)
+    parser.add_argument("--dispatch", type=float, default=0.7)
+    parser.add_argument("--update", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    mix = {"dispatch": args.dispatch, "update": args.update}
+
+    proc = None
+    host, port = args.host, args.port
+    if port is None:
+        proc, host, port = start_server(args.drivers, args.workers, args.seed)
+    try:
+        asyncio.run(drive(host, port, args, mix))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+ShardedEngine throughput against worker count, next to one in-process R-tree.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharding --drivers 200000 --grids 1x1 2x1 2x2 4x2
+
+Every grid tile is one worker process. Queries and GPS pings are sent in
+batches, so all shards work at the same time; speed-up is bounded by the
+number of cores (reported below) and by the coordinator, which merges
+results in a single process.
+"""
+import argparse
+import os
+import random
+import time
+
+from src.r_tree import RTree
+from src.sharding import ShardedEngine
+
+def run(drivers, grids, queries, pings, k, batch, seed):
+    rng = random.Random(seed)
+    fleet = [(f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(drivers)]
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(queries)]
+    moves = [(f"D{rng.randrange(drivers)}", (rng.uniform(0, 100), rng.uniform(0, 100))) for _ in range(pings)]
+
+    print(f"{drivers:,} drivers, {queries:,} kNN queries (k={k}), {pings:,} pings, batch {batch}, "
+          f"{os.cpu_count()} cores")
+    print(f"{'setup':<12} {'workers':>7} {'queries/s':>10} {'pings/s':>10}")
+
+    tree = RTree(max_entries=16)
+    tree.bulk_load((coords, d_id) for d_id, coords in fleet)
+    start = time.perf_counter()
+    for x, y in points:
+        tree.nearest(x, y, k)
+    query_rate = queries / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for d_id, coords in moves:
+        tree.update(d_id, coords)
+    print(f"{'single RTree':<12} {1:>7} {query_rate:>10,.0f} {pings / (time.perf_counter() - start):>10,.0f}")
+
+    for cols, rows in grids:
+        with ShardedEngine(grid=(cols, rows)) as sharded:
+            sharded.add_drivers(fleet)
+            sharded.shard_sizes()  # wait until every shard has loaded
+            start = time.perf_counter()
+            for lo in range(0, queries, batch):
+                sharded.nearest_many(points[lo:lo + batch], k)
+            query_rate = queries / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for lo in range(0, pings, batch):
+                sharded.update_many(moves[lo:lo + batch])
+            sharded.shard_sizes()  # updates are asynchronous; this waits for them to finish
+            ping_rate = pings / (time.perf_counter() - start)
+        print(f"{f'{cols}x{rows} grid':<12} {cols * rows:>7} {query_rate:>10,.0f} {ping_rate:>10,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=200000)
+    parser.add_argument("--grids", nargs="+", default=["1x1", "2x1", "2x2", "4x2"])
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--pings", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    grids = [tuple(int(v) for v in g.split("x")) for g in args.grids]
+    run(args.drivers, grids, args.queries, args.pings, args.k, args.batch, args.seed)
+
+if __name__ == "__main__":
+    main()
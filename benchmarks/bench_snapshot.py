@@ -0,0 +1,84 @@
+"""
+Engine cold start: rebuilding from JSON vs. loading a binary snapshot.
+
+Run from the repository root:
+    python -m benchmarks.bench_snapshot --drivers 1000000 --locations 100000
+
+The JSON path is what app.py did per session: parse a mock_data.json-style
+file, insert every location, then bulk-load the drivers. The snapshot path
+maps the file written by save_snapshot(); its layers are thawed on first
+use, so the time to the first dispatch and to the first typo correction
+are reported separately.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import datasets
+from src.engine import LogisticsEngine
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def from_json(path):
+    with open(path) as f:
+        data = json.load(f)
+    engine = LogisticsEngine()
+    for loc in data["locations"]:
+        engine.add_location(loc)
+    engine.add_drivers((d["id"], tuple(d["coords"])) for d in data["drivers"])
+    return engine
+
+def run(drivers, locations, blacklist, seed):
+    rng = random.Random(seed)
+    names = datasets.location_names(locations, seed)
+    data = {"drivers": [{"id": d_id, "coords": [round(x, 2), round(y, 2)]} for d_id, (x, y) in
+                        zip(datasets.driver_ids(drivers), datasets.driver_positions(drivers, "clustered", seed))],
+            "locations": names}
+    request = ("customer", rng.choice(names), (50.0, 50.0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "mock_data.json")
+        snapshot_path = os.path.join(tmp, "engine.snapshot")
+        with open(json_path, "w") as f:
+            json.dump(data, f)
+        del data
+
+        engine, json_s = timed(lambda: from_json(json_path))
+        for user_id in datasets.blacklist_ids(blacklist, seed):
+            engine.blacklist_user(user_id)
+        expected = engine.find_best_driver(*request)
+        _, save_s = timed(lambda: engine.save_snapshot(snapshot_path))
+        del engine
+
+        restored, load_s = timed(lambda: LogisticsEngine.load_snapshot(snapshot_path))
+        result, dispatch_s = timed(lambda: restored.find_best_driver(*request))
+        assert result == expected
+        _, typo_s = timed(lambda: restored.correct_location(request[1][:-1]))
+
+        mb = lambda path: os.path.getsize(path) / 1e6
+        print(f"{drivers:,} drivers, {locations:,} locations, {blacklist:,} blacklisted IDs")
+        print(f"{'JSON rebuild':<28} {json_s:>8.2f} s   ({mb(json_path):.0f} MB file)")
+        print(f"{'save_snapshot':<28} {save_s:>8.2f} s   ({mb(snapshot_path):.0f} MB file)")
+        print(f"{'load_snapshot':<28} {load_s * 1000:>8.1f} ms")
+        print(f"{'+ first dispatch (R-Tree)':<28} {dispatch_s:>8.2f} s")
+        print(f"{'+ first typo fix (Radix)':<28} {typo_s:>8.2f} s")
+        print(f"{'snapshot total':<28} {load_s + dispatch_s + typo_s:>8.2f} s   "
+              f"({json_s / (load_s + dispatch_s + typo_s):.1f}x faster)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=1000000)
+    parser.add_argument("--locations", type=int, default=100000)
+    parser.add_argument("--blacklist", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.drivers, args.locations, args.blacklist, args.seed)
+
+if __name__ == "__main__":
+    main()
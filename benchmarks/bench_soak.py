@@ -0,0 +1,56 @@
+"""
+Dispatch soak test: memory must stay flat however many requests are served.
+
+Run from the repository root:
+    python -m benchmarks.bench_soak --requests 1000000
+
+Prints resident memory and the ranking heap size at regular checkpoints.
+"""
+import argparse
+import gc
+import random
+import resource
+import sys
+import time
+
+from src.engine import LogisticsEngine
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return rss_mb()
+
+def run(requests, drivers, checkpoints, seed):
+    rng = random.Random(seed)
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_drivers((f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(drivers))
+    gc.collect()
+
+    print(f"{'requests':>10} {'rss MB':>8} {'heap size':>9} {'req/s':>8}")
+    every = max(1, requests // checkpoints)
+    start = time.perf_counter()
+    for n in range(1, requests + 1):
+        engine.find_best_driver(f"user_{n}", "Downtown", (rng.uniform(0, 100), rng.uniform(0, 100)))
+        if n % every == 0:
+            rate = n / (time.perf_counter() - start)
+            print(f"{n:>10} {current_rss_mb():>8.1f} {len(engine.routing_priority):>9} {rate:>8.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--drivers", type=int, default=10000)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.requests, args.drivers, args.checkpoints, args.seed)
+
+if __name__ == "__main__":
+    main()
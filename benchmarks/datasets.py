@@ -0,0 +1,51 @@
+"""
+Synthetic datasets for the benchmark suite, from 10^3 to 10^7 records.
+
+Drivers live on the same 100x100 plane as data/mock_data.json, either
+spread uniformly or clustered around a few city centres (most real fleets
+look like the latter: dense downtowns, empty countryside).
+"""
+import random
+
+DISTRIBUTIONS = ("uniform", "clustered")
+
+def driver_positions(n, distribution="uniform", seed=0, cities=8, spread=5.0):
+    """List of n (x, y) positions."""
+    rng = random.Random(seed)
+    if distribution == "uniform":
+        return [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(n)]
+    if distribution != "clustered":
+        raise ValueError(f"unknown distribution '{distribution}'")
+    centres = [(rng.uniform(10, 90), rng.uniform(10, 90)) for _ in range(cities)]
+    # City sizes follow a rough power law: the largest city holds most drivers
+    weights = [1 / (i + 1) for i in range(cities)]
+    points = []
+    for cx, cy in rng.choices(centres, weights, k=n):
+        points.append((min(100.0, max(0.0, rng.gauss(cx, spread))),
+                       min(100.0, max(0.0, rng.gauss(cy, spread)))))
+    return points
+
+def query_points(n, distribution="uniform", seed=0):
+    """Customer positions, drawn from the same distribution as the drivers."""
+    return driver_positions(n, distribution, seed + 1)
+
+def driver_ids(n):
+    return [f"Driver_{i}" for i in range(n)]
+
+def blacklist_ids(n, seed=0):
+    rng = random.Random(seed)
+    return [f"user_{rng.getrandbits(48):012x}" for _ in range(n)]
+
+STREETS = ["North", "South", "East", "West", "Main", "Oak", "Pine", "Maple", "Cedar", "Elm",
+           "Lake", "Hill", "River", "Park", "Church", "Market", "Station", "Mill", "King", "Queen"]
+SUFFIXES = ["Street", "Avenue", "Road", "Lane", "Boulevard", "Drive", "Court", "Place"]
+
+def location_names(n, seed=0):
+    """n distinct address-like names, e.g. "Maple Drive 1042 (District 7)"."""
+    rng = random.Random(seed)
+    names = []
+    districts = max(1, n // 100000)
+    for i in range(n):
+        # The index keeps names unique without a set of everything generated so far
+        names.append(f"{rng.choice(STREETS)} {rng.choice(SUFFIXES)} {i} (District {rng.randrange(districts)})")
+    return names
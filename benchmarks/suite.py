@@ -0,0 +1,244 @@
+"""
+Benchmark suite: every layer plus end-to-end dispatch, written to JSON.
+
+Run from the repository root:
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json   # exit 1 on regression
+    python -m benchmarks.suite --sizes 1000 10000 --save-baseline benchmarks/baseline.json
+
+For each size (drivers = blacklist IDs = heap entries; locations are
+size / 10) and each distribution, every benchmark runs in a fresh process,
+so its peak RSS is its own. Each one times `--ops` individual calls and
+reports p50/p99 latency, throughput and peak RSS, taking the median of
+`--repeat` runs to damp noise from other load on the machine. Sizes up
+to 10^7 work but need several GB of memory and minutes per case.
+
+A result regresses when its throughput drops, or its p99 latency rises,
+by more than the tolerance relative to the baseline entry with the same
+benchmark, size and distribution. Baselines only compare well on the
+machine that recorded them: regenerate benchmarks/baseline.json on the
+CI runner rather than reusing one from a laptop.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+
+from benchmarks import datasets
+from src.bloom_filter import BloomFilter
+from src.engine import LogisticsEngine
+from src.fibonacci_heap import FibonacciHeap
+from src.r_tree import RTree
+from src.radix_tree import RadixTree
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def timed(calls):
+    """Runs each zero-argument callable once; returns per-call latencies in ns and total seconds."""
+    clock = time.perf_counter_ns
+    latencies = []
+    start = clock()
+    for call in calls:
+        t0 = clock()
+        call()
+        latencies.append(clock() - t0)
+    return latencies, (clock() - start) / 1e9
+
+def summarize(latencies, total_s):
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1000
+    return {"ops": len(latencies), "ops_per_sec": len(latencies) / total_s,
+            "p50_us": pick(0.50), "p99_us": pick(0.99)}
+
+# --- Benchmarks (each returns {name: (latencies, total_s)} plus build time) ---
+
+def bench_bloom_filter(n, distribution, ops, seed):
+    ids = datasets.blacklist_ids(n, seed)
+    start = time.perf_counter()
+    bf = BloomFilter(expected_elements=n, false_positive_rate=0.01)
+    bf.add_many(ids)
+    build_s = time.perf_counter() - start
+    rng = random.Random(seed)
+    # Half blacklisted, half clean IDs
+    probes = [rng.choice(ids) if i % 2 else f"clean_{i}" for i in range(ops)]
+    return {"bloom_filter.check": timed(lambda p=p: bf.check(p) for p in probes)}, build_s
+
+def bench_radix_tree(n, distribution, ops, seed):
+    names = datasets.location_names(max(10, n // 10), seed)
+    start = time.perf_counter()
+    tree = RadixTree()
+    for name in names:
+        tree.insert(name)
+    build_s = time.perf_counter() - start
+    rng = random.Random(seed)
+    probes = [rng.choice(names) if i % 2 else rng.choice(names) + "x" for i in range(ops)]
+    return {"radix_tree.search": timed(lambda p=p: tree.search(p) for p in probes)}, build_s
+
+def bench_r_tree(n, distribution, ops, seed):
+    points = datasets.driver_positions(n, distribution, seed)
+    start = time.perf_counter()
+    tree = RTree(max_entries=16)
+    tree.bulk_load((p, i) for i, p in enumerate(points))
+    build_s = time.perf_counter() - start
+    queries = datasets.query_points(ops, distribution, seed)
+    # Radius that holds ~10 drivers on average at uniform density
+    radius = (10 * 100 * 100 / (3.14159 * n)) ** 0.5
+    new_points = datasets.driver_positions(ops, distribution, seed + 2)
+    return {
+        "r_tree.insert": timed(lambda p=p, i=i: tree.insert(p, n + i) for i, p in enumerate(new_points)),
+        "r_tree.search": timed(lambda q=q: tree.search(q[0], q[1], radius) for q in queries),
+        "r_tree.nearest": timed(lambda q=q: tree.nearest(q[0], q[1], 5) for q in queries),
+    }, build_s
+
+def bench_fibonacci_heap(n, distribution, ops, seed):
+    rng = random.Random(seed)
+    heap = FibonacciHeap()
+    start = time.perf_counter()
+    for i in range(n):
+        heap.insert(rng.random() * 1000, i)
+    build_s = time.perf_counter() - start
+    new_keys = [rng.random() * 1000 for _ in range(ops)]
+    results = {"fibonacci_heap.insert": timed(lambda i=i, k=k: heap.insert(k, n + i) for i, k in enumerate(new_keys))}
+    # A first extract_min consolidates the root list, like a real search would
+    heap.extract_min()
+    targets = [rng.randrange(n) for _ in range(ops)]
+
+    def decrease(value):
+        node = heap.handle(value)
+        if node is not None:
+            heap.decrease_key(node, node.key * 0.5)
+
+    results["fibonacci_heap.decrease_key"] = timed(lambda v=v: decrease(v) for v in targets)
+    results["fibonacci_heap.extract_min"] = timed(heap.extract_min for _ in range(min(ops, len(heap))))
+    return results, build_s
+
+def bench_engine(n, distribution, ops, seed):
+    points = datasets.driver_positions(n, distribution, seed)
+    names = datasets.location_names(max(10, n // 10), seed)
+    start = time.perf_counter()
+    engine = LogisticsEngine()
+    engine.add_drivers(zip(datasets.driver_ids(n), points))
+    for name in names:
+        engine.add_location(name)
+    for user_id in datasets.blacklist_ids(n, seed):
+        engine.blacklist_user(user_id)
+    build_s = time.perf_counter() - start
+    rng = random.Random(seed)
+    queries = datasets.query_points(ops, distribution, seed)
+    requests = [(f"customer_{i}", rng.choice(names), q) for i, q in enumerate(queries)]
+    return {"engine.find_best_driver": timed(lambda r=r: engine.find_best_driver(*r) for r in requests)}, build_s
+
+BENCHMARKS = {
+    "bloom_filter": bench_bloom_filter,
+    "radix_tree": bench_radix_tree,
+    "r_tree": bench_r_tree,
+    "fibonacci_heap": bench_fibonacci_heap,
+    "engine": bench_engine,
+}
+
+def run_case(layer, n, distribution, ops, seed):
+    """Runs one layer's benchmarks (in a child process) and returns JSON-ready records."""
+    timings, build_s = BENCHMARKS[layer](n, distribution, ops, seed)
+    rss = peak_rss_mb()
+    records = []
+    for name, (latencies, total_s) in timings.items():
+        record = {"benchmark": name, "size": n, "distribution": distribution, "build_s": build_s,
+                  "peak_rss_mb": rss}
+        record.update(summarize(latencies, total_s))
+        records.append(record)
+    return records
+
+def median_of(runs):
+    """Merges repeated runs of one case: median timings, worst memory."""
+    merged = []
+    for records in zip(*runs):
+        record = dict(records[0])
+        for field in ("ops_per_sec", "p50_us", "p99_us", "build_s"):
+            record[field] = statistics.median(r[field] for r in records)
+        record["peak_rss_mb"] = max(r["peak_rss_mb"] for r in records)
+        merged.append(record)
+    return merged
+
+def run(sizes, distributions, layers, ops, seed, repeat=3):
+    results = []
+    print(f"{'benchmark':<28} {'size':>10} {'distribution':<12} {'ops/s':>12} {'p50 us':>9} "
+          f"{'p99 us':>9} {'rss MB':>8}")
+    for n in sizes:
+        for distribution in distributions:
+            for layer in layers:
+                # A fresh process per run keeps each peak RSS separate
+                runs = []
+                for _ in range(repeat):
+                    with multiprocessing.get_context().Pool(1, maxtasksperchild=1) as pool:
+                        runs.append(pool.apply(run_case, (layer, n, distribution, ops, seed)))
+                records = median_of(runs)
+                for r in records:
+                    print(f"{r['benchmark']:<28} {n:>10,} {distribution:<12} {r['ops_per_sec']:>12,.0f} "
+                          f"{r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['peak_rss_mb']:>8.0f}")
+                results.extend(records)
+    return results
+
+def compare(results, baseline, tolerance, p99_tolerance):
+    """Regressions of `results` against `baseline`, as printable strings."""
+    key = lambda r: (r["benchmark"], r["size"], r["distribution"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get(key(r))
+        if old is None:
+            continue
+        label = f"{r['benchmark']} size={r['size']:,} {r['distribution']}"
+        if r["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {old['ops_per_sec']:,.0f} -> {r['ops_per_sec']:,.0f} ops/s")
+        if r["p99_us"] > old["p99_us"] * (1 + p99_tolerance):
+            regressions.append(f"{label}: p99 {old['p99_us']:.1f} -> {r['p99_us']:.1f} us")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--distributions", nargs="+", choices=datasets.DISTRIBUTIONS,
+                        default=list(datasets.DISTRIBUTIONS))
+    parser.add_argument("--layers", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--ops", type=int, default=5000, help="timed calls per benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; medians are reported")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="write results to this JSON file as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="allowed throughput drop (0.35 = 35%%)")
+    parser.add_argument("--p99-tolerance", type=float, default=1.0, help="allowed p99 rise (1.0 = 2x)")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.distributions, args.layers, args.ops, args.seed, args.repeat)
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "machine": platform.machine(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "ops": args.ops, "repeat": args.repeat, "seed": args.seed},
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.p99_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
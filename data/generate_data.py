@@ -1,5 +1,8 @@
+import argparse
 import json
 import random
+import sys
+import time
 
 def generate_logistics_data(num_drivers=50, num_locations=20):
     data = {
@@ -23,5 +26,72 @@ def generate_logistics_data(num_drivers=50, num_locations=20):
         json.dump(data, f, indent=4)
     print("✅ Created data/mock_data.json with 50 drivers and 30 locations.")
 
+def generate_road_network(width=50, height=50, path="data/road_network.txt", one_way_share=0.05, seed=None):
+    """
+    Writes a grid city covering the same 100x100 plane as the drivers.
+    Each street's travel time is its length times a random congestion
+    factor (1.0 = free flow); a small share of streets is one-way.
+    """
+    rng = random.Random(seed)
+    spacing_x = 100 / (width - 1)
+    spacing_y = 100 / (height - 1)
+    node = lambda i, j: i * height + j
+
+    with open(path, "w") as f:
+        f.write(f"# Grid city {width}x{height}: v <id> <x> <y>, e <a> <b> <time> (two-way), a <from> <to> <time>\n")
+        for i in range(width):
+            for j in range(height):
+                f.write(f"v {node(i, j)} {i * spacing_x:.4f} {j * spacing_y:.4f}\n")
+        for i in range(width):
+            for j in range(height):
+                for di, dj, length in ((1, 0, spacing_x), (0, 1, spacing_y)):
+                    if i + di < width and j + dj < height:
+                        kind = "a" if rng.random() < one_way_share else "e"
+                        time = length * rng.uniform(1.0, 3.0)
+                        f.write(f"{kind} {node(i, j)} {node(i + di, j + dj)} {time:.4f}\n")
+    print(f"✅ Created {path} with {width * height} junctions.")
+
+def generate_ping_stream(num_drivers=50, rate=1000.0, count=None, out=None, seed=None):
+    """
+    Writes an endless (or `count`-long) stream of GPS pings, one
+    "driver_id x y timestamp" line each, paced to `rate` pings per second
+    (rate=0: as fast as possible). Drivers random-walk over the 100x100 grid
+    and reuse the Driver_NNN IDs of mock_data.json.
+    """
+    rng = random.Random(seed)
+    out = out or sys.stdout
+    positions = [[rng.uniform(0, 100), rng.uniform(0, 100)] for _ in range(num_drivers)]
+    start = time.time()
+    sent = 0
+    while count is None or sent < count:
+        i = rng.randrange(num_drivers)
+        pos = positions[i]
+        pos[0] = min(100.0, max(0.0, pos[0] + rng.gauss(0, 0.5)))
+        pos[1] = min(100.0, max(0.0, pos[1] + rng.gauss(0, 0.5)))
+        # Timestamps follow the configured rate even when not pacing in real time
+        timestamp = start + (sent / rate if rate else time.time() - start)
+        out.write(f"Driver_{i:03d} {pos[0]:.4f} {pos[1]:.4f} {timestamp:.3f}\n")
+        sent += 1
+        if rate and sent % 100 == 0:
+            out.flush()
+            ahead = start + sent / rate - time.time()
+            if ahead > 0:
+                time.sleep(ahead)
+    out.flush()
+
 if __name__ == "__main__":
-    generate_logistics_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mock data for the GeoStream engine.")
+    parser.add_argument("--ping-stream", action="store_true",
+                        help="write GPS pings to stdout instead of creating mock_data.json")
+    parser.add_argument("--drivers", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=1000.0, help="pings per second, 0 = unthrottled")
+    parser.add_argument("--count", type=int, default=None, help="stop after this many pings")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.ping_stream:
+        try:
+            generate_ping_stream(args.drivers, args.rate, args.count, seed=args.seed)
+        except (BrokenPipeError, KeyboardInterrupt):
+            pass
+    else:
+        generate_logistics_data()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import math
+
+from .fibonacci_heap import FibonacciHeap
+
+def min_cost_assignment(costs):
+    """
+    Sparse min-cost bipartite assignment (Hungarian method with
+    successive shortest paths and Dijkstra on reduced costs).
+
+    `costs` has one dict per row (e.g. per customer) mapping each allowed
+    column key (e.g. driver ID) to a non-negative cost. Missing pairs are
+    not allowed. Returns, per row, the assigned column key or None.
+
+    As many rows as possible are matched, and among such matchings the
+    total cost is minimal. Each augmentation is O(E log V) on the sparse
+    candidate graph, so a batch costs O(R * E log V).
+    """
+    rows = len(costs)
+    col_keys = []
+    col_index = {}
+    adj = []  # row -> [(col, cost)]
+    for row_costs in costs:
+        edges = []
+        for key, cost in row_costs.items():
+            if key not in col_index:
+                col_index[key] = len(col_keys)
+                col_keys.append(key)
+            edges.append((col_index[key], cost))
+        adj.append(edges)
+
+    # Every row also gets a private "unassigned" column priced above any real
+    # matching, so minimising cost first maximises the number of real matches
+    penalty = 1.0 + sum(max(row_costs.values(), default=0.0) for row_costs in costs)
+    real_cols = len(col_keys)
+    for row, edges in enumerate(adj):
+        edges.append((real_cols + row, penalty))
+    cols = real_cols + rows
+    # Graph nodes: rows are 0..rows-1, columns are rows..rows+cols-1
+    potential = [0.0] * (rows + cols)
+    match_row = [None] * rows   # row -> col
+    match_col = [None] * cols   # col -> row
+
+    for start in range(rows):
+        dist, parent, free_col = _shortest_augmenting_path(start, rows, adj, potential, match_col)
+
+        # Keep every reduced cost non-negative for the next Dijkstra
+        bound = dist[rows + free_col]
+        for node, d in dist.items():
+            if d < bound:
+                potential[node] += d - bound
+        # Flip the alternating path: walk back from the free column to `start`
+        col = free_col
+        while col is not None:
+            row = parent[col]
+            next_col = match_row[row]
+            match_row[row], match_col[col] = col, row
+            col = next_col if row != start else None
+
+    return [col_keys[c] if c < real_cols else None for c in match_row]
+
+def _shortest_augmenting_path(start, rows, adj, potential, match_col):
+    """
+    Dijkstra over the residual graph from a free row: unmatched edges go
+    row -> column with reduced cost, matched edges go column -> row at cost 0.
+    Stops at the first free column settled.
+    """
+    heap = FibonacciHeap()
+    dist = {start: 0.0}
+    parent = {}  # col -> row it was reached from
+    settled = set()
+    heap.insert(0.0, start)
+    try:
+        while len(heap):
+            node = heap.extract_min()
+            u, d = node.value, node.key
+            settled.add(u)
+            if u >= rows:
+                col = u - rows
+                row = match_col[col]
+                if row is None:
+                    return dist, parent, col
+                # Matched edges are tight, so the partner row costs nothing extra
+                if row not in dist:
+                    dist[row] = d
+                    heap.insert(d, row)
+                continue
+            for col, cost in adj[u]:
+                v = rows + col
+                if v in settled:
+                    continue
+                nd = d + cost + potential[u] - potential[v]
+                old = dist.get(v, math.inf)
+                if nd < old:
+                    dist[v] = nd
+                    parent[col] = u
+                    if v in heap:
+                        heap.decrease_key(heap.handles[v], nd)
+                    else:
+                        heap.insert(nd, v)
+    finally:
+        heap.clear()
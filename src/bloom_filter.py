@@ -1,42 +1,99 @@
 import math
 import hashlib
+import mmap as _mmap
+import os
+import struct
+
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+# Set bits in each byte value, for popcounts on NumPy < 2.0 (no np.bitwise_count)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _popcount(buffer):
+    """Number of set bits in a bytes-like buffer, without copying it into a Python int."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if not hasattr(np, "bitwise_count"):
+        return int(_POPCOUNT[data].sum(dtype=np.int64))
+    words = len(data) // 8
+    # Eight bytes at a time, then the leftover tail
+    return int(np.bitwise_count(data[:words * 8].view(np.uint64)).sum(dtype=np.int64)) + \
+        int(np.bitwise_count(data[words * 8:]).sum(dtype=np.int64))
 
 class BloomFilter:
     """
     A probabilistic data structure for set membership testing.
-    Standard list-based 'bit array' implementation for educational clarity.
+    Bits are packed eight to a byte in a bytearray, and the k probe
+    positions come from one 128-bit BLAKE2b digest split into two 64-bit
+    halves (Kirsch-Mitzenmacher double hashing: g_i = h1 + i * h2).
+
+    save() writes a versioned binary file that open() can memory-map
+    read-only, so many processes share one large blacklist without copies.
     """
+    MAGIC = b"GSBF"
+    VERSION = 1
+    HASH_SCHEME = 1  # BLAKE2b-128 split into h1, h2 (h2 forced odd), g_i = (h1 + i*h2) mod 2^64 mod m
+    SLOT_BITS = 1    # bits per slot in the stored array
+    # magic, version, hash scheme, slot bits, m, k, expected elements, count, target FP rate, array bytes
+    HEADER = struct.Struct("<4sHBBQQQQdQ")
+
     def __init__(self, expected_elements: int, false_positive_rate: float):
         # Parameters for the filter size and hash count
         self.n = expected_elements
         self.p = false_positive_rate
-        
+
         # Calculate optimal bit array size (m) and hash functions (k)
         # Formula: m = -(n * ln(p)) / (ln(2)^2)
-        self.m = int(-(self.n * math.log(self.p)) / (math.log(2) ** 2))
-        
+        self.m = max(8, int(-(self.n * math.log(self.p)) / (math.log(2) ** 2)))
+
         # Formula: k = (m/n) * ln(2)
-        self.k = int((self.m / self.n) * math.log(2))
-        
-        # Initialize bit array as a list of Booleans
-        self.bit_array = [False] * self.m
+        self.k = max(1, int((self.m / self.n) * math.log(2)))
+
+        self._init_storage()
+        # Number of add() calls, used to estimate the current false positive rate
+        self.count = 0
+        self.readonly = False
+        self._mmap = None
+        self._source = None  # (path, inode, mtime_ns) of the file it was opened from
+
+    def _init_storage(self):
+        # Packed bit array: bit i lives in byte i >> 3 at position i & 7
+        self.bit_array = bytearray((self.m + 7) // 8)
+
+    def _storage(self):
+        return self.bit_array
+
+    def _set_storage(self, buffer):
+        self.bit_array = buffer
+
+    def _storage_bytes(self):
+        return len(self._storage())
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError("filter was opened read-only; rebuild and save() a new file instead")
+
+    @staticmethod
+    def _digest(item: str):
+        """Returns (h1, h2) from a single 128-bit BLAKE2b digest of the item."""
+        # Hashed by text, so any ID works and 123 matches "123" (as the f-string hash did)
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=16).digest()
+        # h2 is forced odd so the probe sequence never collapses onto one bit
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
 
     def _get_hashes(self, item: str):
-        """Generates k different indices for an item using seeded hashing."""
-        indices = []
-        for i in range(self.k):
-            # Use SHA-256 and append a seed 'i' to get different hash values
-            hash_input = f"{item}{i}".encode('utf-8')
-            digest = hashlib.sha256(hash_input).hexdigest()
-            # Map hash to bit array index
-            index = int(digest, 16) % self.m
-            indices.append(index)
-        return indices
+        """Generates k indices for an item by double hashing one digest."""
+        h1, h2 = self._digest(item)
+        m = self.m
+        return [((h1 + i * h2) & _MASK64) % m for i in range(self.k)]
 
     def add(self, item: str):
-        """Adds an item to the filter by setting bits at k indices to True."""
+        """Adds an item to the filter by setting its k bits."""
+        self._check_writable()
+        bits = self.bit_array
         for index in self._get_hashes(item):
-            self.bit_array[index] = True
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
 
     def check(self, item: str) -> bool:
         """
@@ -44,15 +101,341 @@ class BloomFilter:
         Returns False: Definitely not in the set.
         Returns True: Probably in the set (might be a false positive).
         """
+        bits = self.bit_array
         for index in self._get_hashes(item):
-            if not self.bit_array[index]:
+            if not bits[index >> 3] & (1 << (index & 7)):
                 return False
         return True
 
+    def _batch_indices(self, items):
+        """(len(items), k) array of bit indices; same values as _get_hashes."""
+        pairs = np.array([self._digest(item) for item in items], dtype=np.uint64).reshape(-1, 2)
+        steps = np.arange(self.k, dtype=np.uint64)
+        # uint64 arithmetic wraps modulo 2^64, exactly like the masking in _get_hashes
+        return (pairs[:, :1] + steps * pairs[:, 1:]) % np.uint64(self.m)
+
+    def add_many(self, items):
+        """Adds a batch of items; hashing is per item, bit updates are vectorized."""
+        self._check_writable()
+        items = list(items)
+        if not items:
+            return
+        indices = self._batch_indices(items).ravel()
+        bits = np.frombuffer(self.bit_array, dtype=np.uint8)
+        np.bitwise_or.at(bits, indices >> np.uint64(3), np.left_shift(1, indices & np.uint64(7)).astype(np.uint8))
+        del bits  # release the buffer export so the bytearray stays resizable
+        self.count += len(items)
+
+    def check_many(self, items):
+        """Checks a batch of items, returning one bool per item."""
+        items = list(items)
+        if not items:
+            return []
+        indices = self._batch_indices(items)
+        bits = np.frombuffer(self.bit_array, dtype=np.uint8)
+        hit = (bits[indices >> np.uint64(3)] >> (indices & np.uint64(7)).astype(np.uint8)) & 1
+        return hit.all(axis=1).tolist()
+
+    def fill_ratio(self):
+        """Share of bits currently set."""
+        return _popcount(self.bit_array) / self.m
+
+    def estimated_false_positive_rate(self):
+        """(1 - e^(-k*n/m))^k for the number of items added so far."""
+        return (1 - math.exp(-self.k * self.count / self.m)) ** self.k
+
     def get_stats(self):
         """Returns metadata for the discrete math report."""
         return {
             "size_bits": self.m,
+            "size_bytes": self._storage_bytes(),
             "hash_functions": self.k,
-            "false_positive_rate": self.p
-        }
\ No newline at end of file
+            "false_positive_rate": self.p,
+            "elements_added": self.count,
+            "estimated_false_positive_rate": self.estimated_false_positive_rate(),
+        }
+
+    # --- Binary file ---------------------------------------------------
+
+    def save(self, path):
+        """
+        Writes the header and raw slot array to `path`. The file is written
+        under a temporary name and then renamed over `path`, so readers see
+        either the old filter or the new one, never a half-written file.
+        """
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            self._write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _write(self, f):
+        """Header and slot array, at the current position of binary file `f`."""
+        f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.HASH_SCHEME, self.SLOT_BITS,
+                                 self.m, self.k, self.n, self.count, self.p, self._storage_bytes()))
+        f.write(self._storage())
+
+    @classmethod
+    def open(cls, path, mmap=True):
+        """
+        Opens a filter written by save(). With mmap=True the slot array is
+        mapped read-only: opening is O(1) whatever the filter size, pages are
+        shared between processes through the OS page cache, and add() raises.
+        With mmap=False the array is read into memory and stays writable.
+        """
+        with open(path, "rb") as f:
+            if mmap and os.fstat(f.fileno()).st_size:
+                mapping = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+                bf = cls._from_buffer(memoryview(mapping), path, copy=False)
+                bf._mmap = mapping
+            else:
+                bf = cls._from_buffer(memoryview(f.read()), path, copy=True)
+            st = os.fstat(f.fileno())
+            bf._source = (path, st.st_ino, st.st_mtime_ns)
+        return bf
+
+    @classmethod
+    def _from_buffer(cls, buffer, name, copy):
+        """
+        Filter stored at the start of `buffer` (as written by _write). With
+        copy=False the slots stay a read-only view into the buffer.
+        """
+        header = bytes(buffer[:cls.HEADER.size])
+        if len(header) < cls.HEADER.size:
+            raise ValueError(f"{name} is not a Bloom filter file")
+        magic, version, scheme, slot_bits, m, k, n, count, p, size = cls.HEADER.unpack(header)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{name} is not a Bloom filter file")
+        if version != cls.VERSION:
+            raise ValueError(f"{name} has unsupported version {version}")
+        if scheme != cls.HASH_SCHEME:
+            raise ValueError(f"{name} uses unknown hash scheme {scheme}")
+        if slot_bits != cls.SLOT_BITS:
+            raise ValueError(f"{name} holds {slot_bits}-bit slots, {cls.__name__} expects {cls.SLOT_BITS}")
+
+        bf = cls.__new__(cls)
+        bf.n, bf.p, bf.m, bf.k, bf.count = n, p, m, k, count
+        bf.readonly, bf._mmap, bf._source = not copy, None, None
+        slots = buffer[cls.HEADER.size:cls.HEADER.size + size]
+        bf._set_storage(bytearray(slots) if copy else slots)
+        if bf._storage_bytes() != size:
+            raise ValueError(f"{name} is truncated")
+        return bf
+
+    def is_stale(self):
+        """True if the file this filter was opened from has since been replaced."""
+        if self._source is None:
+            return False
+        path, ino, mtime_ns = self._source
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return (st.st_ino, st.st_mtime_ns) != (ino, mtime_ns)
+
+    def close(self):
+        """Unmaps a filter opened with mmap=True. It must not be used afterwards."""
+        if self._mmap is not None:
+            self._storage().release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    Bloom filter whose slots are 4-bit counters (two per byte) instead of
+    bits, so items can be removed again. A counter that reaches 15 sticks
+    there, so removals can never cause a false negative. Uses 4x the
+    memory of a plain BloomFilter with the same parameters.
+    """
+    MAX_COUNT = 15
+    SLOT_BITS = 4
+
+    def _init_storage(self):
+        # Counter i lives in byte i >> 1: low nibble for even i, high nibble for odd i
+        self.counters = bytearray((self.m + 1) // 2)
+
+    def _storage(self):
+        return self.counters
+
+    def _set_storage(self, buffer):
+        self.counters = buffer
+
+    def _counter(self, index):
+        return (self.counters[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+    def _set_counter(self, index, value):
+        shift = (index & 1) << 2
+        byte = index >> 1
+        self.counters[byte] = (self.counters[byte] & ~(0xF << shift) & 0xFF) | (value << shift)
+
+    def add(self, item: str):
+        self._check_writable()
+        for index in self._get_hashes(item):
+            value = self._counter(index)
+            if value < self.MAX_COUNT:
+                self._set_counter(index, value + 1)
+        self.count += 1
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item: str) -> bool:
+        """
+        Removes an item added earlier. Returns False (and changes nothing) if
+        the item is definitely not in the filter. Removing an item that was
+        never added but matches as a false positive corrupts the filter.
+        """
+        self._check_writable()
+        indices = self._get_hashes(item)
+        if not all(self._counter(index) for index in indices):
+            return False
+        for index in indices:
+            value = self._counter(index)
+            if value < self.MAX_COUNT:
+                self._set_counter(index, value - 1)
+        self.count -= 1
+        return True
+
+    def check(self, item: str) -> bool:
+        for index in self._get_hashes(item):
+            if not self._counter(index):
+                return False
+        return True
+
+    def check_many(self, items):
+        items = list(items)
+        if not items:
+            return []
+        indices = self._batch_indices(items)
+        counters = np.frombuffer(self.counters, dtype=np.uint8)
+        nibbles = (counters[indices >> np.uint64(1)] >> ((indices & np.uint64(1)) << np.uint64(2)).astype(np.uint8)) & 0xF
+        return (nibbles > 0).all(axis=1).tolist()
+
+    def fill_ratio(self):
+        """Share of counters that are non-zero."""
+        counters = np.frombuffer(self.counters, dtype=np.uint8)
+        nonzero = int(np.count_nonzero(counters & 0xF)) + int(np.count_nonzero(counters >> 4))
+        return nonzero / self.m
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats["counter_bits"] = 4
+        return stats
+
+class ScalableBloomFilter:
+    """
+    Scalable Bloom filter (Almeida et al. 2007): a chain of sub-filters.
+    When the newest one reaches its capacity, a larger one is appended
+    with a tighter error rate. The compound false positive rate stays
+    below `false_positive_rate` however many items are added.
+
+    Sub-filter i holds initial_capacity * growth^i items at error rate
+    p * (1 - tightening) * tightening^i, so the rates sum to at most p.
+    Pass filter_class=CountingBloomFilter to make items removable.
+    """
+    def __init__(self, initial_capacity: int, false_positive_rate: float,
+                 growth=2, tightening=0.5, filter_class=BloomFilter):
+        self.initial_capacity = initial_capacity
+        self.p = false_positive_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filter_class = filter_class
+        self.filters = []
+        self._add_filter()
+
+    def _add_filter(self):
+        i = len(self.filters)
+        # Whole items, even for a fractional growth factor (the file header stores an integer)
+        capacity = math.ceil(self.initial_capacity * self.growth ** i)
+        error = self.p * (1 - self.tightening) * self.tightening ** i
+        self.filters.append(self.filter_class(expected_elements=capacity, false_positive_rate=error))
+
+    @property
+    def m(self):
+        """Total bits (or counters) across all sub-filters."""
+        return sum(f.m for f in self.filters)
+
+    @property
+    def count(self):
+        return sum(f.count for f in self.filters)
+
+    def add(self, item: str):
+        """
+        Adds an item to the newest sub-filter. Plain filters skip items that
+        already match, since adding again would only waste capacity. Counting
+        filters always count the item: a match may be a false positive, and
+        a later remove() must only take back counts this item put there.
+        So every add() of a removable item needs its own remove().
+        """
+        removable = hasattr(self.filters[0], "remove")
+        if not removable and self.check(item):
+            return
+        current = self.filters[-1]
+        if current.count >= current.n:
+            self._add_filter()
+            current = self.filters[-1]
+        current.add(item)
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def check(self, item: str) -> bool:
+        # Newest filters hold the most items, so probe them first
+        for f in reversed(self.filters):
+            if f.check(item):
+                return True
+        return False
+
+    def check_many(self, items):
+        items = list(items)
+        found = [False] * len(items)
+        for f in self.filters:
+            pending = [i for i, hit in enumerate(found) if not hit]
+            if not pending:
+                break
+            for i, hit in zip(pending, f.check_many(items[i] for i in pending)):
+                found[i] = hit
+        return found
+
+    def remove(self, item: str) -> bool:
+        """
+        Removes an item; needs filter_class=CountingBloomFilter. add() stores
+        an item in exactly one sub-filter, but it may also match others as a
+        false positive. Decrementing the wrong sub-filter would unban other
+        items, so when more than one matches nothing is changed and False is
+        returned; rebuild the filter to lift such a ban. Removing an item that
+        was never added corrupts the filter just like
+        CountingBloomFilter.remove, so only remove what add() stored.
+        """
+        if not hasattr(self.filters[0], "remove"):
+            raise TypeError(f"{self.filter_class.__name__} does not support removal")
+        matches = [f for f in self.filters if f.check(item)]
+        if len(matches) != 1:
+            return False
+        return matches[0].remove(item)
+
+    def fill_ratio(self):
+        """Share of all bits (or counters) in use, weighted by sub-filter size."""
+        return sum(f.fill_ratio() * f.m for f in self.filters) / self.m
+
+    def estimated_false_positive_rate(self):
+        """1 - prod(1 - p_i) over the sub-filters' current estimates."""
+        clean = 1.0
+        for f in self.filters:
+            clean *= 1 - f.estimated_false_positive_rate()
+        return 1 - clean
+
+    def get_stats(self):
+        return {
+            "size_bits": self.m,
+            "size_bytes": sum(f._storage_bytes() for f in self.filters),
+            "sub_filters": len(self.filters),
+            "false_positive_rate": self.p,
+            "elements_added": self.count,
+            "estimated_false_positive_rate": self.estimated_false_positive_rate(),
+            "fill_ratio": self.fill_ratio(),
+        }
@@ -0,0 +1,99 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+class RWLock:
+    """
+    Readers-writer lock: any number of readers, or a single writer.
+
+    Waiting writers hold back new readers, so a steady stream of dispatch
+    lookups cannot starve GPS updates. The lock is re-entrant per thread:
+    a thread that holds the write lock may take either lock again, and a
+    reader may nest reads, but a reader may not upgrade to a writer.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    def _held(self):
+        """This thread's stack of held sections: "read", "write" or None (nested)."""
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = []
+        return held
+
+    def acquire_read(self):
+        held = self._held()
+        if held:
+            held.append(None)  # Already inside a section on this thread
+            return
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        held.append("read")
+
+    def release_read(self):
+        if self._held().pop() is None:
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        held = self._held()
+        if held:
+            if held[0] != "write":
+                raise RuntimeError("cannot upgrade a read lock to a write lock")
+            held.append(None)
+            return
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        held.append("write")
+
+    def release_write(self):
+        if self._held().pop() is None:
+            return
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+def reads(method):
+    """Runs a LogisticsEngine method under the engine's read lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read_locked():
+            return method(self, *args, **kwargs)
+    return locked
+
+def writes(method):
+    """Runs a LogisticsEngine method under the engine's write lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.write_locked():
+            return method(self, *args, **kwargs)
+    return locked
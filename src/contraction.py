@@ -0,0 +1,345 @@
+import heapq
+import math
+import struct
+import sys
+from array import array
+
+from .fibonacci_heap import FibonacciHeap
+from .r_tree import RTree
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy (Geisberger et al. 2008) over a RoadGraph.
+
+    Preprocessing contracts junctions one by one, from least to most
+    important. When removing a junction would break a shortest path, a
+    shortcut arc is added in its place. Queries then only ever climb to more
+    important junctions, so a bidirectional search settles a few hundred
+    nodes instead of most of the city.
+
+    It offers the same nearest_node / travel_times_to interface as
+    RoadGraph, so LogisticsEngine(road_graph=...) accepts either. It is
+    opt-in: the engine keeps routing on a plain RoadGraph unless handed a
+    hierarchy. So far it has only been measured on a 10k-junction grid
+    (see benchmarks/bench_contraction.py).
+    """
+    MAGIC = b"GSCH"
+    VERSION = 1
+    # magic, version, byte order ('<' or '>'), node count, upward arc count, downward arc count
+    HEADER = struct.Struct("<4sHcxQQQ")
+
+    def __init__(self, node_ids, xs, ys, up, down):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.xs, self.ys = array("d", xs), array("d", ys)
+        # Each is an (offsets, targets, weights) CSR triple of arcs towards higher-ranked nodes:
+        # `up` follows arcs forwards, `down` follows them backwards (used from the target side)
+        self.up_offsets, self.up_targets, self.up_weights = up
+        self.down_offsets, self.down_targets, self.down_weights = down
+        self._node_index = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def arc_count(self):
+        return len(self.up_targets) + len(self.down_targets)
+
+    # --- Preprocessing -------------------------------------------------
+
+    @classmethod
+    def build(cls, graph, witness_limit=64):
+        """
+        Contracts every junction of `graph`, cheapest first by edge difference
+        (shortcuts added minus arcs removed), re-evaluated lazily.
+        `witness_limit` caps how many nodes each witness search may settle:
+        lower is faster to build but may add unnecessary (still correct) shortcuts.
+        """
+        n = len(graph)
+        out_adj = [dict() for _ in range(n)]
+        in_adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for pos in range(graph.offsets[u], graph.offsets[u + 1]):
+                v, w = graph.targets[pos], graph.weights[pos]
+                if v != u and w < out_adj[u].get(v, math.inf):
+                    out_adj[u][v] = w
+                    in_adj[v][u] = w
+
+        contracted = bytearray(n)
+        deleted_neighbours = [0] * n
+        level = [0] * n  # depth in the hierarchy, keeps contraction spread out evenly
+        rank = [0] * n
+
+        def shortcuts_for(v, apply):
+            """Shortcuts needed to contract v; added to the graph when `apply` is set."""
+            count = 0
+            outgoing = [(x, w) for x, w in out_adj[v].items() if not contracted[x]]
+            if not outgoing:
+                return 0
+            for u, w_in in in_adj[v].items():
+                if contracted[u]:
+                    continue
+                limit = w_in + max(w for _, w in outgoing)
+                witness = cls._witness_search(out_adj, contracted, u, v, limit, witness_limit,
+                                              {x for x, _ in outgoing if x != u})
+                for x, w_out in outgoing:
+                    if x == u:
+                        continue
+                    via = w_in + w_out
+                    if witness.get(x, math.inf) <= via:
+                        continue
+                    count += 1
+                    if apply and via < out_adj[u].get(x, math.inf):
+                        out_adj[u][x] = via
+                        in_adj[x][u] = via
+            return count
+
+        def priority(v):
+            degree = sum(1 for x in out_adj[v] if not contracted[x]) + \
+                     sum(1 for u in in_adj[v] if not contracted[u])
+            # Edge difference, plus terms that spread contraction evenly across the city
+            return shortcuts_for(v, False) - degree + deleted_neighbours[v] + level[v]
+
+        current = [priority(v) for v in range(n)]
+        queue = [(p, v) for v, p in enumerate(current)]
+        heapq.heapify(queue)
+        next_rank = 0
+        while queue:
+            p, v = heapq.heappop(queue)
+            if contracted[v] or p != current[v]:
+                continue  # superseded by a newer entry
+            # Lazy update: priorities go stale as neighbours are contracted
+            current[v] = priority(v)
+            if queue and current[v] > queue[0][0]:
+                heapq.heappush(queue, (current[v], v))
+                continue
+            shortcuts_for(v, True)
+            contracted[v] = 1
+            rank[v] = next_rank
+            next_rank += 1
+            neighbours = {x for x in out_adj[v] if not contracted[x]} | {u for u in in_adj[v] if not contracted[u]}
+            for x in neighbours:
+                deleted_neighbours[x] += 1
+                level[x] = max(level[x], level[v] + 1)
+
+        up, down = [], []
+        for u in range(n):
+            for v, w in out_adj[u].items():
+                if rank[u] < rank[v]:
+                    up.append((u, v, w))
+                else:
+                    down.append((v, u, w))
+        return cls(graph.node_ids, graph.xs, graph.ys, cls._csr(n, up), cls._csr(n, down))
+
+    @staticmethod
+    def _witness_search(out_adj, contracted, source, skip, limit, settle_limit, goals):
+        """
+        Bounded Dijkstra from `source` that never passes through `skip`.
+        Stops once every node in `goals` is settled, `limit` is exceeded or
+        `settle_limit` nodes have been settled.
+        """
+        dist = {source: 0.0}
+        queue = [(0.0, source)]
+        settled = 0
+        pending = len(goals)
+        while queue and settled < settle_limit:
+            d, u = heapq.heappop(queue)
+            if d > dist[u]:
+                continue  # stale entry
+            if d > limit:
+                break
+            settled += 1
+            if u in goals:
+                pending -= 1
+                if not pending:
+                    break
+            for v, w in out_adj[u].items():
+                if v == skip or contracted[v]:
+                    continue
+                nd = d + w
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heapq.heappush(queue, (nd, v))
+        return dist
+
+    @staticmethod
+    def _csr(n, arcs):
+        arcs.sort()
+        offsets = array("q", [0]) * (n + 1)
+        for u, _, _ in arcs:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        return offsets, array("q", (v for _, v, _ in arcs)), array("d", (w for _, _, w in arcs))
+
+    # --- Binary file ---------------------------------------------------
+
+    def _columns(self):
+        return (self.xs, self.ys, self.up_offsets, self.up_targets, self.up_weights,
+                self.down_offsets, self.down_targets, self.down_weights)
+
+    def save(self, path):
+        """
+        Versioned binary file: fixed header, then the node ID table
+        (newline-separated UTF-8, length-prefixed), then the raw arrays.
+        """
+        ids = "\n".join(str(i) for i in self.node_ids).encode("utf-8")
+        byteorder = b"<" if sys.byteorder == "little" else b">"
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, byteorder,
+                                     len(self.node_ids), len(self.up_targets), len(self.down_targets)))
+            f.write(struct.pack("<Q", len(ids)))
+            f.write(ids)
+            for column in self._columns():
+                column.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, version, byteorder, n, n_up, n_down = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"{path} is not a contraction hierarchy file")
+            if version != cls.VERSION:
+                raise ValueError(f"{path} has unsupported version {version}")
+            (id_len,) = struct.unpack("<Q", f.read(8))
+            node_ids = f.read(id_len).decode("utf-8").split("\n") if n else []
+
+            def read(typecode, count):
+                column = array(typecode)
+                column.fromfile(f, count)
+                if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+                    column.byteswap()
+                return column
+
+            xs, ys = read("d", n), read("d", n)
+            up = (read("q", n + 1), read("q", n_up), read("d", n_up))
+            down = (read("q", n + 1), read("q", n_down), read("d", n_down))
+        return cls(node_ids, xs, ys, up, down)
+
+    # --- Queries -------------------------------------------------------
+
+    def nearest_node(self, x, y):
+        """Snaps an arbitrary position to the closest junction (internal index)."""
+        if self._node_index is None:
+            self._node_index = RTree(max_entries=16)
+            self._node_index.bulk_load(((self.xs[i], self.ys[i]), i) for i in range(len(self.node_ids)))
+        hit = self._node_index.nearest(x, y, 1)
+        return hit[0][2] if hit else None
+
+    def _graphs(self, forward):
+        """(arcs to relax, arcs used for stall-on-demand) for one search direction."""
+        up = (self.up_offsets, self.up_targets, self.up_weights)
+        down = (self.down_offsets, self.down_targets, self.down_weights)
+        return (up, down) if forward else (down, up)
+
+    @staticmethod
+    def _stalled(u, d, dist, stall):
+        """
+        Stall-on-demand: if a higher-ranked neighbour already reaches u more
+        cheaply, u's label cannot lie on a shortest path, so it is not expanded.
+        """
+        offsets, targets, weights = stall
+        for pos in range(offsets[u], offsets[u + 1]):
+            w = dist.get(targets[pos])
+            if w is not None and w + weights[pos] < d:
+                return True
+        return False
+
+    def _upward_search(self, source, forward):
+        """
+        Exhaustive search restricted to arcs towards higher-ranked nodes.
+        Returns the settled, non-stalled nodes with their distances.
+        """
+        (offsets, targets, weights), stall = self._graphs(forward)
+        heap = FibonacciHeap()
+        best = {source: 0.0}
+        settled = {}
+        heap.insert(0.0, source)
+        try:
+            while len(heap):
+                node = heap.extract_min()
+                u, d = node.value, node.key
+                if self._stalled(u, d, best, stall):
+                    continue
+                settled[u] = d
+                for pos in range(offsets[u], offsets[u + 1]):
+                    v = targets[pos]
+                    nd = d + weights[pos]
+                    old = best.get(v)
+                    if old is None:
+                        best[v] = nd
+                        heap.insert(nd, v)
+                    elif nd < old and v in heap:
+                        best[v] = nd
+                        heap.decrease_key(heap.handles[v], nd)
+        finally:
+            heap.clear()
+        return settled
+
+    def query(self, source, target):
+        """Travel time between two internal node indices (inf if unreachable)."""
+        if source == target:
+            return 0.0
+        heaps = (FibonacciHeap(), FibonacciHeap())
+        dists = ({source: 0.0}, {target: 0.0})
+        graphs = (self._graphs(True), self._graphs(False))
+        heaps[0].insert(0.0, source)
+        heaps[1].insert(0.0, target)
+        best = math.inf
+        try:
+            while True:
+                # Advance whichever frontier is closer; stop once neither can improve `best`
+                mins = [heap.peek().key if len(heap) else math.inf for heap in heaps]
+                i = 0 if mins[0] <= mins[1] else 1
+                if mins[i] >= best:
+                    break
+                heap, dist = heaps[i], dists[i]
+                (offsets, targets, weights), stall = graphs[i]
+                node = heap.extract_min()
+                u, d = node.value, node.key
+                other = dists[1 - i].get(u)
+                if other is not None and d + other < best:
+                    best = d + other
+                if self._stalled(u, d, dist, stall):
+                    continue
+                for pos in range(offsets[u], offsets[u + 1]):
+                    v = targets[pos]
+                    nd = d + weights[pos]
+                    old = dist.get(v)
+                    if old is None:
+                        dist[v] = nd
+                        heap.insert(nd, v)
+                    elif nd < old and v in heap:
+                        dist[v] = nd
+                        heap.decrease_key(heap.handles[v], nd)
+        finally:
+            heaps[0].clear()
+            heaps[1].clear()
+        return best
+
+    def many_to_many(self, sources, targets):
+        """
+        Travel-time table between internal node indices, table[i][j] for
+        sources[i] -> targets[j] (inf if unreachable). One backward search per
+        target fills buckets that the forward search from each source scans.
+        """
+        buckets = {}
+        for j, t in enumerate(targets):
+            for v, d in self._upward_search(t, forward=False).items():
+                buckets.setdefault(v, []).append((j, d))
+
+        table = []
+        for s in sources:
+            row = [math.inf] * len(targets)
+            for u, d in self._upward_search(s, forward=True).items():
+                for j, d_back in buckets.get(u, ()):
+                    if d + d_back < row[j]:
+                        row[j] = d + d_back
+            table.append(row)
+        return table
+
+    def travel_times_to(self, destination, sources):
+        """Travel time from each source node to `destination`; unreachable ones are omitted."""
+        sources = list(sources)
+        table = self.many_to_many(sources, [destination])
+        return {s: row[0] for s, row in zip(sources, table) if row[0] < math.inf}
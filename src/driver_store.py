@@ -0,0 +1,92 @@
+import numpy as np
+
+class DriverStore:
+    """
+    Columnar driver table: contiguous float64 x/y columns plus an ID column.
+    Removed drivers leave their slot on a free-list so it can be reused,
+    which keeps the columns dense and lets distances to hundreds of
+    candidates be computed in a single vectorized pass.
+    """
+    def __init__(self, capacity=1024):
+        self.xs = np.zeros(capacity, dtype=np.float64)
+        self.ys = np.zeros(capacity, dtype=np.float64)
+        self.ids = np.empty(capacity, dtype=object)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._slot_of = {}     # driver_id -> row index
+        self._free = []        # rows released by remove()
+        self._used = 0         # rows [0, _used) have been handed out at least once
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, driver_id):
+        return driver_id in self._slot_of
+
+    def _grow(self):
+        """Doubles every column; amortized O(1) per added driver."""
+        extra = max(1, len(self.xs))
+        self.xs = np.concatenate([self.xs, np.zeros(extra, dtype=np.float64)])
+        self.ys = np.concatenate([self.ys, np.zeros(extra, dtype=np.float64)])
+        self.ids = np.concatenate([self.ids, np.empty(extra, dtype=object)])
+        self.active = np.concatenate([self.active, np.zeros(extra, dtype=bool)])
+
+    def upsert(self, driver_id, coords):
+        """Adds a driver or moves an existing one. Returns its row index."""
+        slot = self._slot_of.get(driver_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._used == len(self.xs):
+                    self._grow()
+                slot = self._used
+                self._used += 1
+            self._slot_of[driver_id] = slot
+            self.ids[slot] = driver_id
+            self.active[slot] = True
+        self.xs[slot] = coords[0]
+        self.ys[slot] = coords[1]
+        return slot
+
+    def remove(self, driver_id):
+        slot = self._slot_of.pop(driver_id, None)
+        if slot is None:
+            return False
+        self.active[slot] = False
+        self.ids[slot] = None
+        self._free.append(slot)
+        return True
+
+    def coords(self, driver_id):
+        slot = self._slot_of[driver_id]
+        return (float(self.xs[slot]), float(self.ys[slot]))
+
+    def slots(self, driver_ids):
+        return np.fromiter((self._slot_of[d] for d in driver_ids), dtype=np.intp)
+
+    def rank(self, user_coords, driver_ids=None, k=1, max_dist=None):
+        """
+        Returns the k closest drivers as (distance, driver_id), closest first.
+        Candidates default to every active driver. Uses one vectorized
+        distance computation and argpartition, so only the k winners are sorted.
+        """
+        if driver_ids is None:
+            slots = np.flatnonzero(self.active[:self._used])
+        else:
+            slots = self.slots(driver_ids)
+        if k <= 0 or len(slots) == 0:
+            return []
+
+        dx = self.xs[slots] - user_coords[0]
+        dy = self.ys[slots] - user_coords[1]
+        dist_sq = dx * dx + dy * dy
+        if max_dist is not None:
+            inside = dist_sq <= max_dist * max_dist
+            slots, dist_sq = slots[inside], dist_sq[inside]
+
+        if k < len(slots):
+            top = np.argpartition(dist_sq, k - 1)[:k]
+        else:
+            top = np.arange(len(slots))
+        top = top[np.argsort(dist_sq[top], kind="stable")]
+        return [(float(d), self.ids[s]) for d, s in zip(np.sqrt(dist_sq[top]), slots[top])]
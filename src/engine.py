@@ -1,52 +1,559 @@
-from .bloom_filter import BloomFilter
-from .radix_tree import RadixTree
-from .r_tree import RTree
+import json
+import os
+import threading
+
+from .bloom_filter import BloomFilter, CountingBloomFilter, ScalableBloomFilter
+from .radix_tree import RadixTree, FrozenRadixTree
+from .r_tree import RTree, PackedRTree
 from .fibonacci_heap import FibonacciHeap
+from .driver_store import DriverStore
+from .assignment import min_cost_assignment
+from .concurrency import RWLock, reads, writes
+from .metrics import Metrics, RequestTrace
+from .snapshot import write_snapshot, open_snapshot
 
 class LogisticsEngine:
-    def __init__(self):
-        # 1. Security: Block known malicious IDs
-        self.security_filter = BloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    def __init__(self, candidate_pool=5, max_search_radius=None, columnar=False, road_graph=None,
+                 location_typo_edits=1, metrics=False):
+        # 1. Security: Block known malicious IDs. The filter grows with the
+        # blacklist without losing its error bound, and counters allow un-blacklisting
+        self.security_filter = ScalableBloomFilter(initial_capacity=1000, false_positive_rate=0.01,
+                                                   filter_class=CountingBloomFilter)
+        # Optional large, read-only blacklist shared by every process through one mmap'd file
+        self.shared_blacklist = None
         
-        # 2. Search: Store valid city locations/merchants
+        # 2. Search: Store valid city locations/merchants. After load_snapshot this is
+        # a FrozenRadixTree read from the snapshot until the first change
         self.location_search = RadixTree()
+        # Misspelled destinations within this many edits get a "did you mean" hint
+        self.location_typo_edits = location_typo_edits
         
-        # 3. Spatial: Store active driver coordinates
-        self.driver_index = RTree(max_entries=4)
+        # 3. Spatial: Store active driver coordinates (see the driver_index property)
+        self._driver_index = RTree(max_entries=4)
+        # How many nearest drivers are ranked per request, and how far to look (None = no limit)
+        self.candidate_pool = candidate_pool
+        self.max_search_radius = max_search_radius
+        # Optional columnar copy of driver positions for vectorized ranking
+        self.driver_store = DriverStore() if columnar else None
         
-        # 4. Storage for distance/routing results
-        self.routing_priority = FibonacciHeap()
+        # 4. Ranking heaps, one pooled per thread and emptied after every use
+        self._heaps = threading.local()
+        # Optional street network (RoadGraph, or a ContractionHierarchy built from one):
+        # candidates are then ranked by travel time
+        self.road_graph = road_graph
+        # Drivers handed out by dispatch_batch, skipped until released
+        self.busy_drivers = set()
+        # Public methods take this as readers (queries) or writers (updates), so
+        # one engine can serve many threads; lookups run in parallel with each other
+        self.lock = RWLock()
+        # Per-stage timings and work counts of find_best_driver (None = off, no overhead).
+        # Can also be switched on later: engine.metrics = Metrics()
+        self.metrics = Metrics() if metrics else None
+        # Guards the one-time thaw of layers loaded lazily from a snapshot
+        self._thaw_lock = threading.Lock()
+
+    @property
+    def driver_index(self):
+        """The driver RTree; after load_snapshot it is rebuilt from the packed arrays on first use."""
+        index = self._driver_index
+        if isinstance(index, PackedRTree):
+            with self._thaw_lock:
+                if isinstance(self._driver_index, PackedRTree):
+                    tree = self._driver_index.thaw()
+                    if self.driver_store is not None:
+                        for point, d_id in tree._all_entries():
+                            self.driver_store.upsert(d_id, point)
+                    self._driver_index = tree
+                index = self._driver_index
+        return index
+
+    def _thawed_locations(self):
+        """The location RadixTree, thawing a frozen one from a snapshot on the first call."""
+        locations = self.location_search
+        if isinstance(locations, FrozenRadixTree):
+            with self._thaw_lock:
+                if isinstance(self.location_search, FrozenRadixTree):
+                    self.location_search = self.location_search.thaw()
+                locations = self.location_search
+        return locations
+
+    def thaw(self):
+        """
+        Rebuilds every layer load_snapshot left packed now instead of on
+        first use, e.g. before gc.freeze() in a long-lived process.
+        """
+        self.driver_index
+        self._thawed_locations()
+
+    @property
+    def routing_priority(self):
+        """This thread's pooled ranking heap."""
+        heap = getattr(self._heaps, "heap", None)
+        if heap is None:
+            heap = self._heaps.heap = FibonacciHeap()
+        return heap
 
+    @writes
     def add_driver(self, driver_id, coords):
-        self.driver_index.insert(coords, driver_id)
+        # A known driver is moved rather than indexed twice
+        self.update_driver(driver_id, coords)
+
+    @writes
+    def update_driver(self, driver_id, coords):
+        """Applies a GPS ping; cheap when the driver stays inside its leaf MBR."""
+        self.driver_index.update(driver_id, coords)
+        if self.driver_store is not None:
+            self.driver_store.upsert(driver_id, coords)
+
+    @writes
+    def update_drivers(self, pings):
+        """Applies a micro-batch of (driver_id, coords) pings under one lock acquisition."""
+        for driver_id, coords in pings:
+            self.update_driver(driver_id, coords)
+
+    @writes
+    def remove_driver(self, driver_id):
+        """Takes a driver off the map. Returns False if the ID was unknown."""
+        if self.driver_store is not None:
+            self.driver_store.remove(driver_id)
+        self.busy_drivers.discard(driver_id)
+        return self.driver_index.delete(driver_id)
+
+    @writes
+    def release_driver(self, driver_id):
+        """Makes a dispatched driver available again (e.g. after drop-off)."""
+        self.busy_drivers.discard(driver_id)
+
+    @writes
+    def add_drivers(self, drivers):
+        """Bulk-loads (driver_id, coords) pairs, e.g. at the start of a shift."""
+        drivers = list(drivers)
+        self.driver_index.bulk_load((coords, driver_id) for driver_id, coords in drivers)
+        if self.driver_store is not None:
+            for driver_id, coords in drivers:
+                self.driver_store.upsert(driver_id, coords)
 
-    def add_location(self, name):
-        self.location_search.insert(name)
+    @writes
+    def add_location(self, name, weight=1):
+        # Weight = popularity, used to rank autocomplete suggestions
+        self._thawed_locations().insert(name, weight)
 
+    @reads
+    def suggest_locations(self, prefix, k=5):
+        """The k most popular registered locations starting with `prefix`."""
+        return self.location_search.complete(prefix, k)
+
+    @reads
+    def correct_location(self, name, max_edits=None):
+        """
+        Best registered location within max_edits typos of `name` (default
+        location_typo_edits): fewest edits, then most popular. None if none.
+        """
+        if max_edits is None:
+            max_edits = self.location_typo_edits
+        matches = self._thawed_locations().fuzzy_search(name, max_edits)
+        return matches[0][1] if matches else None
+
+    def _unknown_location(self, destination_name):
+        message = f"ERROR: Location '{destination_name}' not found in registry."
+        if self.location_typo_edits:
+            correction = self.correct_location(destination_name)
+            if correction is not None:
+                message += f" Did you mean '{correction}'?"
+        return message
+
+    @writes
     def blacklist_user(self, user_id):
         self.security_filter.add(user_id)
 
+    @writes
+    def unblacklist_user(self, user_id):
+        """
+        Lifts a ban. Returns False if the ID was not blacklisted, or if it
+        matches more than one sub-filter and cannot be removed safely.
+        Each blacklist_user call needs its own unblacklist_user. Only lift
+        bans that were actually placed: an ID that was never blacklisted can
+        still match as a false positive, and removing it would unban others.
+        """
+        return self.security_filter.remove(user_id)
+
+    @reads
+    def security_stats(self):
+        """
+        Health of the blacklist filter: a rising estimated_false_positive_rate
+        or fill_ratio means it is time to rebuild it with a larger capacity.
+        """
+        stats = self.security_filter.get_stats()
+        if self.shared_blacklist is not None:
+            stats["shared"] = self.shared_blacklist.get_stats()
+        return stats
+
+    def _gauges(self):
+        bloom = self.security_filter
+        gauges = {
+            "drivers": len(self._driver_index),
+            "busy_drivers": len(self.busy_drivers),
+            "locations": len(self.location_search),
+            "radix_nodes": self.location_search.node_count,
+            "bloom_elements": bloom.count,
+            "bloom_fill_ratio": bloom.fill_ratio(),
+            "bloom_estimated_false_positive_rate": bloom.estimated_false_positive_rate(),
+        }
+        if self.shared_blacklist is not None:
+            gauges["shared_bloom_estimated_false_positive_rate"] = \
+                self.shared_blacklist.estimated_false_positive_rate()
+        return gauges
+
+    @reads
+    def metrics_snapshot(self):
+        """Recorded metrics plus current gauges as a dict, or None when metrics are off."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot(self._gauges())
+
+    @reads
+    def metrics_text(self):
+        """Recorded metrics in the Prometheus text format, or None when metrics are off."""
+        if self.metrics is None:
+            return None
+        return self.metrics.to_text(self._gauges())
+
+    @reads
+    def save_snapshot(self, path):
+        """
+        Writes the blacklist filter, the locations (as a FrozenRadixTree) and
+        the drivers (as a PackedRTree) to one binary file for load_snapshot().
+        Settings and busy drivers are kept; the road graph and metrics are not,
+        and a shared blacklist is only referenced by its path. Driver IDs
+        must be strings or integers (TypeError otherwise).
+        """
+        security = self.security_filter
+        locations = self.location_search
+        if not isinstance(locations, FrozenRadixTree):
+            locations = locations.freeze()
+        drivers = self._driver_index
+        if not isinstance(drivers, PackedRTree):
+            drivers = PackedRTree.from_tree(drivers)
+        meta = {
+            "candidate_pool": self.candidate_pool,
+            "max_search_radius": self.max_search_radius,
+            "columnar": self.driver_store is not None,
+            "location_typo_edits": self.location_typo_edits,
+            "busy_drivers": list(self.busy_drivers),
+            "security": {"filter_class": security.filter_class.__name__,
+                         "initial_capacity": security.initial_capacity, "false_positive_rate": security.p,
+                         "growth": security.growth, "tightening": security.tightening,
+                         "sub_filters": len(security.filters)},
+            "shared_blacklist": self.shared_blacklist._source[0] if self.shared_blacklist is not None else None,
+        }
+        sections = [("meta", lambda f: f.write(json.dumps(meta).encode("utf-8")))]
+        sections += [(f"bloom.{i}", bf._write) for i, bf in enumerate(security.filters)]
+        sections += [("locations", locations._write), ("drivers", drivers._write)]
+        write_snapshot(path, sections)
+
+    @classmethod
+    def load_snapshot(cls, path, road_graph=None, metrics=False):
+        """
+        Engine saved with save_snapshot(). The file is memory-mapped and
+        only the blacklist filter is copied up front. Locations are served
+        from the mapped file until the first add_location or typo
+        correction, and the R-Tree is rebuilt from its packed arrays on
+        first use, so loading takes milliseconds at any fleet size.
+        """
+        _, sections = open_snapshot(path)
+        meta = json.loads(bytes(sections["meta"]))
+        engine = cls(meta["candidate_pool"], meta["max_search_radius"], meta["columnar"], road_graph,
+                     meta["location_typo_edits"], metrics)
+
+        security = meta["security"]
+        filter_class = {c.__name__: c for c in (BloomFilter, CountingBloomFilter)}[security["filter_class"]]
+        engine.security_filter = ScalableBloomFilter(security["initial_capacity"], security["false_positive_rate"],
+                                                     security["growth"], security["tightening"], filter_class)
+        engine.security_filter.filters = [filter_class._from_buffer(sections[f"bloom.{i}"], f"{path} bloom.{i}", copy=True)
+                                          for i in range(security["sub_filters"])]
+        # The views keep the mapping open for as long as a layer still reads from it
+        engine.location_search = FrozenRadixTree._from_buffer(sections["locations"], f"{path} locations")
+        engine._driver_index = PackedRTree._from_buffer(sections["drivers"], f"{path} drivers")
+        engine.busy_drivers = set(meta["busy_drivers"])
+        if meta["shared_blacklist"] and os.path.exists(meta["shared_blacklist"]):
+            engine.shared_blacklist = BloomFilter.open(meta["shared_blacklist"], mmap=True)
+        return engine
+
+    @writes
+    def load_shared_blacklist(self, path):
+        """
+        Memory-maps a BloomFilter file published with BloomFilter.save().
+        Users in it are denied on top of the ones blacklisted in this engine;
+        unblacklist_user only affects the latter.
+        """
+        self.shared_blacklist = BloomFilter.open(path, mmap=True)
+
+    @writes
+    def refresh_shared_blacklist(self):
+        """
+        Picks up a newer published file, if any. The new filter is opened in
+        full before it replaces the old one, so requests never see a mix.
+        Returns True if the blacklist was reloaded.
+        """
+        old = self.shared_blacklist
+        if old is None or not old.is_stale():
+            return False
+        self.shared_blacklist = BloomFilter.open(old._source[0], mmap=True)
+        return True
+
+    def _is_flagged(self, user_id):
+        if self.shared_blacklist is not None and self.shared_blacklist.check(user_id):
+            return True
+        return self.security_filter.check(user_id)
+
+    @reads
     def find_best_driver(self, user_id, destination_name, user_coords):
+        if self.metrics is None:
+            return self._find_best_driver(user_id, destination_name, user_coords)
+        trace = RequestTrace()
+        result = self._find_best_driver(user_id, destination_name, user_coords, trace)
+        self.metrics.record(trace)
+        return result
+
+    def _find_best_driver(self, user_id, destination_name, user_coords, trace=None):
         # Step 1: Bloom Filter Check
-        if self.security_filter.check(user_id):
+        flagged = self._is_flagged(user_id)
+        if trace is not None:
+            trace.lap()
+            trace.flagged = flagged
+        if flagged:
+            if trace is not None:
+                trace.outcome = "denied"
             return "ACCESS DENIED: User ID flagged by security filter."
 
         # Step 2: Radix Tree Check
-        if not self.location_search.search(destination_name):
-            return f"ERROR: Location '{destination_name}' not found in registry."
+        known = self.location_search.search(destination_name)
+        if trace is not None:
+            trace.lap()
+        if not known:
+            if trace is not None:
+                trace.outcome = "unknown_location"
+            return self._unknown_location(destination_name)
 
-        # Step 3: R-Tree Spatial Search (Radius of 10 units)
-        nearby_drivers = self.driver_index.search(user_coords[0], user_coords[1], 10)
-        
-        if not nearby_drivers:
+        # Step 3: R-Tree candidate search
+        index = self.driver_index
+        if trace is not None:
+            # Shared counters, so only approximate while other threads search too
+            nodes, entries = index.nodes_visited, index.entries_visited
+        nearby_drivers = self._find_candidates(user_coords, index=index)
+        if trace is not None:
+            trace.lap()
+            trace.rtree_nodes_visited = index.nodes_visited - nodes
+            trace.rtree_entries_visited = index.entries_visited - entries
+            trace.candidates = len(nearby_drivers)
+
+        # Step 4: Rank the candidates and take the closest one
+        if self.road_graph is not None:
+            ranked = self.rank_by_travel_time(user_coords, nearby_drivers, k=1, max_dist=self.max_search_radius)
+            unit = "Travel time"
+        else:
+            ranked = self.rank_candidates(user_coords, nearby_drivers, k=1, max_dist=self.max_search_radius,
+                                          trace=trace)
+            unit = "Distance"
+        if trace is not None:
+            trace.lap()
+            trace.outcome = "assigned" if ranked else "no_driver"
+        if not ranked:
             return "No drivers found in your area."
+        cost, d_id = ranked[0]
+        return f"Success! Driver {d_id} assigned. {unit}: {cost:.2f} units."
+
+    def _find_candidates(self, user_coords, k=None, index=None):
+        """
+        Available (coords, driver_id) candidates around the customer (k
+        defaults to candidate_pool). Pass `index` when the caller already
+        holds self.driver_index.
+        """
+        if index is None:
+            index = self.driver_index
+        if self.driver_store is not None and self.max_search_radius is not None:
+            # Columnar mode: every driver in the search box is a candidate, ranked in one vectorized pass
+            return [(coords, d_id) for coords, d_id in
+                    index.search(user_coords[0], user_coords[1], self.max_search_radius)
+                    if d_id not in self.busy_drivers]
+
+        # k-nearest-neighbour search (true Euclidean distance), skipping busy drivers
+        k = self.candidate_pool if k is None else k
+        candidates = []
+        if k > 0:
+            busy = self.busy_drivers
+            for _, coords, d_id in index.iter_nearest(user_coords[0], user_coords[1], self.max_search_radius):
+                if d_id in busy:
+                    continue
+                candidates.append((coords, d_id))
+                if len(candidates) == k:
+                    break
+        return candidates
+
+    @reads
+    def search_radius(self, user_coords):
+        """
+        Radius around user_coords that find_best_driver searches: the box
+        half-width in columnar mode, otherwise the distance to the farthest
+        of the candidate_pool nearest available drivers. max_search_radius
+        when nobody is in reach, or None if there is no limit either.
+        """
+        if self.driver_store is not None and self.max_search_radius is not None:
+            return self.max_search_radius
+        candidates = self._find_candidates(user_coords)
+        if not candidates:
+            return self.max_search_radius
+        return max(((x - user_coords[0]) ** 2 + (y - user_coords[1]) ** 2) ** 0.5 for (x, y), _ in candidates)
 
-        # Step 4: Fibonacci Heap for Ranking
-        # We calculate Euclidean distance and use it as the 'key'
-        for coords, d_id in nearby_drivers:
+    @reads
+    def drivers_in_view(self, bounds, max_markers=500, grid=24):
+        """
+        What a map showing bounds = (min_x, min_y, max_x, max_y) should draw,
+        as {"total": drivers inside, "drivers": [(coords, driver_id, busy)],
+        "clusters": [(x, y, count)]}. Individual drivers are listed when at
+        most max_markers are inside; otherwise they are aggregated into the
+        cells of a grid x grid raster over the view's longer side. Both lists
+        are bounded, and so is the R-Tree work, whatever the fleet size.
+        """
+        min_x, min_y, max_x, max_y = bounds
+        index = self.driver_index
+        cell_size = max(max_x - min_x, max_y - min_y, 1e-9) / grid
+        # Cached subtree counts are filled in here under the read lock; concurrent
+        # readers can only ever write the same values, and writers invalidate them
+        clusters = index.clusters(min_x, min_y, max_x, max_y, cell_size)
+        view = {"total": sum(n for _, _, n in clusters), "drivers": [], "clusters": []}
+        if view["total"] <= max_markers:
+            view["drivers"] = [(coords, d_id, d_id in self.busy_drivers)
+                               for coords, d_id in index.search_box(min_x, min_y, max_x, max_y)]
+        else:
+            view["clusters"] = clusters
+        return view
+
+    @writes
+    def dispatch_batch(self, requests):
+        """
+        Dispatches many (user_id, destination_name, user_coords) requests at
+        once and returns one result message per request, in order.
+
+        Candidates come from the same R-Tree search as find_best_driver, then
+        a min-cost assignment over the sparse customer x candidate cost matrix
+        serves as many customers as possible at the lowest total distance
+        (or travel time). Customers left out because their neighbours took
+        all candidate_pool of their drivers are searched again, wider, among
+        the drivers still free. Assigned drivers are marked busy, so no
+        driver is ever given to two customers.
+        """
+        requests = list(requests)
+        results = [None] * len(requests)
+
+        # Step 1: Bloom Filter pass, one batched check for every user ID
+        open_requests = []
+        user_ids = [user_id for user_id, _, _ in requests]
+        flagged = self.security_filter.check_many(user_ids)
+        if self.shared_blacklist is not None:
+            flagged = [a or b for a, b in zip(flagged, self.shared_blacklist.check_many(user_ids))]
+        for i, is_flagged in enumerate(flagged):
+            if is_flagged:
+                results[i] = "ACCESS DENIED: User ID flagged by security filter."
+            else:
+                open_requests.append(i)
+
+        # Step 2: Radix Tree pass, looking each distinct destination up once
+        errors = {}  # destination -> error message, or None if it is registered
+        valid = []
+        for i in open_requests:
+            destination_name = requests[i][1]
+            if destination_name not in errors:
+                errors[destination_name] = None if self.location_search.search(destination_name) \
+                    else self._unknown_location(destination_name)
+            if errors[destination_name] is None:
+                valid.append(i)
+            else:
+                results[i] = errors[destination_name]
+
+        # Step 3: price every customer's nearest free drivers, then assign them all at once
+        unit = "Travel time" if self.road_graph is not None else "Distance"
+        pending, k = valid, self.candidate_pool
+        while pending:
+            rows = [self._find_candidates(requests[i][2], k) for i in pending]
+            costs = [self._candidate_costs(requests[i][2], candidates) for i, candidates in zip(pending, rows)]
+
+            # Step 4: globally optimal assignment, then mark the winners busy
+            retry = []
+            for i, candidates, row_costs, d_id in zip(pending, rows, costs, min_cost_assignment(costs)):
+                if d_id is not None:
+                    self.busy_drivers.add(d_id)
+                    results[i] = f"Success! Driver {d_id} assigned. {unit}: {row_costs[d_id]:.2f} units."
+                elif 0 < k == len(candidates) and k < self.candidate_pool + len(valid):
+                    # Nearby customers took all k; more free drivers may be in range
+                    retry.append(i)
+                else:
+                    results[i] = "No drivers found in your area."
+            # With candidate_pool + len(valid) free drivers each, no customer in the retry can run out
+            pending, k = retry, self.candidate_pool + len(valid)
+        return results
+
+    def _candidate_costs(self, user_coords, candidates):
+        """{driver_id: cost} for the candidates dispatch_batch may assign to one customer."""
+        if self.road_graph is not None:
+            ranked = self.rank_by_travel_time(user_coords, candidates, len(candidates), self.max_search_radius)
+            return {d_id: eta for eta, d_id in ranked}
+        # The assignment needs every candidate's cost, not a ranking, so no heap here
+        row_costs = {}
+        for coords, d_id in candidates:
             dist = ((coords[0]-user_coords[0])**2 + (coords[1]-user_coords[1])**2)**0.5
-            self.routing_priority.insert(dist, d_id)
+            if self.max_search_radius is None or dist <= self.max_search_radius:
+                row_costs[d_id] = dist
+        return row_costs
+
+    @reads
+    def rank_candidates(self, user_coords, candidates, k=1, max_dist=None, trace=None):
+        """
+        Ranks (coords, driver_id) candidates by Euclidean distance and returns
+        the k closest as (distance, driver_id), closest first. Nothing is kept
+        between calls, so one request can never see another's candidates.
+        A RequestTrace passed as `trace` records the heap size.
+        """
+        candidates = list(candidates)
+        if self.driver_store is not None:
+            return self.driver_store.rank(user_coords, [d_id for _, d_id in candidates], k, max_dist)
+
+        # Fibonacci Heap ranking: O(1) inserts, then k extract_min calls
+        heap = self.routing_priority
+        try:
+            for coords, d_id in candidates:
+                dist = ((coords[0]-user_coords[0])**2 + (coords[1]-user_coords[1])**2)**0.5
+                if max_dist is None or dist <= max_dist:
+                    heap.insert(dist, d_id)
+            if trace is not None:
+                trace.heap_size = len(heap)
+            ranked = []
+            while len(ranked) < k and len(heap):
+                best_match = heap.extract_min()
+                ranked.append((best_match.key, best_match.value))
+            return ranked
+        finally:
+            heap.clear()
 
-        # Extract the minimum (closest) driver
-        best_match = self.routing_priority.extract_min()
-        return f"Success! Driver {best_match.value} assigned. Distance: {best_match.key:.2f} units."
\ No newline at end of file
+    @reads
+    def rank_by_travel_time(self, user_coords, candidates, k=1, max_dist=None):
+        """
+        Ranks (coords, driver_id) candidates by road-network travel time to the
+        customer and returns the k fastest as (travel_time, driver_id).
+        Positions are snapped to the nearest junction, and a single
+        multi-target Dijkstra from the customer covers every candidate.
+        Drivers that cannot reach the customer are left out.
+        """
+        graph = self.road_graph
+        starts = {}  # junction -> drivers waiting there
+        for coords, d_id in candidates:
+            if max_dist is not None and \
+                    ((coords[0]-user_coords[0])**2 + (coords[1]-user_coords[1])**2)**0.5 > max_dist:
+                continue
+            starts.setdefault(graph.nearest_node(coords[0], coords[1]), []).append(d_id)
+        if not starts:
+            return []
+        customer = graph.nearest_node(user_coords[0], user_coords[1])
+        times = graph.travel_times_to(customer, list(starts))
+        ranked = sorted((eta, d_id) for node, eta in times.items() for d_id in starts[node])
+        return ranked[:k]
\ No newline at end of file
@@ -1,6 +1,6 @@
-import math
-
 class FibNode:
+    __slots__ = ("key", "value", "degree", "parent", "child", "left", "right", "marked")
+
     def __init__(self, key, value):
         self.key = key          # The weight (e.g., distance/time)
         self.value = value      # The data (e.g., Driver ID)
@@ -12,9 +12,34 @@ class FibNode:
         self.marked = False     # Used for cascading cuts
 
 class FibonacciHeap:
+    """
+    Addressable min-priority queue (Fredman & Tarjan 1987).
+    insert, peek, merge and decrease_key are O(1) amortized;
+    extract_min and delete are O(log n) amortized.
+
+    `insert` returns the node, which serves as a handle for decrease_key and
+    delete. The heap also keeps a value -> node map (`handle(value)`), so a
+    driver's entry can be found from its ID; if the same value is inserted
+    twice, the map points at the newest node.
+    """
     def __init__(self):
         self.min_node = None
         self.total_nodes = 0
+        self.handles = {}
+        self._degree_table = []  # Reused by every _consolidate call
+
+    def __len__(self):
+        return self.total_nodes
+
+    def __contains__(self, value):
+        return value in self.handles
+
+    def handle(self, value):
+        """Returns the node currently holding `value`, or None."""
+        return self.handles.get(value)
+
+    def peek(self):
+        return self.min_node
 
     def insert(self, key, value):
         node = FibNode(key, value)
@@ -25,6 +50,7 @@ class FibonacciHeap:
             if node.key < self.min_node.key:
                 self.min_node = node
         self.total_nodes += 1
+        self.handles[value] = node
         return node
 
     def _add_to_root_list(self, node):
@@ -33,55 +59,166 @@ class FibonacciHeap:
         self.min_node.right.left = node
         self.min_node.right = node
 
+    def clear(self):
+        """
+        Empties the heap in O(n), unlinking every node so that reference
+        counting frees them immediately instead of leaving cycles for the GC.
+        """
+        rings = [self.min_node] if self.min_node is not None else []
+        while rings:
+            start = node = rings.pop()
+            while True:
+                if node.child is not None:
+                    rings.append(node.child)
+                node.right, nxt = None, node.right
+                node.left = node.parent = node.child = None
+                node = nxt
+                if node is start: break
+        self.min_node = None
+        self.total_nodes = 0
+        self.handles = {}
+
+    def _splice(self, a, b):
+        """Joins the circular list containing `b` into the one containing `a`."""
+        a_right, b_left = a.right, b.left
+        a.right = b
+        b.left = a
+        b_left.right = a_right
+        a_right.left = b_left
+
+    def merge(self, other):
+        """Moves every node of `other` into this heap in O(1); `other` is left empty."""
+        if other.min_node is None:
+            return self
+        if self.min_node is None:
+            self.min_node = other.min_node
+        else:
+            self._splice(self.min_node, other.min_node)
+            if other.min_node.key < self.min_node.key:
+                self.min_node = other.min_node
+        self.total_nodes += other.total_nodes
+        self.handles.update(other.handles)
+        other.min_node, other.total_nodes, other.handles = None, 0, {}
+        return self
+
     def extract_min(self):
         z = self.min_node
         if z is not None:
-            if z.child is not None:
-                # Add children to root list
-                children = [x for x in self._get_nodes(z.child)]
-                for child in children:
-                    self._add_to_root_list(child)
-                    child.parent = None
-            
+            child = z.child
+            if child is not None:
+                # Add children to root list: splice the whole ring in at once
+                c = child
+                while True:
+                    c.parent = None
+                    c = c.right
+                    if c is child: break
+                self._splice(z, child)
+                z.child = None
+
             # Remove z from root list
             z.left.right = z.right
             z.right.left = z.left
 
-            if z == z.right:
+            if z is z.right:
                 self.min_node = None
             else:
                 self.min_node = z.right
                 self._consolidate()
             self.total_nodes -= 1
+            if self.handles.get(z.value) is z:
+                del self.handles[z.value]
+            # Detach the returned node so it does not keep a reference cycle alive
+            z.left = z.right = None
+            z.degree = 0
         return z
 
+    def decrease_key(self, node, new_key):
+        """
+        Lowers the key of `node` (a handle returned by insert, or a value
+        present in the heap). Raises ValueError if new_key is larger.
+        """
+        if not isinstance(node, FibNode):
+            node = self.handles[node]
+        if new_key > node.key:
+            raise ValueError(f"new key {new_key} is greater than current key {node.key}")
+        node.key = new_key
+        parent = node.parent
+        if parent is not None and node.key < parent.key:
+            self._cut(node, parent)
+            self._cascading_cut(parent)
+        if node.key < self.min_node.key:
+            self.min_node = node
+
+    def delete(self, node):
+        """Removes `node` (a handle or a value present in the heap) and returns it."""
+        if not isinstance(node, FibNode):
+            node = self.handles[node]
+        key = node.key
+        self.decrease_key(node, float("-inf"))
+        self.min_node = node  # Ties at -inf must still extract this node
+        removed = self.extract_min()
+        removed.key = key
+        return removed
+
+    def _cut(self, node, parent):
+        """Moves `node` from `parent`'s child list to the root list."""
+        if node.right is node:
+            parent.child = None
+        else:
+            node.left.right = node.right
+            node.right.left = node.left
+            if parent.child is node:
+                parent.child = node.right
+        parent.degree -= 1
+        node.parent = None
+        node.marked = False
+        node.left = node.right = node
+        self._add_to_root_list(node)
+
+    def _cascading_cut(self, node):
+        parent = node.parent
+        while parent is not None:
+            if not node.marked:
+                node.marked = True
+                return
+            self._cut(node, parent)
+            node, parent = parent, parent.parent
+
     def _consolidate(self):
-        # Golden ratio based size for the degree array
-        max_degree = int(math.log2(self.total_nodes)) + 2
-        A = [None] * max_degree
-        
-        root_nodes = [x for x in self._get_nodes(self.min_node)]
-        for w in root_nodes:
-            x = w
+        # Degree table grows on demand (max degree is O(log_phi n))
+        A = self._degree_table
+
+        # Count roots first so they can be walked while links reshape the ring
+        roots, w = 1, self.min_node.right
+        while w is not self.min_node:
+            roots += 1
+            w = w.right
+
+        w = self.min_node
+        for _ in range(roots):
+            x, w = w, w.right
             d = x.degree
-            while A[d] is not None:
+            while True:
+                if d >= len(A):
+                    A.extend([None] * (d + 1 - len(A)))
                 y = A[d]
+                if y is None:
+                    break
                 if x.key > y.key:
                     x, y = y, x
                 self._link(y, x)
                 A[d] = None
                 d += 1
             A[d] = x
-        
-        # Reconstruct root list and find new min
+
+        # Reconstruct root list and find new min, clearing the table for reuse
         self.min_node = None
-        for node in A:
+        for d in range(len(A)):
+            node = A[d]
             if node is not None:
-                if self.min_node is None:
+                A[d] = None
+                if self.min_node is None or node.key < self.min_node.key:
                     self.min_node = node
-                else:
-                    if node.key < self.min_node.key:
-                        self.min_node = node
 
     def _link(self, y, x):
         # Remove y from root list and make it a child of x
@@ -99,13 +236,3 @@ class FibonacciHeap:
             x.child.right = y
         x.degree += 1
         y.marked = False
-
-    def _get_nodes(self, start_node):
-        nodes = []
-        curr = start_node
-        if curr is None: return nodes
-        while True:
-            nodes.append(curr)
-            curr = curr.right
-            if curr == start_node: break
-        return nodes
\ No newline at end of file
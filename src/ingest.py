@@ -0,0 +1,179 @@
+"""
+Streaming GPS-ping ingestion: read -> coalesce -> apply in micro-batches.
+
+Run from the repository root, e.g. fed by the synthetic stream:
+    python data/generate_data.py --ping-stream --rate 20000 | python -m src.ingest -
+
+Each stage is a generator pulling from the one before it, so nothing is
+read faster than the index absorbs it: when updates fall behind, reading
+stops and the producer blocks on the full pipe (backpressure). Memory is
+bounded by max_batch pending pings plus one timestamp per known driver.
+On a live pipe that goes quiet, the open batch is applied after `idle`
+seconds without input instead of waiting for the next ping.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+
+_EOF = object()
+
+def tick_when_idle(stream, idle, backlog=10000):
+    """
+    Lines of `stream`, plus a None whenever no line arrived for `idle`
+    seconds of wall-clock time. A reader thread does the blocking reads;
+    its queue holds at most `backlog` lines, so backpressure still works.
+    """
+    lines = queue.Queue(backlog)
+
+    def reader():
+        try:
+            for line in stream:
+                lines.put(line)
+        finally:
+            lines.put(_EOF)
+
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        try:
+            line = lines.get(timeout=idle)
+        except queue.Empty:
+            yield None
+            continue
+        if line is _EOF:
+            return
+        yield line
+
+def read_pings(stream, stats=None):
+    """
+    Parses newline-delimited pings: "driver_id x y timestamp" (spaces or
+    commas) or JSON objects with driver_id, x, y and ts. Blank lines and
+    '#' comments are skipped; malformed lines are counted and dropped.
+    None (an idle tick from tick_when_idle) is passed through.
+    """
+    for line in stream:
+        if line is None:
+            yield None
+            continue
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            if line.startswith("{"):
+                record = json.loads(line)
+                ping = (record["driver_id"], float(record["x"]), float(record["y"]), float(record["ts"]))
+            else:
+                driver_id, x, y, ts = line.replace(",", " ").split()
+                ping = (driver_id, float(x), float(y), float(ts))
+        except (ValueError, KeyError):
+            if stats is not None:
+                stats["malformed"] += 1
+            continue
+        if stats is not None:
+            stats["read"] += 1
+        yield ping
+
+def coalesce_pings(pings, window=0.5, max_batch=5000, stats=None):
+    """
+    Groups pings into micro-batches of (driver_id, (x, y)), keeping only
+    each driver's latest position. A batch closes when `window` seconds of
+    ping time have passed since its first ping, or when it holds max_batch
+    drivers. A None in `pings` (the input went idle) closes the batch
+    at once. Pings older than one already applied for the same driver
+    (out-of-order delivery) are dropped.
+    """
+    applied = {}  # driver_id -> timestamp of the newest ping already emitted
+    batch = {}    # driver_id -> (timestamp, (x, y))
+    batch_start = None
+    for ping in pings:
+        if ping is None:
+            if batch:
+                yield _emit(batch, applied)
+                batch = {}
+            continue
+        driver_id, x, y, ts = ping
+        if batch and (ts - batch_start >= window or len(batch) >= max_batch):
+            yield _emit(batch, applied)
+            batch = {}
+        if not batch:
+            batch_start = ts
+        if ts < applied.get(driver_id, float("-inf")):
+            if stats is not None:
+                stats["stale"] += 1
+            continue
+        previous = batch.get(driver_id)
+        if previous is not None:
+            if stats is not None:
+                stats["coalesced"] += 1
+            if ts < previous[0]:
+                continue
+        batch[driver_id] = (ts, (x, y))
+    if batch:
+        yield _emit(batch, applied)
+
+def _emit(batch, applied):
+    for driver_id, (ts, _) in batch.items():
+        applied[driver_id] = ts
+    return [(driver_id, coords) for driver_id, (_, coords) in batch.items()]
+
+def ingest(stream, apply, window=0.5, max_batch=5000, report=None, idle=None):
+    """
+    Feeds `stream` through the pipeline, calling apply(batch) per
+    micro-batch (e.g. LogisticsEngine.update_drivers or
+    ShardedEngine.update_many). `report(stats)` is called after each batch.
+    For live streams, pass `idle` (seconds) so a batch left open when the
+    input goes quiet is still applied; files don't need it.
+    Returns the final counters, including the sustained pings per second.
+    """
+    stats = {"read": 0, "malformed": 0, "coalesced": 0, "stale": 0,
+             "batches": 0, "applied": 0, "max_batch": 0}
+    start = time.perf_counter()
+    if idle is not None:
+        stream = tick_when_idle(stream, idle)
+    for batch in coalesce_pings(read_pings(stream, stats), window, max_batch, stats):
+        apply(batch)
+        stats["batches"] += 1
+        stats["applied"] += len(batch)
+        stats["max_batch"] = max(stats["max_batch"], len(batch))
+        if report is not None:
+            stats["elapsed"] = time.perf_counter() - start
+            report(stats)
+    stats["elapsed"] = time.perf_counter() - start
+    stats["pings_per_sec"] = stats["read"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", help="ping file, or - for stdin")
+    parser.add_argument("--window", type=float, default=0.5, help="coalescing window in seconds of ping time")
+    parser.add_argument("--max-batch", type=int, default=5000)
+    parser.add_argument("--idle", type=float, default=1.0,
+                        help="apply the open batch after this many seconds without input")
+    args = parser.parse_args()
+
+    from .engine import LogisticsEngine
+    engine = LogisticsEngine()
+    last = [time.perf_counter(), 0]
+
+    def report(stats):
+        now = time.perf_counter()
+        if now - last[0] >= 1.0:
+            rate = (stats["read"] - last[1]) / (now - last[0])
+            print(f"{stats['read']:>12,} pings  {rate:>10,.0f}/s  {len(engine.driver_index):>8,} drivers  "
+                  f"{stats['batches']:>7,} batches", file=sys.stderr)
+            last[0], last[1] = now, stats["read"]
+
+    stream = sys.stdin if args.source == "-" else open(args.source, "r")
+    try:
+        stats = ingest(stream, engine.update_drivers, args.window, args.max_batch, report, args.idle)
+    except KeyboardInterrupt:
+        return
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
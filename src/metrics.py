@@ -0,0 +1,194 @@
+"""
+Opt-in request instrumentation for LogisticsEngine.
+
+LogisticsEngine(metrics=True) times each layer of find_best_driver (Bloom,
+Radix, R-tree, ranking) and counts the work done per request. A request
+only takes timestamps and queues its RequestTrace; traces are folded into
+fixed-bucket histograms in vectorized batches, so memory stays constant and
+the request path stays cheap. Export with snapshot() (a dict) or to_text()
+(the Prometheus text exposition format). When metrics are off, the engine
+only pays a handful of `is not None` checks per request.
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+# Looked up once, not as time.perf_counter on every lap
+_clock = time.perf_counter
+
+STAGES = ("bloom", "radix", "rtree", "ranking")
+OUTCOMES = ("assigned", "denied", "unknown_location", "no_driver")
+
+# 1-2-5 steps from 1 us to 1 s
+TIME_BUCKETS = tuple(float(f"{m}e{e}") for e in range(-6, 0) for m in (1, 2, 5)) + (1.0,)
+# Powers of two for per-request work counts
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+# Per-request counts recorded by RequestTrace.count(), with their help text
+WORK = {
+    "rtree_nodes_visited": "R-tree nodes opened per candidate search",
+    "rtree_entries_visited": "R-tree leaf entries examined per candidate search",
+    "candidates": "Candidate drivers handed to ranking",
+    "heap_size": "Fibonacci heap size after inserting the candidates",
+}
+
+class Histogram:
+    """Cumulative-bucket histogram with a running sum, like a Prometheus histogram."""
+    def __init__(self, bounds):
+        self.bounds = np.array(bounds, dtype=np.float64)
+        self.counts = np.zeros(len(bounds) + 1, dtype=np.int64)  # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe_many(self, values):
+        if not len(values):
+            return
+        values = np.asarray(values, dtype=np.float64)
+        # side="left": a value equal to a bound belongs to that bound's bucket (le = "less or equal")
+        buckets = np.searchsorted(self.bounds, values, side="left")
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+        self.count += len(values)
+        self.sum += float(values.sum())
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None if empty)."""
+        if not self.count:
+            return None
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side="left"))
+        return float(self.bounds[bucket]) if bucket < len(self.bounds) else float("inf")
+
+    def cumulative(self):
+        """(le, observations <= le) pairs, ending with +Inf."""
+        bounds = [float(b) for b in self.bounds] + [float("inf")]
+        return list(zip(bounds, np.cumsum(self.counts).tolist()))
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p99": self.quantile(0.99),
+            "buckets": self.cumulative(),
+        }
+
+class RequestTrace:
+    """
+    Timestamps and work counts of a single request, filled in as it runs.
+    One slot per WORK count (None until recorded), so a trace costs one
+    small object and a list, not a dict per request.
+    """
+    __slots__ = ("marks", "outcome", "flagged") + tuple(WORK)
+
+    def __init__(self):
+        self.marks = [_clock()]
+        self.outcome = None
+        self.flagged = False
+        self.rtree_nodes_visited = self.rtree_entries_visited = self.candidates = self.heap_size = None
+
+    def lap(self):
+        """Ends the next stage, in STAGES order."""
+        self.marks.append(_clock())
+
+class Metrics:
+    """Aggregated RequestTraces. Safe to record from many threads at once."""
+    def __init__(self, flush_every=1024):
+        self.flush_every = flush_every
+        # deque.append/popleft are atomic, so recording never takes a lock
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self.stage_seconds = {stage: Histogram(TIME_BUCKETS) for stage in STAGES}
+            self.request_seconds = Histogram(TIME_BUCKETS)
+            self.work = {name: Histogram(COUNT_BUCKETS) for name in WORK}
+            self.outcomes = dict.fromkeys(OUTCOMES, 0)
+            self.bloom_checks = 0
+            self.bloom_positives = 0
+
+    def record(self, trace):
+        self._pending.append(trace)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Folds the queued traces into the histograms."""
+        with self._lock:
+            batch = [self._pending.popleft() for _ in range(len(self._pending))]
+            if not batch:
+                return
+            for i, stage in enumerate(STAGES):
+                self.stage_seconds[stage].observe_many(
+                    [t.marks[i + 1] - t.marks[i] for t in batch if len(t.marks) > i + 1])
+            self.request_seconds.observe_many([t.marks[-1] - t.marks[0] for t in batch])
+            for name, histogram in self.work.items():
+                values = [getattr(t, name) for t in batch]
+                histogram.observe_many([v for v in values if v is not None])
+            for t in batch:
+                self.outcomes[t.outcome] += 1
+            self.bloom_checks += len(batch)
+            self.bloom_positives += sum(t.flagged for t in batch)
+
+    def snapshot(self, gauges=None):
+        """
+        Everything recorded so far as a JSON-ready dict. `gauges` are
+        point-in-time values from the caller (fleet size, Bloom estimates...).
+        """
+        self.flush()
+        with self._lock:
+            return {
+                "requests": dict(self.outcomes),
+                "request_seconds": self.request_seconds.to_dict(),
+                "stage_seconds": {stage: h.to_dict() for stage, h in self.stage_seconds.items()},
+                "work": {name: h.to_dict() for name, h in self.work.items()},
+                "bloom": {"checks": self.bloom_checks, "positives": self.bloom_positives,
+                          "positive_rate": self.bloom_positives / self.bloom_checks if self.bloom_checks else None},
+                "gauges": dict(gauges or {}),
+            }
+
+    def to_text(self, gauges=None, prefix="geostream"):
+        """The snapshot in the Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot(gauges)
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def histogram(name, h, labels=""):
+            sep = "," if labels else ""
+            for le, n in h["buckets"]:
+                lines.append(f'{prefix}_{name}_bucket{{{labels}{sep}le="{_number(le)}"}} {n}')
+            braces = f"{{{labels}}}" if labels else ""
+            lines.append(f"{prefix}_{name}_sum{braces} {_number(h['sum'])}")
+            lines.append(f"{prefix}_{name}_count{braces} {h['count']}")
+
+        family("requests_total", "counter", "find_best_driver calls by outcome")
+        for outcome, n in snap["requests"].items():
+            lines.append(f'{prefix}_requests_total{{outcome="{outcome}"}} {n}')
+        family("request_seconds", "histogram", "find_best_driver latency")
+        histogram("request_seconds", snap["request_seconds"])
+        family("stage_seconds", "histogram", "Time spent in each layer of find_best_driver")
+        for stage, h in snap["stage_seconds"].items():
+            histogram("stage_seconds", h, f'stage="{stage}"')
+        for name, h in snap["work"].items():
+            family(name, "histogram", WORK[name])
+            histogram(name, h)
+        family("bloom_checks_total", "counter", "Blacklist lookups")
+        lines.append(f"{prefix}_bloom_checks_total {snap['bloom']['checks']}")
+        family("bloom_positives_total", "counter", "Blacklist lookups that denied the user")
+        lines.append(f"{prefix}_bloom_positives_total {snap['bloom']['positives']}")
+        for name, value in snap["gauges"].items():
+            family(name, "gauge", name.replace("_", " ").capitalize())
+            lines.append(f"{prefix}_{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,4 +1,14 @@
+import gc
+import heapq
+import itertools
+import math
+import struct
+import sys
+from array import array
+
 class BoundingBox:
+    __slots__ = ("min_x", "min_y", "max_x", "max_y")
+
     def __init__(self, min_x, min_y, max_x, max_y):
         self.min_x, self.min_y = min_x, min_y
         self.max_x, self.max_y = max_x, max_y
@@ -9,6 +19,31 @@ class BoundingBox:
     def contains(self, x, y):
         return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
 
+    def intersects(self, other):
+        if not other: return False
+        return not (self.max_x < other.min_x or self.min_x > other.max_x or
+                    self.max_y < other.min_y or self.min_y > other.max_y)
+
+    def copy(self):
+        return BoundingBox(self.min_x, self.min_y, self.max_x, self.max_y)
+
+    def extend(self, other):
+        """Grows this box in place so that it also covers `other`."""
+        if other.min_x < self.min_x: self.min_x = other.min_x
+        if other.min_y < self.min_y: self.min_y = other.min_y
+        if other.max_x > self.max_x: self.max_x = other.max_x
+        if other.max_y > self.max_y: self.max_y = other.max_y
+
+    def enlargement(self, other):
+        """Area this box would gain if it had to cover `other` as well."""
+        width = max(self.max_x, other.max_x) - min(self.min_x, other.min_x)
+        height = max(self.max_y, other.max_y) - min(self.min_y, other.min_y)
+        return width * height - self.area()
+
+    @staticmethod
+    def from_point(point):
+        return BoundingBox(point[0], point[1], point[0], point[1])
+
     @staticmethod
     def from_points(points):
         if not points: return None
@@ -29,77 +64,619 @@ class BoundingBox:
         )
 
 class RTreeNode:
+    __slots__ = ("is_leaf", "max_entries", "entries", "mbr", "parent", "count")
+
     def __init__(self, is_leaf=True, max_entries=4):
         self.is_leaf = is_leaf
         self.max_entries = max_entries
-        self.entries = []  # Leaf: [(x, y), data], Internal: [MBR, child_node]
+        self.entries = []  # Leaf: [((x, y), data)], Internal: [child_node]
         self.mbr = None
+        self.parent = None
+        # Points in this subtree, computed on demand by RTree.clusters(); None = unknown.
+        # A known count implies known counts in every child, and None implies None in every ancestor
+        self.count = None
+
+    def recompute_mbr(self):
+        """Rebuilds the MBR from scratch out of this node's own entries."""
+        if not self.entries:
+            self.mbr = None
+        elif self.is_leaf:
+            self.mbr = BoundingBox.from_points([point for point, _ in self.entries])
+        else:
+            mbr = self.entries[0].mbr.copy()
+            for child in self.entries[1:]:
+                mbr.extend(child.mbr)
+            self.mbr = mbr
+        return self.mbr
 
 class RTree:
-    def __init__(self, max_entries=4):
+    """
+    Guttman R-tree over 2D points with quadratic node splits.
+    Inserts only touch the root-to-leaf path, so each one costs O(log n).
+    The `data` stored with each point (e.g. a driver ID) must be hashable
+    and unique: it is the key for delete/update.
+    """
+    def __init__(self, max_entries=4, min_entries=None):
         self.root = RTreeNode(is_leaf=True, max_entries=max_entries)
         self.max_entries = max_entries
+        # Guttman requires m <= M/2 so that a split of M+1 entries is always possible
+        self.min_entries = min_entries or min(max(2, int(max_entries * 0.4)), (max_entries + 1) // 2)
+        self.size = 0
+        # data -> leaf holding it, so moving drivers never need a tree search
+        self._leaf_of = {}
+        # Number of nodes and leaf entries touched by searches, useful for comparing tree quality
+        self.nodes_visited = 0
+        self.entries_visited = 0
+
+    def __len__(self):
+        return self.size
+
+    def height(self):
+        levels, node = 1, self.root
+        while not node.is_leaf:
+            node = node.entries[0]
+            levels += 1
+        return levels
 
     def insert(self, point, data):
-        node = self._choose_leaf(self.root, point)
-        node.entries.append((point, data))
-        if len(node.entries) > self.max_entries:
-            self._split(node)
-        # Fix: Now we actually update the MBRs up the tree
-        self._update_mbrs(self.root)
-
-    def _update_mbrs(self, node):
-        """Recursively updates the Bounding Box for a node based on its children."""
-        if not node.entries:
+        point_box = BoundingBox.from_point(point)
+        leaf = self._choose_leaf(point_box)
+        leaf.entries.append((point, data))
+        self._leaf_of[data] = leaf
+        if len(leaf.entries) > self.max_entries:
+            self._adjust_tree(leaf)
+        self.size += 1
+
+    def __contains__(self, data):
+        return data in self._leaf_of
+
+    def get(self, data):
+        """Returns the point currently stored for `data`, or None."""
+        leaf = self._leaf_of.get(data)
+        if leaf is None:
             return None
-        
-        if node.is_leaf:
-            # For leaves, MBR is based on the (x, y) points
-            points = [entry[0] for entry in node.entries]
-            node.mbr = BoundingBox.from_points(points)
+        for point, d in leaf.entries:
+            if d == data:
+                return point
+
+    def delete(self, data):
+        """Removes the entry for `data`. Returns False if it was not indexed."""
+        leaf = self._leaf_of.pop(data, None)
+        if leaf is None:
+            return False
+        for i, (_, d) in enumerate(leaf.entries):
+            if d == data:
+                del leaf.entries[i]
+                break
+        self.size -= 1
+        self._forget_counts(leaf)
+        self._condense_tree(leaf)
+        return True
+
+    def _forget_counts(self, node):
+        """Marks the subtree counts from `node` up to the root as stale."""
+        while node is not None and node.count is not None:
+            node.count = None
+            node = node.parent
+
+    def update(self, data, point):
+        """
+        Moves `data` to `point`. When the new position still lies inside the
+        current leaf's MBR the entry is rewritten in place; otherwise it is
+        deleted and re-inserted. Unknown `data` is simply inserted.
+        """
+        leaf = self._leaf_of.get(data)
+        if leaf is not None and leaf.mbr.contains(point[0], point[1]):
+            for i, (_, d) in enumerate(leaf.entries):
+                if d == data:
+                    leaf.entries[i] = (point, data)
+                    return
+        if leaf is not None:
+            self.delete(data)
+        self.insert(point, data)
+
+    def _condense_tree(self, leaf):
+        """
+        Guttman's CondenseTree: walks up from `leaf`, unlinking nodes that fell
+        below min_entries and tightening MBRs, then re-inserts orphaned points.
+        """
+        orphans = []
+        node = leaf
+        while node.parent is not None:
+            parent = node.parent
+            if len(node.entries) < self.min_entries:
+                parent.entries.remove(node)
+                node.parent = None
+                orphans.extend(self._subtree_entries(node))
+            else:
+                old = node.mbr
+                node.recompute_mbr()
+                if (old.min_x, old.min_y, old.max_x, old.max_y) == \
+                        (node.mbr.min_x, node.mbr.min_y, node.mbr.max_x, node.mbr.max_y):
+                    # Nothing above this node changed in size or shape
+                    break
+            node = parent
         else:
-            # For internal nodes, MBR is the union of children's MBRs
-            new_mbr = None
-            for _, child in node.entries:
-                child_mbr = self._update_mbrs(child)
-                new_mbr = BoundingBox.merge(new_mbr, child_mbr)
-            node.mbr = new_mbr
-        return node.mbr
-
-    def _choose_leaf(self, node, point):
-        if node.is_leaf:
-            return node
-        # For this demo, we dive into the first child
-        # A full implementation would pick the one needing least area expansion
-        return self._choose_leaf(node.entries[0][1], point)
+            node.recompute_mbr()
+
+        # A root with a single child is a wasted level
+        while not self.root.is_leaf and len(self.root.entries) == 1:
+            self.root = self.root.entries[0]
+            self.root.parent = None
+        if not self.root.is_leaf and not self.root.entries:
+            self.root = RTreeNode(is_leaf=True, max_entries=self.max_entries)
+
+        self.size -= len(orphans)
+        for point, data in orphans:
+            self.insert(point, data)
+
+    def bulk_load(self, points, fill=0.7):
+        """
+        Builds a packed tree from (point, data) pairs using Sort-Tile-Recursive
+        packing (Leutenegger et al. 1997). Entries already in the tree are
+        packed together with the new ones. Nodes are filled to `fill` of
+        max_entries, not to the brim: drivers keep moving after the load, and
+        in a full tree nearly every insert or GPS update would split a node.
+        """
+        # Later positions win, so reloading a known driver moves it instead of duplicating it
+        latest = dict((data, point) for point, data in self._all_entries())
+        latest.update((data, point) for point, data in points)
+        entries = [(point, data) for data, point in latest.items()]
+        self.root = RTreeNode(is_leaf=True, max_entries=self.max_entries)
+        self.size = len(entries)
+        self._leaf_of = {}
+        if not entries:
+            return
+
+        capacity = max(self.min_entries, min(self.max_entries, round(self.max_entries * fill)))
+        # Level 0: tile the points themselves into leaves
+        nodes = []
+        for group in self._str_tiles(entries, capacity, lambda e: e[0][0], lambda e: e[0][1]):
+            leaf = RTreeNode(is_leaf=True, max_entries=self.max_entries)
+            leaf.entries = group
+            leaf.recompute_mbr()
+            for _, data in group:
+                self._leaf_of[data] = leaf
+            nodes.append(leaf)
+
+        # Upper levels: tile the child nodes by the centre of their MBRs
+        while len(nodes) > 1:
+            parents = []
+            for group in self._str_tiles(nodes, capacity, lambda n: n.mbr.min_x + n.mbr.max_x,
+                                         lambda n: n.mbr.min_y + n.mbr.max_y):
+                parent = RTreeNode(is_leaf=False, max_entries=self.max_entries)
+                parent.entries = group
+                for child in group:
+                    child.parent = parent
+                parent.recompute_mbr()
+                parents.append(parent)
+            nodes = parents
+        self.root = nodes[0]
+
+    def _str_tiles(self, items, capacity, key_x, key_y):
+        """Sorts items into vertical slices by x, then packs each slice by y, `capacity` per node."""
+        leaf_count = math.ceil(len(items) / capacity)
+        slice_size = math.ceil(math.sqrt(leaf_count)) * capacity
+        items = sorted(items, key=key_x)
+        for s in range(0, len(items), slice_size):
+            vertical_slice = sorted(items[s:s + slice_size], key=key_y)
+            for i in range(0, len(vertical_slice), capacity):
+                yield vertical_slice[i:i + capacity]
+
+    def _all_entries(self):
+        return self._subtree_entries(self.root)
+
+    def _subtree_entries(self, node):
+        entries, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf:
+                entries.extend(node.entries)
+            else:
+                stack.extend(node.entries)
+        return entries
+
+    def _choose_leaf(self, point_box):
+        """
+        Descends from the root picking the child that needs the least area
+        enlargement (ties broken by smaller area), growing every MBR on the
+        way down so no separate bottom-up pass is needed afterwards.
+        """
+        node = self.root
+        while True:
+            node.count = None
+            if node.mbr is None:
+                node.mbr = point_box.copy()
+            else:
+                node.mbr.extend(point_box)
+            if node.is_leaf:
+                return node
+
+            # Arithmetic is inlined: this loop runs M times per level on every insert
+            px, py = point_box.min_x, point_box.min_y
+            best, best_growth, best_area = None, None, None
+            for child in node.entries:
+                b = child.mbr
+                area = (b.max_x - b.min_x) * (b.max_y - b.min_y)
+                growth = ((b.max_x if b.max_x > px else px) - (b.min_x if b.min_x < px else px)) * \
+                         ((b.max_y if b.max_y > py else py) - (b.min_y if b.min_y < py else py)) - area
+                if best is None or growth < best_growth or (growth == best_growth and area < best_area):
+                    best, best_growth, best_area = child, growth, area
+            node = best
+
+    def _adjust_tree(self, node):
+        """Splits overflowing nodes bottom-up, growing a new root when needed."""
+        while node is not None and len(node.entries) > self.max_entries:
+            sibling = self._split(node)
+            parent = node.parent
+            if parent is None:
+                # The root itself split: the tree grows one level taller
+                new_root = RTreeNode(is_leaf=False, max_entries=self.max_entries)
+                new_root.entries = [node, sibling]
+                new_root.recompute_mbr()
+                node.parent = sibling.parent = new_root
+                self.root = new_root
+                return
+            # The parent's MBR already covered every entry, so only linkage changes
+            parent.entries.append(sibling)
+            sibling.parent = parent
+            node = parent
+
+    def _entry_box(self, node, entry):
+        return BoundingBox.from_point(entry[0]) if node.is_leaf else entry.mbr
 
     def _split(self, node):
-        mid = len(node.entries) // 2
+        """
+        Quadratic split (Guttman 1984). Moves part of `node`'s entries into a
+        new sibling and returns it; both MBRs are recomputed.
+        """
+        entries = node.entries
+        boxes = [self._entry_box(node, e) for e in entries]
+
+        # PickSeeds: the pair that would waste the most area if grouped together
+        coords = [(b.min_x, b.min_y, b.max_x, b.max_y, b.area()) for b in boxes]
+        seed_a, seed_b, worst = 0, 1, None
+        for i in range(len(coords)):
+            ax0, ay0, ax1, ay1, a_area = coords[i]
+            for j in range(i + 1, len(coords)):
+                bx0, by0, bx1, by1, b_area = coords[j]
+                waste = ((ax1 if ax1 > bx1 else bx1) - (ax0 if ax0 < bx0 else bx0)) * \
+                        ((ay1 if ay1 > by1 else by1) - (ay0 if ay0 < by0 else by0)) - a_area - b_area
+                if worst is None or waste > worst:
+                    seed_a, seed_b, worst = i, j, waste
+
+        group_a, group_b = [entries[seed_a]], [entries[seed_b]]
+        mbr_a, mbr_b = boxes[seed_a].copy(), boxes[seed_b].copy()
+        remaining = [i for i in range(len(entries)) if i != seed_a and i != seed_b]
+
+        while remaining:
+            # Make sure each group can still reach the minimum fill
+            if len(group_a) + len(remaining) == self.min_entries:
+                group_a.extend(entries[i] for i in remaining)
+                for i in remaining: mbr_a.extend(boxes[i])
+                break
+            if len(group_b) + len(remaining) == self.min_entries:
+                group_b.extend(entries[i] for i in remaining)
+                for i in remaining: mbr_b.extend(boxes[i])
+                break
+
+            # PickNext: the entry with the strongest preference for one group
+            pick, pick_pos, best_diff = None, None, None
+            for pos, i in enumerate(remaining):
+                diff = abs(mbr_a.enlargement(boxes[i]) - mbr_b.enlargement(boxes[i]))
+                if best_diff is None or diff > best_diff:
+                    pick, pick_pos, best_diff = i, pos, diff
+            remaining.pop(pick_pos)
+
+            grow_a = mbr_a.enlargement(boxes[pick])
+            grow_b = mbr_b.enlargement(boxes[pick])
+            if (grow_a, mbr_a.area(), len(group_a)) <= (grow_b, mbr_b.area(), len(group_b)):
+                group_a.append(entries[pick])
+                mbr_a.extend(boxes[pick])
+            else:
+                group_b.append(entries[pick])
+                mbr_b.extend(boxes[pick])
+
         new_node = RTreeNode(is_leaf=node.is_leaf, max_entries=self.max_entries)
-        new_node.entries = node.entries[mid:]
-        node.entries = node.entries[:mid]
+        node.entries, new_node.entries = group_a, group_b
+        node.mbr, new_node.mbr = mbr_a, mbr_b
+        if node.is_leaf:
+            for _, data in group_b:
+                self._leaf_of[data] = new_node
+        else:
+            for child in group_b:
+                child.parent = new_node
         return new_node
 
     def search(self, x, y, radius):
+        """(point, data) pairs in the square of half-width `radius` around (x, y)."""
+        return self.search_box(x - radius, y - radius, x + radius, y + radius)
+
+    def search_box(self, min_x, min_y, max_x, max_y):
+        """(point, data) pairs inside the rectangle, edges included."""
         results = []
-        query_box = BoundingBox(x - radius, y - radius, x + radius, y + radius)
-        self._search_recursive(self.root, query_box, results)
+        self._search_recursive(self.root, BoundingBox(min_x, min_y, max_x, max_y), results)
         return results
 
     def _search_recursive(self, node, query_box, results):
+        self.nodes_visited += 1
         if not node.mbr: return # Empty node
-        
-        for entry, data in node.entries:
-            if node.is_leaf:
+
+        if node.is_leaf:
+            self.entries_visited += len(node.entries)
+            for entry, data in node.entries:
                 if query_box.contains(entry[0], entry[1]):
                     results.append((entry, data))
-            else:
-                # 'data' is the child_node in internal nodes
-                child_node = data
-                if self._boxes_intersect(query_box, child_node.mbr):
+        else:
+            for child_node in node.entries:
+                if query_box.intersects(child_node.mbr):
                     self._search_recursive(child_node, query_box, results)
 
+    def _count(self, node):
+        """Points under `node`, reusing every subtree count still known."""
+        if node.count is None:
+            stack, order = [node], []
+            while stack:
+                n = stack.pop()
+                if n.count is None:
+                    order.append(n)
+                    if not n.is_leaf:
+                        stack.extend(n.entries)
+            # Children come after their parent in `order`, so go backwards
+            for n in reversed(order):
+                n.count = len(n.entries) if n.is_leaf else sum(child.count for child in n.entries)
+        return node.count
+
+    def clusters(self, min_x, min_y, max_x, max_y, cell_size):
+        """
+        Points inside the rectangle, aggregated on a grid of cell_size squares
+        anchored at (min_x, min_y): a list of (x, y, count) with (x, y) the
+        mean position of the cell's points.
+
+        Subtrees that lie inside the rectangle and fit in one cell are
+        counted as a whole and placed at their MBR centre instead of being
+        opened, so the cost follows the number of cells, not of points. The
+        price is that such a subtree lands in the cell of its centre even if
+        it straddles a cell border. Subtree counts are cached between calls
+        and recomputed only below nodes that inserts or deletes touched.
+        """
+        view = BoundingBox(min_x, min_y, max_x, max_y)
+        cells = {}  # (column, row) -> [count, sum of x, sum of y]
+
+        def add(x, y, n):
+            key = (int((x - min_x) // cell_size), int((y - min_y) // cell_size))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [n, x * n, y * n]
+            else:
+                cell[0] += n
+                cell[1] += x * n
+                cell[2] += y * n
+
+        stack = [self.root] if self.root.mbr is not None else []
+        while stack:
+            node = stack.pop()
+            b = node.mbr
+            self.nodes_visited += 1
+            inside = b.min_x >= min_x and b.max_x <= max_x and b.min_y >= min_y and b.max_y <= max_y
+            if inside and b.max_x - b.min_x <= cell_size and b.max_y - b.min_y <= cell_size:
+                add((b.min_x + b.max_x) / 2, (b.min_y + b.max_y) / 2, self._count(node))
+            elif node.is_leaf:
+                self.entries_visited += len(node.entries)
+                for point, _ in node.entries:
+                    if inside or view.contains(point[0], point[1]):
+                        add(point[0], point[1], 1)
+            else:
+                stack.extend(child for child in node.entries if view.intersects(child.mbr))
+        return [(sx / n, sy / n, n) for n, sx, sy in cells.values()]
+
+    def nearest(self, x, y, k=1, max_dist=None):
+        """
+        Returns up to k (distance, point, data) tuples, closest first, using
+        true Euclidean distance. Only drivers within max_dist are considered.
+        """
+        results = []
+        if k <= 0:
+            return results
+        for hit in self.iter_nearest(x, y, max_dist):
+            results.append(hit)
+            if len(results) == k:
+                break
+        return results
+
+    def iter_nearest(self, x, y, max_dist=None):
+        """
+        Best-first search (Hjaltason & Samet 1999): a single priority queue
+        holds nodes keyed by MINDIST to their MBR and points keyed by their
+        exact distance, so points come out in increasing distance order and
+        nodes farther than the current answer are never opened.
+        """
+        limit = float("inf") if max_dist is None else max_dist * max_dist
+        if self.root.mbr is None:
+            return
+        counter = 0  # tie-breaker so heapq never compares nodes
+        queue = [(0.0, counter, self.root)]
+        while queue:
+            dist_sq, _, item = heapq.heappop(queue)
+            if isinstance(item, RTreeNode):
+                self.nodes_visited += 1
+                if item.is_leaf:
+                    self.entries_visited += len(item.entries)
+                    for point, data in item.entries:
+                        dx, dy = point[0] - x, point[1] - y
+                        d = dx * dx + dy * dy
+                        if d <= limit:
+                            counter += 1
+                            heapq.heappush(queue, (d, counter, (point, data)))
+                else:
+                    for child in item.entries:
+                        b = child.mbr
+                        # MINDIST: distance from (x, y) to the closest point of the box
+                        dx = b.min_x - x if x < b.min_x else (x - b.max_x if x > b.max_x else 0.0)
+                        dy = b.min_y - y if y < b.min_y else (y - b.max_y if y > b.max_y else 0.0)
+                        d = dx * dx + dy * dy
+                        if d <= limit:
+                            counter += 1
+                            heapq.heappush(queue, (d, counter, child))
+            else:
+                yield (dist_sq ** 0.5, item[0], item[1])
+
     def _boxes_intersect(self, b1, b2):
         if not b1 or not b2: return False
-        return not (b1.max_x < b2.min_x or b1.min_x > b2.max_x or
-                    b1.max_y < b2.min_y or b1.min_y > b2.max_y)
\ No newline at end of file
+        return b1.intersects(b2)
+
+class PackedRTree:
+    """
+    RTree flattened into arrays, for engine snapshots. Nodes are numbered
+    breadth-first: internal node i owns nodes first[i] .. first[i] + count[i]
+    and leaf i owns points first[i] .. first[i] + count[i] of the x/y/ID
+    columns. Keys must be strings or integers; they are stored as one
+    UTF-8 buffer cut at character positions id_offsets, integers in
+    decimal with id_is_int set.
+
+    thaw() rebuilds the RTree node for node, without sorting or splitting,
+    so the restored tree has exactly the shape of the saved one.
+    """
+    MAGIC = b"GSRT"
+    VERSION = 2
+    # magic, version, byte order ('<' or '>'), max entries, min entries, node count, point count, ID bytes
+    HEADER = struct.Struct("<4sHcxIIQQQ")
+    # (attribute, array typecode, length: "nodes", "points" or "points+1")
+    COLUMNS = (
+        ("min_x", "d", "nodes"),
+        ("min_y", "d", "nodes"),
+        ("max_x", "d", "nodes"),
+        ("max_y", "d", "nodes"),
+        ("first", "q", "nodes"),
+        ("count", "i", "nodes"),
+        ("is_leaf", "B", "nodes"),
+        ("x", "d", "points"),
+        ("y", "d", "points"),
+        ("id_offsets", "q", "points+1"),
+        ("id_is_int", "B", "points"),
+    )
+
+    def __init__(self, max_entries, min_entries, ids, columns):
+        self.max_entries = max_entries
+        self.min_entries = min_entries
+        self.ids = ids
+        for name, _, _ in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def from_tree(cls, tree):
+        columns = {name: array(typecode) for name, typecode, _ in cls.COLUMNS}
+        keys = []
+        order = [tree.root]
+        i = 0
+        while i < len(order):
+            node = order[i]
+            mbr = node.mbr or BoundingBox(math.nan, math.nan, math.nan, math.nan)
+            for name in ("min_x", "min_y", "max_x", "max_y"):
+                columns[name].append(getattr(mbr, name))
+            columns["count"].append(len(node.entries))
+            columns["is_leaf"].append(1 if node.is_leaf else 0)
+            if node.is_leaf:
+                columns["first"].append(len(keys))
+                for point, data in node.entries:
+                    if isinstance(data, str):
+                        columns["id_is_int"].append(0)
+                    elif isinstance(data, int) and not isinstance(data, bool):
+                        columns["id_is_int"].append(1)
+                        data = str(data)
+                    else:
+                        raise TypeError(f"packed R-trees need str or int keys, got {type(data).__name__}")
+                    columns["x"].append(point[0])
+                    columns["y"].append(point[1])
+                    keys.append(data)
+            else:
+                columns["first"].append(len(order))
+                order.extend(node.entries)
+            i += 1
+        columns["id_offsets"].append(0)
+        columns["id_offsets"].extend(itertools.accumulate(len(key) for key in keys))
+        return cls(tree.max_entries, tree.min_entries, "".join(keys).encode("utf-8"), columns)
+
+    def _write(self, f):
+        """Header, then the ID buffer and each column, every block 8-byte aligned."""
+        byteorder = b"<" if sys.byteorder == "little" else b">"
+        f.write(self.HEADER.pack(self.MAGIC, self.VERSION, byteorder, self.max_entries, self.min_entries,
+                                 len(self.count), len(self.x), len(self.ids)))
+        for block in [self.ids] + [getattr(self, name) for name, _, _ in self.COLUMNS]:
+            f.write(bytes(-f.tell() % 8))
+            f.write(block)
+
+    @classmethod
+    def _from_buffer(cls, buffer, name):
+        """Tree stored at the start of `buffer`, which must be 8-byte aligned in memory."""
+        header = bytes(buffer[:cls.HEADER.size])
+        if len(header) < cls.HEADER.size:
+            raise ValueError(f"{name} is not a packed R-tree")
+        magic, version, byteorder, max_entries, min_entries, nodes, points, id_bytes = cls.HEADER.unpack(header)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{name} is not a packed R-tree")
+        if version != cls.VERSION:
+            raise ValueError(f"{name} has unsupported version {version}")
+        if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+            raise ValueError(f"{name} was written on a machine with the other byte order")
+
+        lengths = {"nodes": nodes, "points": points, "points+1": points + 1}
+        pos = cls.HEADER.size
+        pos += -pos % 8
+        ids = buffer[pos:pos + id_bytes]
+        pos += id_bytes
+        columns = {}
+        for column, typecode, length in cls.COLUMNS:
+            pos += -pos % 8
+            size = lengths[length] * array(typecode).itemsize
+            if pos + size > len(buffer):
+                raise ValueError(f"{name} is truncated")
+            columns[column] = buffer[pos:pos + size].cast(typecode)
+            pos += size
+        return cls(max_entries, min_entries, ids, columns)
+
+    def thaw(self):
+        """The RTree these arrays were packed from."""
+        # Building every node at once would trigger many full cyclic-GC passes
+        # that find nothing to collect; pausing it roughly halves the time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._thaw()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _thaw(self):
+        tree = RTree(max_entries=self.max_entries, min_entries=self.min_entries)
+        text = bytes(self.ids).decode("utf-8")
+        offsets = self.id_offsets.tolist()
+        keys = [text[a:b] for a, b in zip(offsets, offsets[1:])]
+        if any(self.id_is_int):
+            keys = [int(key) if flag else key for key, flag in zip(keys, self.id_is_int.tolist())]
+        points = list(zip(self.x.tolist(), self.y.tolist()))
+        first, count, is_leaf = self.first.tolist(), self.count.tolist(), self.is_leaf.tolist()
+
+        nodes = []
+        for i, box in enumerate(zip(self.min_x.tolist(), self.min_y.tolist(),
+                                    self.max_x.tolist(), self.max_y.tolist())):
+            node = RTreeNode(is_leaf=bool(is_leaf[i]), max_entries=self.max_entries)
+            if count[i]:
+                node.mbr = BoundingBox(*box)
+            nodes.append(node)
+        leaf_of = tree._leaf_of
+        for i, node in enumerate(nodes):
+            lo, hi = first[i], first[i] + count[i]
+            if node.is_leaf:
+                node.entries = list(zip(points[lo:hi], keys[lo:hi]))
+                leaf_of.update(dict.fromkeys(keys[lo:hi], node))
+            else:
+                node.entries = nodes[lo:hi]
+                for child in node.entries:
+                    child.parent = node
+        tree.root = nodes[0]
+        tree.size = len(keys)
+        return tree
@@ -1,58 +1,127 @@
+import bisect
+import gc
+import heapq
+import mmap as _mmap
+import os
+import struct
+import sys
+from array import array
+
 class RadixNode:
+    # No per-instance __dict__: millions of nodes for a national address registry
+    __slots__ = ("prefix", "is_end", "weight", "children", "top")
+
     def __init__(self, prefix="", is_end=False):
         self.prefix = prefix
         self.is_end = is_end
+        self.weight = 0     # Popularity of the word ending here (if is_end)
         self.children = {}  # Map of first character -> RadixNode
+        # Best completions in this subtree as (-weight, word), most popular first
+        self.top = []
 
 class RadixTree:
-    def __init__(self):
+    """
+    PATRICIA trie of location names with ranked autocompletion.
+    Every node caches the `top_k` most popular words below it, kept up to
+    date on insert, so complete() costs O(|prefix| + k) per keystroke.
+    """
+    def __init__(self, top_k=10):
         self.root = RadixNode()
+        self.top_k = top_k
+        self.size = 0        # Words stored
+        self.node_count = 1  # Nodes, root included: compression keeps this well below the character count
 
-    def _get_common_prefix_length(self, s1, s2):
+    def __len__(self):
+        return self.size
+
+    def _get_common_prefix_length(self, word, start, prefix):
+        """Length of the common prefix of word[start:] and prefix, without slicing word."""
         length = 0
-        for c1, c2 in zip(s1, s2):
-            if c1 != c2:
-                break
+        limit = min(len(word) - start, len(prefix))
+        while length < limit and word[start + length] == prefix[length]:
             length += 1
         return length
 
-    def insert(self, word):
+    def insert(self, word, weight=1):
+        """Adds `word`, or sets its weight if it is already present."""
         curr = self.root
+        path = [(curr, 0)]  # (node, length of its key) for every node above `word`, root first
         i = 0
         while i < len(word):
             char = word[i]
             if char not in curr.children:
                 # Case 1: No matching edge, just create a new one
-                curr.children[char] = RadixNode(word[i:], True)
-                return
-            
+                curr.children[char] = RadixNode(word[i:])
+                curr = curr.children[char]
+                self.node_count += 1
+                path.append((curr, len(word)))
+                break
+
             child = curr.children[char]
-            common = self._get_common_prefix_length(word[i:], child.prefix)
-            
+            common = self._get_common_prefix_length(word, i, child.prefix)
+
             if common < len(child.prefix):
                 # Case 2: Partial match - SPLIT the node
                 # New intermediate node representing the 'common' part
                 split_node = RadixNode(child.prefix[:common], False)
+                # It covers exactly the old child's words, so it inherits its cache
+                split_node.top = list(child.top)
                 # Old child prefix is shortened to the 'suffix' part
                 child.prefix = child.prefix[common:]
-                
+
                 # Re-assign children
                 split_node.children[child.prefix[0]] = child
                 curr.children[char] = split_node
-                
+                curr = split_node
+                path.append((curr, i + common))
+                self.node_count += 1
+
                 # Check if the new word ends at the split or needs a new branch
-                if i + common == len(word):
-                    split_node.is_end = True
-                else:
+                if i + common < len(word):
                     new_suffix = word[i + common:]
-                    split_node.children[new_suffix[0]] = RadixNode(new_suffix, True)
-                return
-            
+                    curr = RadixNode(new_suffix)
+                    split_node.children[new_suffix[0]] = curr
+                    path.append((curr, len(word)))
+                    self.node_count += 1
+                break
+
             # Case 3: Full match of prefix, keep traversing
             i += common
             curr = child
-        
+            path.append((curr, i))
+
+        old = curr.weight if curr.is_end else None
+        if old is None:
+            self.size += 1
         curr.is_end = True
+        curr.weight = weight
+        self._update_top(path, word, old, weight)
+
+    def _update_top(self, path, word, old, weight):
+        """Refreshes the top-k caches along `path`, deepest node first."""
+        for node, key_length in reversed(path):
+            top = node.top
+            was_full = len(top) == self.top_k
+            if old is not None:
+                try:
+                    top.remove((-old, word))
+                except ValueError:
+                    pass  # It was not among this subtree's best
+                else:
+                    if weight < old and was_full:
+                        # A word outside the cache may now outrank it
+                        self._rebuild_top(node, word[:key_length])
+                        continue
+            bisect.insort(top, (-weight, word))
+            if len(top) > self.top_k:
+                top.pop()
+
+    def _rebuild_top(self, node, key):
+        """Recomputes a node's cache from its own word (`key`) and its children's caches."""
+        candidates = [entry for child in node.children.values() for entry in child.top]
+        if node.is_end:
+            candidates.append((-node.weight, key))
+        node.top = heapq.nsmallest(self.top_k, candidates)
 
     def search(self, word):
         curr = self.root
@@ -62,8 +131,376 @@ class RadixTree:
             if char not in curr.children:
                 return False
             child = curr.children[char]
-            if not word[i:].startswith(child.prefix):
+            if not word.startswith(child.prefix, i):
                 return False
             i += len(child.prefix)
             curr = child
-        return curr.is_end
\ No newline at end of file
+        return curr.is_end
+
+    def _locate(self, prefix):
+        """(node, full key of node) for the subtree holding every word starting with prefix."""
+        curr = self.root
+        i = 0
+        while i < len(prefix):
+            child = curr.children.get(prefix[i])
+            if child is None:
+                return None, None
+            if len(prefix) - i <= len(child.prefix):
+                # The prefix ends on this edge (or exactly at its end)
+                if not child.prefix.startswith(prefix[i:]):
+                    return None, None
+                return child, prefix[:i] + child.prefix
+            if not prefix.startswith(child.prefix, i):
+                return None, None
+            i += len(child.prefix)
+            curr = child
+        return curr, prefix
+
+    def complete(self, prefix, k=10):
+        """
+        The k most popular words starting with `prefix`, most popular first
+        (ties in alphabetical order). Answered from the node's cache when
+        k <= top_k, otherwise by walking the subtree.
+        """
+        node, key = self._locate(prefix)
+        if node is None:
+            return []
+        if k <= self.top_k:
+            return [word for _, word in node.top[:k]]
+        return [word for _, word in heapq.nsmallest(k, self._subtree_words(node, key))]
+
+    def fuzzy_search(self, word, max_edits=1):
+        """
+        Words within `max_edits` insertions, deletions or substitutions of
+        `word`, as (distance, word) pairs: closest first, then most popular,
+        then alphabetical.
+
+        One depth-first walk carries a Levenshtein DP row per trie depth, so
+        shared prefixes are computed once. Only the diagonal band of width
+        2 * max_edits + 1 can stay within budget, and a subtree is pruned as
+        soon as every cell in that band exceeds max_edits.
+        """
+        n = len(word)
+        over = max_edits + 1  # every cost above the budget is stored as this
+        results = []
+        first_row = [min(j, over) for j in range(n + 1)]
+        if self.root.is_end and first_row[n] <= max_edits:
+            results.append((first_row[n], -self.root.weight, ""))
+
+        stack = [(child, child.prefix, 0, first_row) for child in self.root.children.values()]
+        while stack:
+            node, key, depth, row = stack.pop()
+            for char in node.prefix:
+                depth += 1
+                prev, row = row, [over] * (n + 1)
+                row[0] = min(depth, over)
+                lo = max(1, depth - max_edits)
+                hi = min(n, depth + max_edits)
+                best = row[0]
+                for j in range(lo, hi + 1):
+                    cost = prev[j - 1] if word[j - 1] == char else prev[j - 1] + 1
+                    if prev[j] + 1 < cost:
+                        cost = prev[j] + 1
+                    if row[j - 1] + 1 < cost:
+                        cost = row[j - 1] + 1
+                    row[j] = cost if cost < over else over
+                    if cost < best:
+                        best = cost
+                if best > max_edits:
+                    break  # Nothing below this point can come back within budget
+            else:
+                if node.is_end and row[n] <= max_edits:
+                    results.append((row[n], -node.weight, key))
+                for child in node.children.values():
+                    stack.append((child, key + child.prefix, depth, row))
+
+        results.sort()
+        return [(distance, key) for distance, _, key in results]
+
+    def freeze(self):
+        """Read-only copy packed into flat arrays; see FrozenRadixTree."""
+        return FrozenRadixTree.from_tree(self)
+
+    def _subtree_words(self, node, key):
+        """Yields (-weight, word) for every word in node's subtree."""
+        stack = [(node, key)]
+        while stack:
+            node, key = stack.pop()
+            if node.is_end:
+                yield -node.weight, key
+            for child in node.children.values():
+                stack.append((child, key + child.prefix))
+
+class FrozenRadixTree:
+    """
+    Immutable RadixTree packed into flat arrays, for registries too large
+    to keep as millions of Python objects.
+
+    Nodes are numbered in breadth-first order, so each node's children are
+    the contiguous range first_child[i] .. first_child[i] + child_count[i],
+    sorted by label. Every edge label lives in one UTF-8 buffer at
+    labels[label_start[i]:label_start[i] + label_len[i]]. The top-k caches
+    become node numbers in top_nodes[top_offsets[i]:top_offsets[i + 1]],
+    turned back into words by following `parent`.
+
+    save() writes the arrays to a versioned binary file, and open() can
+    memory-map it read-only so loading takes O(1) time.
+    """
+    MAGIC = b"GSRX"
+    VERSION = 1
+    # magic, version, byte order ('<' or '>'), top_k, node count, label bytes, top-k entries
+    HEADER = struct.Struct("<4sHcxQQQQ")
+    # (attribute, array typecode, length: "nodes", "nodes+1" or "top")
+    COLUMNS = (
+        ("label_start", "q", "nodes"),
+        ("top_offsets", "q", "nodes+1"),
+        ("weights", "d", "nodes"),
+        ("label_len", "I", "nodes"),
+        ("first_child", "i", "nodes"),
+        ("child_count", "i", "nodes"),
+        ("parent", "i", "nodes"),
+        ("top_nodes", "i", "top"),
+        ("first_byte", "B", "nodes"),
+        ("is_end", "B", "nodes"),
+    )
+
+    def __init__(self, top_k, labels, columns):
+        self.top_k = top_k
+        self.labels = labels
+        for name, _, _ in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self._mmap = None
+        self._size = None
+
+    def __len__(self):
+        # The tree never changes, so count the words once, in C, and keep the number
+        if self._size is None:
+            self._size = bytes(self.is_end).count(1)
+        return self._size
+
+    @property
+    def node_count(self):
+        return len(self.is_end)
+
+    @classmethod
+    def from_tree(cls, tree):
+        columns = {name: array(typecode) for name, typecode, _ in cls.COLUMNS}
+        labels = bytearray()
+        order, keys, index = [tree.root], [""], {}
+        columns["parent"].append(-1)
+        i = 0
+        while i < len(order):
+            node, key = order[i], keys[i]
+            label = node.prefix.encode("utf-8")
+            columns["label_start"].append(len(labels))
+            columns["label_len"].append(len(label))
+            columns["first_byte"].append(label[0] if label else 0)
+            labels += label
+            columns["is_end"].append(1 if node.is_end else 0)
+            columns["weights"].append(node.weight if node.is_end else 0.0)
+            if node.is_end:
+                index[key] = i
+            # Children sorted by UTF-8 label so lookups can bisect on first_byte
+            children = sorted(node.children.values(), key=lambda c: c.prefix.encode("utf-8"))
+            columns["first_child"].append(len(order))
+            columns["child_count"].append(len(children))
+            for child in children:
+                order.append(child)
+                keys.append(key + child.prefix)
+                columns["parent"].append(i)
+            i += 1
+
+        columns["top_offsets"].append(0)
+        for node in order:
+            columns["top_nodes"].extend(index[word] for _, word in node.top)
+            columns["top_offsets"].append(len(columns["top_nodes"]))
+        return cls(tree.top_k, bytes(labels), columns)
+
+    # --- Binary file ---------------------------------------------------
+
+    def save(self, path):
+        """
+        Writes the arrays to `path`. Like BloomFilter.save, the file is written
+        under a temporary name and renamed over `path`, so a process that has
+        the old file mapped keeps reading it intact.
+        """
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            self._write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _write(self, f):
+        """Header, then the label buffer and each column, every block 8-byte aligned."""
+        byteorder = b"<" if sys.byteorder == "little" else b">"
+        f.write(self.HEADER.pack(self.MAGIC, self.VERSION, byteorder, self.top_k,
+                                 len(self.is_end), len(self.labels), len(self.top_nodes)))
+        for block in [self.labels] + [getattr(self, name) for name, _, _ in self.COLUMNS]:
+            f.write(block)
+            f.write(bytes(-f.tell() % 8))
+
+    @classmethod
+    def open(cls, path, mmap=True):
+        """
+        Loads a file written by save(). With mmap=True the arrays are
+        read-only views straight into the mapped file.
+        """
+        with open(path, "rb") as f:
+            mapping = None
+            if mmap and os.fstat(f.fileno()).st_size:
+                mapping = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+                buffer = memoryview(mapping)
+            else:
+                buffer = memoryview(f.read())
+        tree = cls._from_buffer(buffer, path)
+        tree._mmap = (mapping, buffer)
+        return tree
+
+    @classmethod
+    def _from_buffer(cls, buffer, name):
+        """Tree stored at the start of `buffer`, which must be 8-byte aligned in memory."""
+        header = bytes(buffer[:cls.HEADER.size])
+        if len(header) < cls.HEADER.size:
+            raise ValueError(f"{name} is not a frozen radix tree file")
+        magic, version, byteorder, top_k, nodes, label_bytes, top = cls.HEADER.unpack(header)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{name} is not a frozen radix tree file")
+        if version != cls.VERSION:
+            raise ValueError(f"{name} has unsupported version {version}")
+        if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+            raise ValueError(f"{name} was written on a machine with the other byte order")
+
+        lengths = {"nodes": nodes, "nodes+1": nodes + 1, "top": top}
+        pos = cls.HEADER.size
+        pos += -pos % 8
+        labels = buffer[pos:pos + label_bytes]
+        pos += label_bytes
+        columns = {}
+        for column, typecode, length in cls.COLUMNS:
+            pos += -pos % 8
+            size = lengths[length] * array(typecode).itemsize
+            if pos + size > len(buffer):
+                raise ValueError(f"{name} is truncated")
+            columns[column] = buffer[pos:pos + size].cast(typecode)
+            pos += size
+        return cls(top_k, labels, columns)
+
+    def thaw(self):
+        """Mutable RadixTree with the same words, weights and top-k caches."""
+        # Building every node at once would trigger many full cyclic-GC passes
+        # that find nothing to collect; pausing it roughly halves the time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._thaw()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _thaw(self):
+        tree = RadixTree(self.top_k)
+        labels = bytes(self.labels)
+        label_start, label_len = self.label_start.tolist(), self.label_len.tolist()
+        parent, is_end, weights = self.parent.tolist(), self.is_end.tolist(), self.weights.tolist()
+        # Breadth-first numbering puts every parent before its children
+        nodes, keys = [tree.root], [""]
+        tree.root.is_end, tree.root.weight = bool(is_end[0]), weights[0]
+        for i in range(1, len(parent)):
+            start = label_start[i]
+            prefix = labels[start:start + label_len[i]].decode("utf-8")
+            node = RadixNode(prefix, bool(is_end[i]))
+            if node.is_end:
+                node.weight = weights[i]
+            nodes[parent[i]].children[prefix[0]] = node
+            nodes.append(node)
+            keys.append(keys[parent[i]] + prefix)
+        top_offsets, top_nodes = self.top_offsets.tolist(), self.top_nodes.tolist()
+        for i, node in enumerate(nodes):
+            node.top = [(-weights[j], keys[j]) for j in top_nodes[top_offsets[i]:top_offsets[i + 1]]]
+        tree.size = sum(is_end)
+        tree.node_count = len(nodes)
+        return tree
+
+    # --- Queries -------------------------------------------------------
+
+    def _child(self, node, key, i):
+        """The child of `node` whose label starts like key[i:], or -1."""
+        lo = self.first_child[node]
+        hi = lo + self.child_count[node]
+        first_byte = self.first_byte
+        target = key[i]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if first_byte[mid] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Several children can share a first byte when it starts a multi-byte character
+        end = self.first_child[node] + self.child_count[node]
+        while lo < end and first_byte[lo] == target:
+            start = self.label_start[lo]
+            n = min(self.label_len[lo], len(key) - i)
+            if self.labels[start:start + n] == key[i:i + n]:
+                return lo
+            lo += 1
+        return -1
+
+    def _walk(self, key, allow_partial):
+        """Node reached by spelling out `key`; with allow_partial, key may end mid-edge."""
+        node, i = 0, 0
+        while i < len(key):
+            child = self._child(node, key, i)
+            if child < 0:
+                return -1
+            n = self.label_len[child]
+            if len(key) - i < n and not allow_partial:
+                return -1
+            i += n
+            node = child
+        return node
+
+    def search(self, word):
+        node = self._walk(word.encode("utf-8"), False)
+        return node >= 0 and bool(self.is_end[node])
+
+    def word(self, node):
+        """Rebuilds the word that ends at `node`."""
+        labels, label_start, label_len, parent = self.labels, self.label_start, self.label_len, self.parent
+        parts = []
+        while node > 0:
+            start = label_start[node]
+            parts.append(labels[start:start + label_len[node]])
+            node = parent[node]
+        return b"".join(reversed(parts)).decode("utf-8")
+
+    def complete(self, prefix, k=10):
+        """Same results as RadixTree.complete."""
+        node = self._walk(prefix.encode("utf-8"), True)
+        if node < 0:
+            return []
+        if k <= self.top_k:
+            lo = self.top_offsets[node]
+            hi = min(lo + k, self.top_offsets[node + 1])
+            return [self.word(self.top_nodes[pos]) for pos in range(lo, hi)]
+        entries = []
+        stack = [node]
+        while stack:
+            v = stack.pop()
+            if self.is_end[v]:
+                entries.append((-self.weights[v], self.word(v)))
+            stack.extend(range(self.first_child[v], self.first_child[v] + self.child_count[v]))
+        return [word for _, word in heapq.nsmallest(k, entries)]
+
+    def close(self):
+        """Releases a tree returned by open(). It must not be used afterwards."""
+        if self._mmap is None:
+            return
+        for name, _, _ in self.COLUMNS:
+            getattr(self, name).release()
+        self.labels.release()
+        mapping, buffer = self._mmap
+        buffer.release()
+        if mapping is not None:
+            mapping.close()
+        self._mmap = None
\ No newline at end of file
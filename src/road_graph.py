@@ -0,0 +1,196 @@
+import math
+from array import array
+
+from .fibonacci_heap import FibonacciHeap
+from .r_tree import RTree
+
+class RoadGraph:
+    """
+    Street network stored in compressed sparse row (CSR) form: the arcs
+    leaving node u are targets[offsets[u]:offsets[u + 1]], with matching
+    travel times in weights. Node coordinates live in two flat columns.
+
+    Edge-list file format (one record per line, '#' starts a comment):
+        v <node_id> <x> <y>          a junction and its coordinates
+        e <node_a> <node_b> <time>   a two-way street
+        a <from> <to> <time>         a one-way street
+    """
+    def __init__(self, node_ids, xs, ys, arcs):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.xs = array("d", xs)
+        self.ys = array("d", ys)
+        self.offsets, self.targets, self.weights = self._build_csr(len(self.node_ids), arcs)
+        self._reverse = None
+        self._node_index = None
+        self._heuristic_scale = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def arc_count(self):
+        return len(self.targets)
+
+    @staticmethod
+    def _build_csr(n, arcs):
+        """Counting sort of (u, v, w) arcs by source node into three flat arrays."""
+        arcs = list(arcs)
+        offsets = array("l", [0]) * (n + 1)
+        for u, _, _ in arcs:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        fill = array("l", offsets[:-1])
+        targets = array("l", [0]) * len(arcs)
+        weights = array("d", [0.0]) * len(arcs)
+        for u, v, w in arcs:
+            pos = fill[u]
+            targets[pos], weights[pos] = v, w
+            fill[u] = pos + 1
+        return offsets, targets, weights
+
+    @classmethod
+    def load(cls, path):
+        """Reads the edge-list format described in the class docstring."""
+        node_ids, xs, ys, index, arcs = [], [], [], {}, []
+        with open(path, "r") as f:
+            for line_no, line in enumerate(f, 1):
+                fields = line.split("#", 1)[0].split()
+                if not fields:
+                    continue
+                kind = fields[0]
+                if kind == "v":
+                    index[fields[1]] = len(node_ids)
+                    node_ids.append(fields[1])
+                    xs.append(float(fields[2]))
+                    ys.append(float(fields[3]))
+                elif kind in ("e", "a"):
+                    u, v, w = index[fields[1]], index[fields[2]], float(fields[3])
+                    arcs.append((u, v, w))
+                    if kind == "e":
+                        arcs.append((v, u, w))
+                else:
+                    raise ValueError(f"{path}:{line_no}: unknown record type '{kind}'")
+        return cls(node_ids, xs, ys, arcs)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            for i, node_id in enumerate(self.node_ids):
+                f.write(f"v {node_id} {self.xs[i]!r} {self.ys[i]!r}\n")
+            for u in range(len(self.node_ids)):
+                for pos in range(self.offsets[u], self.offsets[u + 1]):
+                    f.write(f"a {self.node_ids[u]} {self.node_ids[self.targets[pos]]} {self.weights[pos]!r}\n")
+
+    def reversed(self):
+        """The same graph with every arc flipped (cached), for searches towards a target."""
+        if self._reverse is None:
+            arcs = ((self.targets[pos], u, self.weights[pos])
+                    for u in range(len(self.node_ids))
+                    for pos in range(self.offsets[u], self.offsets[u + 1]))
+            rev = RoadGraph.__new__(RoadGraph)
+            rev.node_ids, rev.index, rev.xs, rev.ys = self.node_ids, self.index, self.xs, self.ys
+            rev.offsets, rev.targets, rev.weights = self._build_csr(len(self.node_ids), arcs)
+            rev._reverse, rev._node_index, rev._heuristic_scale = self, self._node_index, self._heuristic_scale
+            self._reverse = rev
+        return self._reverse
+
+    def nearest_node(self, x, y):
+        """Snaps an arbitrary position to the closest junction (internal index)."""
+        if self._node_index is None:
+            self._node_index = RTree(max_entries=16)
+            self._node_index.bulk_load(((self.xs[i], self.ys[i]), i) for i in range(len(self.node_ids)))
+        hit = self._node_index.nearest(x, y, 1)
+        return hit[0][2] if hit else None
+
+    def heuristic_scale(self):
+        """
+        Smallest travel time per unit of straight-line distance over all arcs.
+        Multiplying a Euclidean distance by it never overestimates, which
+        keeps the A* heuristic admissible.
+        """
+        if self._heuristic_scale is None:
+            scale = math.inf
+            for u in range(len(self.node_ids)):
+                for pos in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[pos]
+                    length = math.hypot(self.xs[u] - self.xs[v], self.ys[u] - self.ys[v])
+                    if length > 0:
+                        scale = min(scale, self.weights[pos] / length)
+            self._heuristic_scale = 0.0 if scale == math.inf else scale
+        return self._heuristic_scale
+
+    def dijkstra(self, source, targets=None, max_cost=None):
+        """
+        Travel times from internal node `source`. With `targets`, the search
+        stops as soon as every target is settled (one search serves many
+        drivers) and only their times are returned; unreachable ones are omitted.
+        """
+        remaining = set(targets) if targets is not None else None
+        dist, _ = self._search(source, remaining, max_cost)
+        if targets is None:
+            return dist
+        return {t: dist[t] for t in targets if t in dist}
+
+    def astar(self, source, target):
+        """Returns (travel_time, [node, ...]) from source to target, or (inf, [])."""
+        scale = self.heuristic_scale()
+        tx, ty = self.xs[target], self.ys[target]
+        xs, ys = self.xs, self.ys
+        heuristic = lambda v: scale * math.hypot(xs[v] - tx, ys[v] - ty)
+        dist, parent = self._search(source, {target}, None, heuristic)
+        if target not in dist:
+            return math.inf, []
+        path = [target]
+        while path[-1] != source:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return dist[target], path
+
+    def _search(self, source, remaining, max_cost, heuristic=None):
+        """
+        Label-setting search shared by Dijkstra and A*. The frontier is a
+        FibonacciHeap keyed by cost (+ heuristic); improving a tentative
+        cost uses decrease_key on the node's existing handle.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heap = FibonacciHeap()
+        best = {source: 0.0}
+        parent = {source: source}
+        settled = {}
+        heap.insert(heuristic(source) if heuristic else 0.0, source)
+        try:
+            while len(heap):
+                u = heap.extract_min().value
+                cost = best[u]
+                if max_cost is not None and cost > max_cost:
+                    break
+                settled[u] = cost
+                if remaining is not None:
+                    remaining.discard(u)
+                    if not remaining:
+                        break
+                for pos in range(offsets[u], offsets[u + 1]):
+                    v = targets[pos]
+                    if v in settled:
+                        continue
+                    new_cost = cost + weights[pos]
+                    old = best.get(v)
+                    if old is None or new_cost < old:
+                        best[v] = new_cost
+                        parent[v] = u
+                        key = new_cost + heuristic(v) if heuristic else new_cost
+                        if old is None:
+                            heap.insert(key, v)
+                        else:
+                            heap.decrease_key(heap.handles[v], key)
+        finally:
+            heap.clear()
+        return settled, parent
+
+    def travel_times_to(self, destination, sources):
+        """
+        Travel time from each internal source node to `destination`, found
+        with one multi-target Dijkstra over the reversed graph.
+        """
+        return self.reversed().dijkstra(destination, targets=sources)
@@ -0,0 +1,202 @@
+"""
+JSON-lines dispatch service in front of a LogisticsEngine.
+
+Run from the repository root:
+    python -m src.server --port 8765 --data data/mock_data.json
+
+Each request is one JSON object per line, answered by one JSON line:
+    {"id": 1, "op": "dispatch", "user_id": "u1", "destination": "Downtown", "coords": [50, 50]}
+    {"id": 1, "ok": true, "result": "Success! Driver ... assigned. ..."}
+
+Operations: dispatch, dispatch_batch, update, remove, release, blacklist,
+unblacklist, suggest, stats, metrics. Errors come back as
+{"ok": false, "error": ...}. With --metrics, "metrics" returns per-stage
+latency histograms ({"format": "text"} for the Prometheus text format).
+
+Clients may pipeline: send many lines without waiting. Each connection's
+requests run one after another, in order (an update is applied before the
+dispatch sent after it), on a thread pool shared by all connections, so
+separate connections are served in parallel by the thread-safe engine.
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import LogisticsEngine
+
+class DispatchServer:
+    def __init__(self, engine, workers=4, max_in_flight=256, max_line_bytes=1 << 20):
+        self.engine = engine
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Per-connection pipelining depth; reading pauses while this many are queued
+        self.max_in_flight = max_in_flight
+        # Longer request lines get an error and the connection is closed
+        self.max_line_bytes = max_line_bytes
+        self.handlers = {
+            "dispatch": self._dispatch,
+            "dispatch_batch": self._dispatch_batch,
+            "update": self._update,
+            "remove": self._remove,
+            "release": self._release,
+            "blacklist": self._blacklist,
+            "unblacklist": self._unblacklist,
+            "suggest": self._suggest,
+            "stats": self._stats,
+            "metrics": self._metrics,
+        }
+
+    # --- Operations ----------------------------------------------------
+
+    def _dispatch(self, msg):
+        return {"result": self.engine.find_best_driver(msg["user_id"], msg["destination"], tuple(msg["coords"]))}
+
+    def _dispatch_batch(self, msg):
+        requests = [(user_id, destination, tuple(coords)) for user_id, destination, coords in msg["requests"]]
+        return {"results": self.engine.dispatch_batch(requests)}
+
+    def _update(self, msg):
+        self.engine.update_driver(msg["driver_id"], tuple(msg["coords"]))
+        return {}
+
+    def _remove(self, msg):
+        return {"removed": self.engine.remove_driver(msg["driver_id"])}
+
+    def _release(self, msg):
+        self.engine.release_driver(msg["driver_id"])
+        return {}
+
+    def _blacklist(self, msg):
+        self.engine.blacklist_user(msg["user_id"])
+        return {}
+
+    def _unblacklist(self, msg):
+        return {"removed": self.engine.unblacklist_user(msg["user_id"])}
+
+    def _suggest(self, msg):
+        return {"suggestions": self.engine.suggest_locations(msg["prefix"], msg.get("k", 5))}
+
+    def _stats(self, msg):
+        engine = self.engine
+        with engine.lock.read_locked():
+            return {"drivers": len(engine.driver_index), "busy": len(engine.busy_drivers),
+                    "security": engine.security_stats()}
+
+    def _metrics(self, msg):
+        if msg.get("format") == "text":
+            return {"text": self.engine.metrics_text()}
+        return {"metrics": self.engine.metrics_snapshot()}
+
+    def handle(self, line):
+        """Answers one request line; never raises."""
+        request_id = None
+        try:
+            msg = json.loads(line)
+            request_id = msg.get("id")
+            handler = self.handlers.get(msg.get("op"))
+            if handler is None:
+                raise ValueError(f"unknown op {msg.get('op')!r}")
+            response = handler(msg)
+            response["ok"] = True
+        except Exception as exc:
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        response["id"] = request_id
+        return json.dumps(response).encode("utf-8") + b"\n"
+
+    def _line_too_long(self, _):
+        return json.dumps({"ok": False, "error": f"ValueError: request line longer than {self.max_line_bytes} bytes",
+                           "id": None}).encode("utf-8") + b"\n"
+
+    # --- Networking ----------------------------------------------------
+
+    async def _serve_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(self.max_in_flight)
+
+        # Queue items are (answer, line) pairs, answered in order on the thread pool
+        async def respond():
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                writer.write(await loop.run_in_executor(self.executor, *item))
+                if pending.empty():
+                    await writer.drain()
+
+        responder = asyncio.create_task(respond())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put((self.handle, line))
+        except ValueError:
+            # readline() gave up on a line over the stream limit; the rest of it can't be parsed
+            await pending.put((self._line_too_long, None))
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                await pending.put(None)
+                await responder
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                # Also when the server shuts down and cancels this handler
+                responder.cancel()
+                writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts listening and returns the asyncio server (port=0 picks a free port)."""
+        return await asyncio.start_server(self._serve_connection, host, port, limit=self.max_line_bytes)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+def load_engine(data_path, metrics=False, snapshot_path=None):
+    if snapshot_path:
+        return LogisticsEngine.load_snapshot(snapshot_path, metrics=metrics)
+    engine = LogisticsEngine(metrics=metrics)
+    if data_path and os.path.exists(data_path):
+        with open(data_path, "r") as f:
+            data = json.load(f)
+        for loc in data["locations"]:
+            engine.add_location(loc)
+        engine.add_drivers((d["id"], tuple(d["coords"])) for d in data["drivers"])
+    return engine
+
+async def serve(host, port, data_path, workers, metrics=False, snapshot_path=None):
+    server = DispatchServer(load_engine(data_path, metrics, snapshot_path), workers=workers)
+    listener = await server.start(host, port)
+    bound = listener.sockets[0].getsockname()
+    # Load generators started with --port 0 read the port from this line
+    print(f"listening on {bound[0]}:{bound[1]}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", default="data/mock_data.json")
+    parser.add_argument("--snapshot", help="start from a LogisticsEngine.save_snapshot() file instead of --data")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--metrics", action="store_true", help="record per-stage latency for the metrics op")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data, args.workers, args.metrics, args.snapshot))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import heapq
+import math
+import multiprocessing
+
+from .r_tree import RTree
+
+def _shard_worker(conn, max_entries):
+    """Event loop of one shard process: an R-tree driven by messages on `conn`."""
+    tree = RTree(max_entries=max_entries)
+    while True:
+        msg = conn.recv()
+        op = msg[0]
+        if op == "batch":
+            # Updates and removals, applied in the order the coordinator saw them
+            for kind, driver_id, coords in msg[1]:
+                if kind == "update":
+                    tree.update(driver_id, coords)
+                else:
+                    tree.delete(driver_id)
+        elif op == "bulk":
+            tree.bulk_load(msg[1])
+        elif op == "nearest":
+            conn.send([tree.nearest(x, y, k, max_dist) for x, y, k, max_dist in msg[1]])
+        elif op == "len":
+            conn.send(len(tree))
+        elif op == "stop":
+            conn.close()
+            return
+
+class ShardedEngine:
+    """
+    Driver index split over a grid of tiles, one worker process (and one
+    R-tree) per tile, so spatial queries use every core.
+
+    The coordinator remembers which tile owns each driver and routes
+    updates there; a driver crossing a tile edge is removed from its old
+    shard. A nearest-driver query goes to the home tile's shard first and
+    fans out only to tiles closer than its k-th result (or max_dist), then
+    the results are merged by distance. Positions outside `bounds` belong
+    to the nearest edge tile.
+
+    Queries and updates are batched per shard (nearest_many, update_many)
+    so all shards work in parallel; use as a context manager or call close().
+    """
+    def __init__(self, bounds=(0.0, 0.0, 100.0, 100.0), grid=(2, 2), max_entries=16):
+        self.x0, self.y0, x1, y1 = bounds
+        self.cols, self.rows = grid
+        self.tile_w = (x1 - self.x0) / self.cols
+        self.tile_h = (y1 - self.y0) / self.rows
+        self.owner = {}  # driver_id -> tile index
+
+        ctx = multiprocessing.get_context()
+        self.shards = []  # (process, connection) per tile
+        for _ in range(self.cols * self.rows):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_shard_worker, args=(child, max_entries), daemon=True)
+            process.start()
+            child.close()
+            self.shards.append((process, parent))
+
+    def __len__(self):
+        return len(self.owner)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for process, conn in self.shards:
+            if process.is_alive():
+                conn.send(("stop",))
+            conn.close()
+        for process, _ in self.shards:
+            process.join()
+        self.shards = []
+
+    # --- Tiles ---------------------------------------------------------
+
+    def tile_of(self, x, y):
+        col = min(self.cols - 1, max(0, int((x - self.x0) // self.tile_w)))
+        row = min(self.rows - 1, max(0, int((y - self.y0) // self.tile_h)))
+        return row * self.cols + col
+
+    def _tile_mindist(self, tile, x, y):
+        """Distance from (x, y) to the tile's area; edge tiles extend to infinity."""
+        row, col = divmod(tile, self.cols)
+        lo_x = -math.inf if col == 0 else self.x0 + col * self.tile_w
+        hi_x = math.inf if col == self.cols - 1 else self.x0 + (col + 1) * self.tile_w
+        lo_y = -math.inf if row == 0 else self.y0 + row * self.tile_h
+        hi_y = math.inf if row == self.rows - 1 else self.y0 + (row + 1) * self.tile_h
+        dx = lo_x - x if x < lo_x else (x - hi_x if x > hi_x else 0.0)
+        dy = lo_y - y if y < lo_y else (y - hi_y if y > hi_y else 0.0)
+        return math.hypot(dx, dy)
+
+    # --- Updates -------------------------------------------------------
+
+    def update_driver(self, driver_id, coords):
+        self.update_many([(driver_id, coords)])
+
+    def remove_driver(self, driver_id):
+        """Takes a driver off the map. Returns False if the ID was unknown."""
+        tile = self.owner.pop(driver_id, None)
+        if tile is None:
+            return False
+        self.shards[tile][1].send(("batch", [("remove", driver_id, None)]))
+        return True
+
+    def update_many(self, pings):
+        """Applies (driver_id, coords) pings; one message per affected shard, no reply awaited."""
+        ops = {}
+        for driver_id, coords in pings:
+            tile = self.tile_of(coords[0], coords[1])
+            old = self.owner.get(driver_id)
+            if old is not None and old != tile:
+                ops.setdefault(old, []).append(("remove", driver_id, None))
+            ops.setdefault(tile, []).append(("update", driver_id, tuple(coords)))
+            self.owner[driver_id] = tile
+        for tile, batch in ops.items():
+            self.shards[tile][1].send(("batch", batch))
+
+    def add_drivers(self, drivers):
+        """Bulk-loads (driver_id, coords) pairs into each shard with STR packing."""
+        loads = {}
+        moved = {}
+        for driver_id, coords in drivers:
+            tile = self.tile_of(coords[0], coords[1])
+            old = self.owner.get(driver_id)
+            if old is not None and old != tile:
+                moved.setdefault(old, []).append(("remove", driver_id, None))
+            loads.setdefault(tile, []).append((tuple(coords), driver_id))
+            self.owner[driver_id] = tile
+        for tile, batch in moved.items():
+            self.shards[tile][1].send(("batch", batch))
+        for tile, entries in loads.items():
+            self.shards[tile][1].send(("bulk", entries))
+
+    # --- Queries -------------------------------------------------------
+
+    def _scatter(self, requests):
+        """Sends {tile: [(query_index, x, y, k, max_dist)]} and gathers {query_index: [results]}."""
+        for tile, queries in requests.items():
+            self.shards[tile][1].send(("nearest", [q[1:] for q in queries]))
+        gathered = {}
+        for tile, queries in requests.items():
+            for q, hits in zip(queries, self.shards[tile][1].recv()):
+                gathered.setdefault(q[0], []).append(hits)
+        return gathered
+
+    def nearest_many(self, points, k=1, max_dist=None):
+        """
+        k nearest drivers for each (x, y) in `points`, as lists of
+        (distance, point, driver_id), closest first.
+        """
+        points = list(points)
+        # Round 1: every query goes to its home shard
+        home = [self.tile_of(x, y) for x, y in points]
+        requests = {}
+        for i, (x, y) in enumerate(points):
+            requests.setdefault(home[i], []).append((i, x, y, k, max_dist))
+        results = [hits[0] for _, hits in sorted(self._scatter(requests).items())] if points else []
+
+        # Round 2: fan out to tiles that could still hold something closer
+        requests = {}
+        for i, (x, y) in enumerate(points):
+            bound = results[i][-1][0] if len(results[i]) == k else math.inf
+            if max_dist is not None:
+                bound = min(bound, max_dist)
+            for tile in range(len(self.shards)):
+                if tile == home[i]:
+                    continue
+                gap = self._tile_mindist(tile, x, y)
+                if gap < bound or (gap == bound and len(results[i]) < k):
+                    requests.setdefault(tile, []).append((i, x, y, k, max_dist))
+        for i, extra in self._scatter(requests).items():
+            results[i] = list(heapq.merge(results[i], *extra, key=lambda hit: hit[0]))[:k]
+        return results
+
+    def nearest(self, x, y, k=1, max_dist=None):
+        return self.nearest_many([(x, y)], k, max_dist)[0]
+
+    def shard_sizes(self):
+        """Number of drivers held by each shard process (a round trip to every shard)."""
+        for _, conn in self.shards:
+            conn.send(("len",))
+        return [conn.recv() for _, conn in self.shards]
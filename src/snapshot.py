@@ -0,0 +1,68 @@
+"""
+Engine snapshot file: one versioned binary file made of named sections.
+
+Layout: a header (magic, version, section count), a table of
+(name, offset, length) entries, then the sections themselves, each
+starting on an 8-byte boundary so typed arrays can be read straight out
+of the memory-mapped file. Each section holds one structure in its own
+binary format (BloomFilter, FrozenRadixTree, PackedRTree) or JSON.
+"""
+import mmap as _mmap
+import os
+import struct
+
+MAGIC = b"GSES"
+VERSION = 1
+# magic, version, section count
+HEADER = struct.Struct("<4sHH")
+# section name, offset from the start of the file, length in bytes
+ENTRY = struct.Struct("<24sQQ")
+
+def write_snapshot(path, sections):
+    """
+    Writes (name, write) pairs, where write(f) emits one section at the
+    current position of binary file f. Like BloomFilter.save, the file is
+    written under a temporary name and renamed over `path` when complete.
+    """
+    sections = list(sections)
+    tmp = f"{path}.tmp{os.getpid()}"
+    table = []
+    with open(tmp, "wb") as f:
+        f.write(bytes(HEADER.size + ENTRY.size * len(sections)))  # filled in below
+        for name, write in sections:
+            f.write(bytes(-f.tell() % 8))
+            start = f.tell()
+            write(f)
+            table.append((name.encode("utf-8"), start, f.tell() - start))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(table)))
+        for entry in table:
+            f.write(ENTRY.pack(*entry))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def open_snapshot(path):
+    """
+    Maps `path` read-only and returns (mapping, {name: memoryview}). The
+    views stay valid until the mapping is closed, even if the file is
+    replaced by a newer snapshot in the meantime.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            raise ValueError(f"{path} is not an engine snapshot")
+        mapping = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+    buffer = memoryview(mapping)
+    if len(buffer) < HEADER.size or bytes(buffer[:4]) != MAGIC:
+        raise ValueError(f"{path} is not an engine snapshot")
+    _, version, count = HEADER.unpack(buffer[:HEADER.size])
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported version {version}")
+    sections = {}
+    for i in range(count):
+        pos = HEADER.size + i * ENTRY.size
+        name, offset, length = ENTRY.unpack(buffer[pos:pos + ENTRY.size])
+        if offset + length > len(buffer):
+            raise ValueError(f"{path} is truncated")
+        sections[name.rstrip(b"\0").decode("utf-8")] = buffer[offset:offset + length]
+    return mapping, sections
@@ -0,0 +1,509 @@
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import threading
+import pytest
+from src.engine import LogisticsEngine
+from src.bloom_filter import BloomFilter, CountingBloomFilter, ScalableBloomFilter
+from src.road_graph import RoadGraph
+from src.contraction import ContractionHierarchy
+from src.concurrency import RWLock
+from src.server import DispatchServer
+from src.r_tree import RTree, PackedRTree
+from src.sharding import ShardedEngine
+from src.ingest import ingest, coalesce_pings
+from src.radix_tree import FrozenRadixTree
+
+def test_gps_pings_move_drivers_instead_of_duplicating():
+    engine = LogisticsEngine(max_search_radius=10)
+    engine.add_location("Downtown")
+    engine.add_driver("Driver_A", (2, 2))
+    engine.add_driver("Driver_A", (40, 40))  # second ping, same driver
+    engine.update_driver("Driver_A", (41, 41))
+    engine.add_driver("Driver_B", (50, 50))
+
+    assert len(engine.driver_index) == 2
+    assert "Driver_A" in engine.find_best_driver("user_1", "Downtown", (42, 42))
+    assert engine.find_best_driver("user_1", "Downtown", (0, 0)) == "No drivers found in your area."
+
+    assert engine.remove_driver("Driver_A") is True
+    assert engine.remove_driver("Driver_A") is False
+    assert "Driver_B" in engine.find_best_driver("user_2", "Downtown", (48, 48))
+
+def test_nearest_driver_beyond_old_box_radius_is_found():
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_driver("Far_Driver", (10.5, 0))
+    engine.add_driver("Corner_Driver", (30, 30))
+    result = engine.find_best_driver("user_1", "Downtown", (0, 0))
+    assert result == "Success! Driver Far_Driver assigned. Distance: 10.50 units."
+
+def test_columnar_engine_ranks_like_brute_force():
+    random.seed(4)
+    drivers = [(f"D{i}", (random.uniform(0, 100), random.uniform(0, 100))) for i in range(400)]
+    engine = LogisticsEngine(max_search_radius=15, columnar=True)
+    engine.add_location("Downtown")
+    engine.add_drivers(drivers)
+    engine.remove_driver("D0")
+    engine.update_driver("D1", (50, 50))
+    positions = dict(drivers[1:])
+    positions["D1"] = (50, 50)
+
+    for coords in [(50, 50.5), (10, 90), (75, 30)]:
+        dist, best = min((math.dist(coords, p), d) for d, p in positions.items())
+        expected = f"Success! Driver {best} assigned. Distance: {dist:.2f} units."
+        assert engine.find_best_driver("u", "Downtown", coords) == expected
+
+def test_requests_do_not_leak_candidates_into_each_other():
+    engine = LogisticsEngine(max_search_radius=10)
+    engine.add_location("Downtown")
+    engine.add_drivers([("North_Driver", (50, 95)), ("South_Driver", (50, 5))])
+
+    assert "North_Driver" in engine.find_best_driver("u1", "Downtown", (50, 90))
+    # Before, North_Driver stayed in the shared heap and was handed out again here
+    assert "South_Driver" in engine.find_best_driver("u2", "Downtown", (50, 4))
+    assert len(engine.routing_priority) == 0
+
+    ranked = engine.rank_candidates((0, 0), [((3, 4), "A"), ((1, 1), "B"), ((6, 8), "C")], k=2)
+    assert ranked == [(2 ** 0.5, "B"), (5.0, "A")]
+    assert len(engine.routing_priority) == 0
+
+def test_travel_time_ranking_beats_straight_line(tmp_path):
+    # A river between y=0 and y=10 with the only bridge far to the east
+    path = tmp_path / "river.txt"
+    path.write_text(
+        "v customer 0 0\nv across 0 10\nv bridge_s 50 0\nv bridge_n 50 10\nv road 0 -20\n"
+        "e customer bridge_s 50\ne bridge_s bridge_n 10\ne bridge_n across 50\ne road customer 20\n")
+    engine = LogisticsEngine(road_graph=RoadGraph.load(path))
+    engine.add_location("Downtown")
+    engine.add_drivers([("Across_River", (0, 10)), ("Down_The_Road", (0, -20))])
+
+    assert engine.find_best_driver("u", "Downtown", (0, 0)) == \
+        "Success! Driver Down_The_Road assigned. Travel time: 20.00 units."
+    assert engine.rank_by_travel_time((0, 0), [((0, 10), "Across_River")]) == [(110.0, "Across_River")]
+
+def test_engine_can_route_with_a_contraction_hierarchy(tmp_path):
+    path = tmp_path / "river.txt"
+    path.write_text(
+        "v customer 0 0\nv across 0 10\nv bridge_s 50 0\nv bridge_n 50 10\nv road 0 -20\n"
+        "e customer bridge_s 50\ne bridge_s bridge_n 10\ne bridge_n across 50\ne road customer 20\n")
+    engine = LogisticsEngine(road_graph=ContractionHierarchy.build(RoadGraph.load(path)))
+    engine.add_drivers([("Across_River", (0, 10))])
+    assert engine.rank_by_travel_time((0, 0), [((0, 10), "Across_River")]) == [(110.0, "Across_River")]
+
+def test_dispatch_batch_never_double_books_a_driver():
+    engine = LogisticsEngine(candidate_pool=3)
+    engine.add_location("Downtown")
+    engine.blacklist_user("hacker_01")
+    engine.add_drivers([("A", (0, 0)), ("B", (10, 0))])
+
+    # Greedy would give A to u1 and send B 11 units to u2 (total 12);
+    # the optimal pairing is u1 -> B, u2 -> A (total 10).
+    results = engine.dispatch_batch([
+        ("u1", "Downtown", (1, 0)),
+        ("u2", "Downtown", (-1, 0)),
+        ("hacker_01", "Downtown", (0, 0)),
+        ("u3", "Nowhere", (0, 0)),
+        ("u4", "Downtown", (50, 50)),  # too far to beat either pairing
+    ])
+    assert results == [
+        "Success! Driver B assigned. Distance: 9.00 units.",
+        "Success! Driver A assigned. Distance: 1.00 units.",
+        "ACCESS DENIED: User ID flagged by security filter.",
+        "ERROR: Location 'Nowhere' not found in registry.",
+        "No drivers found in your area.",
+    ]
+    assert engine.busy_drivers == {"A", "B"}
+    assert engine.find_best_driver("u5", "Downtown", (0, 0)) == "No drivers found in your area."
+    engine.release_driver("A")
+    assert "Driver A" in engine.find_best_driver("u5", "Downtown", (0, 0))
+
+def test_dispatch_batch_serves_co_located_customers_beyond_candidate_pool():
+    engine = LogisticsEngine(candidate_pool=5)
+    engine.add_location("Downtown")
+    engine.add_drivers((f"D{i}", (50 + i / 10, 50)) for i in range(50))
+
+    results = engine.dispatch_batch([(f"u{i}", "Downtown", (50, 50)) for i in range(10)])
+    assert all(r.startswith("Success") for r in results)
+    # Everyone sits on the same spot, so the ten closest drivers are the optimum
+    assert engine.busy_drivers == {f"D{i}" for i in range(10)}
+
+    few = LogisticsEngine(candidate_pool=2)
+    few.add_location("Downtown")
+    few.add_drivers([("A", (0, 0)), ("B", (1, 0)), ("C", (2, 0))])
+    results = few.dispatch_batch([(f"u{i}", "Downtown", (0, 0)) for i in range(5)])
+    assert sum(r.startswith("Success") for r in results) == 3
+    assert results.count("No drivers found in your area.") == 2
+
+def test_blacklist_grows_past_initial_capacity_and_can_be_lifted():
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_driver("Driver_A", (1, 1))
+    for i in range(3000):
+        engine.blacklist_user(f"bot_{i}")
+
+    stats = engine.security_stats()
+    # add() skips IDs that already (possibly falsely) match, so a few are not counted
+    assert 2950 <= stats["elements_added"] <= 3000 and stats["sub_filters"] > 1
+    assert stats["estimated_false_positive_rate"] < 0.01
+    assert 0 < stats["fill_ratio"] < 1
+
+    assert engine.find_best_driver("bot_42", "Downtown", (0, 0)).startswith("ACCESS DENIED")
+    assert engine.unblacklist_user("bot_42") is True
+    assert "Driver_A" in engine.find_best_driver("bot_42", "Downtown", (0, 0))
+
+def test_shared_blacklist_file_is_checked_and_reloaded(tmp_path):
+    path = str(tmp_path / "blacklist.bloom")
+    published = BloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    published.add("bot_1")
+    published.save(path)
+
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_driver("Driver_A", (1, 1))
+    engine.load_shared_blacklist(path)
+    assert engine.find_best_driver("bot_1", "Downtown", (0, 0)).startswith("ACCESS DENIED")
+    assert not engine.refresh_shared_blacklist()
+
+    published.add("bot_2")
+    published.save(path)
+    assert engine.dispatch_batch([("bot_2", "Downtown", (0, 0))])[0].startswith("Success")
+    assert engine.refresh_shared_blacklist()
+    results = engine.dispatch_batch([("bot_1", "Downtown", (0, 0)), ("bot_2", "Downtown", (0, 0))])
+    assert all(r.startswith("ACCESS DENIED") for r in results)
+    assert engine.security_stats()["shared"]["elements_added"] == 2
+
+def test_integer_user_ids_are_screened_like_strings():
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_driver("Driver_A", (1, 1))
+    assert "Driver_A" in engine.find_best_driver(123, "Downtown", (0, 0))
+    engine.blacklist_user(456)
+    assert engine.find_best_driver(456, "Downtown", (0, 0)).startswith("ACCESS DENIED")
+    assert engine.dispatch_batch([(456, "Downtown", (0, 0))])[0].startswith("ACCESS DENIED")
+    assert engine.unblacklist_user(456) is True
+
+def test_suggest_locations_ranks_by_popularity():
+    engine = LogisticsEngine()
+    engine.add_location("North Street", weight=3)
+    engine.add_location("North Avenue", weight=7)
+    engine.add_location("Downtown")
+    assert engine.suggest_locations("North") == ["North Avenue", "North Street"]
+    assert engine.suggest_locations("Down", k=1) == ["Downtown"]
+
+def test_misspelled_destination_gets_a_correction():
+    engine = LogisticsEngine()
+    engine.add_location("North Street", weight=2)
+    engine.add_location("North Avenue", weight=9)
+    engine.add_driver("Driver_A", (1, 1))
+
+    assert engine.correct_location("Nrth Street") == "North Street"
+    assert engine.correct_location("Sout Road") is None
+    message = engine.find_best_driver("user_1", "Nort Street", (0, 0))
+    assert message == "ERROR: Location 'Nort Street' not found in registry. Did you mean 'North Street'?"
+    assert engine.dispatch_batch([("user_1", "Nort Street", (0, 0))]) == [message]
+
+    strict = LogisticsEngine(location_typo_edits=0)
+    strict.add_location("North Street")
+    assert strict.find_best_driver("user_1", "Nort Street", (0, 0)).endswith("not found in registry.")
+
+def test_rw_lock_excludes_writers_and_allows_nested_sections():
+    lock = RWLock()
+    log = []
+
+    def writer():
+        with lock.write_locked():
+            log.append("write")
+
+    with lock.read_locked():
+        with lock.read_locked():  # nested read on the same thread
+            t = threading.Thread(target=writer)
+            t.start()
+            t.join(0.1)
+            assert log == []  # the writer waits for the reader
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()  # no upgrades
+    t.join(1)
+    assert log == ["write"]
+
+    with lock.write_locked():
+        with lock.read_locked(), lock.write_locked():
+            pass
+
+def test_engine_survives_concurrent_updates_and_dispatches():
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    engine.add_drivers((f"D{i}", (i % 100, i // 100)) for i in range(500))
+    errors = []
+
+    def pings(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(2000):
+                engine.update_driver(f"D{rng.randrange(500)}", (rng.uniform(0, 100), rng.uniform(0, 100)))
+        except Exception as exc:
+            errors.append(exc)
+
+    def lookups(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                result = engine.find_best_driver(f"u{seed}", "Downtown", (rng.uniform(0, 100), rng.uniform(0, 100)))
+                assert result.startswith("Success")
+                engine.blacklist_user(f"bot_{rng.randrange(1000)}")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=pings, args=(s,)) for s in range(3)] + \
+              [threading.Thread(target=lookups, args=(s,)) for s in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(engine.driver_index) == 500
+    assert all(engine.driver_index.get(f"D{i}") is not None for i in range(500))
+
+def test_dispatch_server_pipelines_json_requests():
+    engine = LogisticsEngine()
+    engine.add_location("Downtown")
+    server = DispatchServer(engine, workers=2)
+
+    async def scenario():
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        requests = [
+            {"id": 1, "op": "update", "driver_id": "Driver_A", "coords": [1, 1]},
+            {"id": 2, "op": "dispatch", "user_id": "u1", "destination": "Downtown", "coords": [0, 0]},
+            {"id": 3, "op": "blacklist", "user_id": "u2"},
+            {"id": 4, "op": "dispatch", "user_id": "u2", "destination": "Downtown", "coords": [0, 0]},
+            {"id": 5, "op": "teleport"},
+            {"id": 6, "op": "stats"},
+        ]
+        # Pipelined: everything is sent before the first response is read
+        writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        server.close()
+    assert [r["id"] for r in responses] == [1, 2, 3, 4, 5, 6]
+    assert "Driver_A" in responses[1]["result"]
+    assert responses[3]["result"].startswith("ACCESS DENIED")
+    assert not responses[4]["ok"] and "teleport" in responses[4]["error"]
+    assert responses[5]["drivers"] == 1
+
+def test_dispatch_server_rejects_overlong_lines():
+    server = DispatchServer(LogisticsEngine(), workers=1, max_line_bytes=1024)
+
+    async def scenario():
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"id": 1, "op": "stats"}\n' + b'{"id": 2, "op": "suggest", "prefix": "' + b"x" * 4096 + b'"}\n')
+        await writer.drain()
+        responses = [json.loads(line) for line in (await reader.read()).splitlines()]
+        writer.close()
+        await writer.wait_closed()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        server.close()
+    # The first request is still answered, then the connection is closed with an error
+    assert responses[0]["ok"] and responses[0]["id"] == 1
+    assert responses[1] == {"ok": False, "error": "ValueError: request line longer than 1024 bytes", "id": None}
+    assert len(responses) == 2
+
+def test_sharded_engine_matches_single_rtree():
+    rng = random.Random(8)
+    reference = RTree(max_entries=8)
+    with ShardedEngine(bounds=(0, 0, 100, 100), grid=(3, 2)) as sharded:
+        drivers = [(f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(600)]
+        sharded.add_drivers(drivers)
+        reference.bulk_load((coords, d_id) for d_id, coords in drivers)
+        # Moves across tile edges, a driver parked outside the bounds, and removals
+        pings = [(f"D{rng.randrange(600)}", (rng.uniform(-5, 105), rng.uniform(-5, 105))) for _ in range(400)]
+        sharded.update_many(pings)
+        for d_id, coords in pings:
+            reference.update(d_id, coords)
+        for i in range(0, 600, 7):
+            assert sharded.remove_driver(f"D{i}") == reference.delete(f"D{i}")
+        assert not sharded.remove_driver("nobody")
+
+        assert len(sharded) == len(reference) == sum(sharded.shard_sizes())
+        queries = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(100)]
+        for k, max_dist in ((1, None), (4, None), (3, 6.0)):
+            got = sharded.nearest_many(queries, k, max_dist)
+            for (x, y), hits in zip(queries, got):
+                expected = reference.nearest(x, y, k, max_dist)
+                assert [round(d, 9) for d, _, _ in hits] == [round(d, 9) for d, _, _ in expected]
+        assert sharded.nearest(50, 50, 2) == sharded.nearest_many([(50, 50)], 2)[0]
+
+def test_ping_stream_is_coalesced_into_micro_batches():
+    stream = io.StringIO(
+        "# driver x y ts\n"
+        "D1 1 1 0.0\n"
+        "D2 5 5 0.1\n"
+        "D1 2 2 0.2\n"          # coalesced with D1's first ping
+        "D1,9,9,0.15\n"         # out of order within the batch: older than 0.2, ignored
+        "garbage line\n"
+        "D2 6 6 1.0\n"          # window of 0.5 s elapsed: new batch
+        '{"driver_id": "D3", "x": 7, "y": 7, "ts": 1.1}\n'
+        "D1 50 50 0.1\n"        # older than what was already applied for D1
+    )
+    engine = LogisticsEngine()
+    batches = []
+
+    def apply(batch):
+        batches.append(sorted(batch))
+        engine.update_drivers(batch)
+
+    stats = ingest(stream, apply, window=0.5)
+    assert batches == [[("D1", (2.0, 2.0)), ("D2", (5.0, 5.0))],
+                       [("D2", (6.0, 6.0)), ("D3", (7.0, 7.0))]]
+    assert (stats["read"], stats["malformed"], stats["coalesced"], stats["stale"]) == (7, 1, 2, 1)
+    assert engine.driver_index.get("D1") == (2.0, 2.0)
+    assert len(engine.driver_index) == 3
+
+def test_ping_batches_are_bounded():
+    pings = ((f"D{i % 50}", i, i, 0.0) for i in range(1000))  # one instant, 50 drivers
+    sizes = [len(b) for b in coalesce_pings(pings, window=10, max_batch=20)]
+    assert max(sizes) == 20 and sum(sizes) <= 1000
+
+def test_last_ping_batch_is_applied_when_the_pipe_goes_quiet():
+    engine = LogisticsEngine()
+    read_fd, write_fd = os.pipe()
+    applied = threading.Event()
+
+    def apply(batch):
+        engine.update_drivers(batch)
+        applied.set()
+
+    with os.fdopen(read_fd) as stream, os.fdopen(write_fd, "w") as producer:
+        worker = threading.Thread(target=ingest, args=(stream, apply), kwargs={"window": 60, "idle": 0.05})
+        worker.start()
+        producer.write("D1 1 1 0\nD2 2 2 0.1\n")
+        producer.flush()
+        # No further pings and the pipe stays open: the idle timeout must flush the window
+        assert applied.wait(5)
+        assert engine.driver_index.get("D2") == (2.0, 2.0)
+    worker.join(5)
+    assert not worker.is_alive()
+
+def test_metrics_record_each_stage_and_export_text():
+    engine = LogisticsEngine(metrics=True)
+    engine.add_location("Downtown")
+    engine.add_drivers([("D1", (1, 1)), ("D2", (5, 5)), ("D3", (9, 9))])
+    engine.blacklist_user("bad_user")
+
+    assert "Success" in engine.find_best_driver("u1", "Downtown", (2, 2))
+    assert "DENIED" in engine.find_best_driver("bad_user", "Downtown", (2, 2))
+    assert "not found" in engine.find_best_driver("u2", "Uptown", (2, 2))
+
+    snap = engine.metrics_snapshot()
+    assert snap["requests"] == {"assigned": 1, "denied": 1, "unknown_location": 1, "no_driver": 0}
+    # Every request passes the Bloom check; only the assigned one reaches the R-tree and ranking
+    assert [snap["stage_seconds"][s]["count"] for s in ("bloom", "radix", "rtree", "ranking")] == [3, 2, 1, 1]
+    assert snap["work"]["candidates"]["sum"] == 3 and snap["work"]["heap_size"]["sum"] == 3
+    assert snap["work"]["rtree_nodes_visited"]["sum"] >= 1
+    assert snap["bloom"] == {"checks": 3, "positives": 1, "positive_rate": 1 / 3}
+    assert snap["gauges"]["drivers"] == 3 and snap["gauges"]["radix_nodes"] == 2
+
+    text = engine.metrics_text()
+    assert 'geostream_requests_total{outcome="assigned"} 1' in text
+    assert 'geostream_stage_seconds_bucket{stage="bloom",le="+Inf"} 3' in text
+    assert 'geostream_stage_seconds_count{stage="ranking"} 1' in text
+
+    assert LogisticsEngine().metrics_snapshot() is None
+
+def test_snapshot_round_trip_loads_layers_lazily(tmp_path):
+    rng = random.Random(5)
+    engine = LogisticsEngine(max_search_radius=30)
+    engine.add_drivers((f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(500))
+    for i, name in enumerate(["Downtown", "Dockyard", "Airport", "Harbor"]):
+        engine.add_location(name, weight=i + 1)
+    for i in range(1500):  # enough to grow a second sub-filter
+        engine.blacklist_user(f"bad_{i}")
+    engine.dispatch_batch([("u0", "Airport", (50, 50))])
+    path = str(tmp_path / "engine.snapshot")
+    engine.save_snapshot(path)
+
+    restored = LogisticsEngine.load_snapshot(path)
+    assert isinstance(restored.location_search, FrozenRadixTree)
+    assert isinstance(restored._driver_index, PackedRTree)
+    assert restored.suggest_locations("D") == ["Dockyard", "Downtown"]
+    assert restored.busy_drivers == engine.busy_drivers
+    assert restored.security_stats()["sub_filters"] == engine.security_stats()["sub_filters"]
+    for i in range(20):
+        request = (f"u{i}", "Harbor", (rng.uniform(0, 100), rng.uniform(0, 100)))
+        assert restored.find_best_driver(*request) == engine.find_best_driver(*request)
+    assert not isinstance(restored._driver_index, PackedRTree)  # thawed by the first dispatch
+    assert isinstance(restored.location_search, FrozenRadixTree)
+    restored.thaw()
+    assert not isinstance(restored.location_search, FrozenRadixTree)
+    assert restored.suggest_locations("D") == ["Dockyard", "Downtown"]
+    assert "DENIED" in restored.find_best_driver("bad_7", "Harbor", (50, 50))
+
+    # Still fully writable: typos, new locations, pings and bans all work after a restore
+    assert restored.correct_location("Airprt") == "Airport"
+    restored.add_location("Airfield")
+    restored.update_driver("D1", (0, 0))
+    assert restored.driver_index.get("D1") == (0, 0)
+    assert restored.unblacklist_user("bad_7") is True
+
+    # A restored engine saves again without thawing what it has not touched
+    again = LogisticsEngine.load_snapshot(path)
+    again.save_snapshot(path)
+    assert LogisticsEngine.load_snapshot(path).suggest_locations("A") == ["Airport"]
+
+def test_snapshot_keeps_integer_driver_ids_and_fractional_growth(tmp_path):
+    engine = LogisticsEngine()
+    engine.security_filter = ScalableBloomFilter(10, 0.01, growth=1.5, filter_class=CountingBloomFilter)
+    for i in range(40):
+        engine.blacklist_user(f"bad_{i}")
+    engine.add_location("Downtown")
+    engine.add_drivers([(7, (1, 1)), ("7", (2, 2)), (8, (9, 9))])
+    engine.dispatch_batch([("u1", "Downtown", (1, 1)), ("u2", "Downtown", (2, 2))])
+    path = str(tmp_path / "engine.snapshot")
+    engine.save_snapshot(path)
+
+    restored = LogisticsEngine.load_snapshot(path)
+    assert restored.busy_drivers == {7, "7"}
+    assert restored.find_best_driver("u3", "Downtown", (0, 0)) == "Success! Driver 8 assigned. Distance: 12.73 units."
+    assert restored.security_stats()["sub_filters"] == engine.security_stats()["sub_filters"] > 1
+    assert "DENIED" in restored.find_best_driver("bad_39", "Downtown", (0, 0))
+
+def test_map_view_switches_from_clusters_to_markers():
+    rng = random.Random(8)
+    engine = LogisticsEngine()
+    engine.add_drivers((f"D{i}", (rng.uniform(0, 100), rng.uniform(0, 100))) for i in range(2000))
+    engine.add_location("Downtown")
+
+    zoomed_out = engine.drivers_in_view((0, 0, 100, 100), max_markers=100, grid=10)
+    assert zoomed_out["total"] == 2000 and not zoomed_out["drivers"]
+    assert 0 < len(zoomed_out["clusters"]) <= 121  # a cluster may sit on the far edge of the grid
+
+    engine.dispatch_batch([("u1", "Downtown", (50, 50))])
+    zoomed_in = engine.drivers_in_view((45, 45, 55, 55), max_markers=100)
+    assert zoomed_in["total"] == len(zoomed_in["drivers"]) <= 100 and not zoomed_in["clusters"]
+    assert [d_id for _, d_id, busy in zoomed_in["drivers"] if busy] == list(engine.busy_drivers)
+
+    # The radius reaches exactly the farthest of the candidate_pool drivers that were ranked
+    available = [dist for dist, _, d in engine.driver_index.nearest(50, 50, 6) if d not in engine.busy_drivers]
+    assert engine.search_radius((50, 50)) == available[4]
+    assert LogisticsEngine(max_search_radius=3).search_radius((50, 50)) == 3
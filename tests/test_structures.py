@@ -1,6 +1,18 @@
+import io
+import itertools
+import math
+import random
 import pytest
-from src.bloom_filter import BloomFilter
-from src.radix_tree import RadixTree
+from src.bloom_filter import BloomFilter, CountingBloomFilter, ScalableBloomFilter
+from src.radix_tree import RadixTree, FrozenRadixTree
+from src.r_tree import RTree, PackedRTree
+from src.driver_store import DriverStore
+from src.fibonacci_heap import FibonacciHeap
+from src.road_graph import RoadGraph
+from data.generate_data import generate_road_network
+from src.contraction import ContractionHierarchy
+from src.assignment import min_cost_assignment
+from src.metrics import Histogram
 
 def test_bloom_filter_logic():
     bf = BloomFilter(expected_elements=100, false_positive_rate=0.01)
@@ -30,4 +42,502 @@ def test_radix_tree_split():
     rt.insert("interview")
     # Both share "inter", then split at 'a' and 'v'
     assert rt.search("interact") is True
-    assert rt.search("interview") is True
\ No newline at end of file
+    assert rt.search("interview") is True
+
+def _leaves(node):
+    if node.is_leaf:
+        return [node]
+    return [leaf for child in node.entries for leaf in _leaves(child)]
+
+def _check_rtree_invariants(tree, node, depth, leaf_depths):
+    # Every child must sit inside its parent's MBR and point back at it
+    if node.is_leaf:
+        leaf_depths.add(depth)
+        for point, _ in node.entries:
+            assert node.mbr.contains(point[0], point[1])
+        return len(node.entries)
+    count = 0
+    for child in node.entries:
+        assert child.parent is node
+        assert node.mbr.min_x <= child.mbr.min_x and child.mbr.max_x <= node.mbr.max_x
+        assert node.mbr.min_y <= child.mbr.min_y and child.mbr.max_y <= node.mbr.max_y
+        assert len(child.entries) <= tree.max_entries
+        count += _check_rtree_invariants(tree, child, depth + 1, leaf_depths)
+    return count
+
+def test_r_tree_split_keeps_every_driver():
+    random.seed(7)
+    tree = RTree(max_entries=4)
+    points = [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(500)]
+    for i, p in enumerate(points):
+        tree.insert(p, f"D{i}")
+
+    # The tree must grow deeper than one level and stay balanced
+    leaf_depths = set()
+    assert _check_rtree_invariants(tree, tree.root, 0, leaf_depths) == 500
+    assert len(leaf_depths) == 1 and tree.height() > 2
+    assert len(tree.search(50, 50, 100)) == 500
+
+    # Box search must agree with a brute-force scan
+    found = {d for _, d in tree.search(30, 60, 8)}
+    expected = {f"D{i}" for i, (x, y) in enumerate(points) if abs(x - 30) <= 8 and abs(y - 60) <= 8}
+    assert found == expected
+
+def test_r_tree_bulk_load_matches_incremental():
+    random.seed(11)
+    points = [((random.uniform(0, 100), random.uniform(0, 100)), f"D{i}") for i in range(1000)]
+    packed, incremental = RTree(max_entries=8), RTree(max_entries=8)
+    packed.bulk_load(points[:900])
+    packed.bulk_load(points[900:])  # re-packs existing entries with the new ones
+    for p, d in points:
+        incremental.insert(p, d)
+
+    leaf_depths = set()
+    assert _check_rtree_invariants(packed, packed.root, 0, leaf_depths) == len(packed) == 1000
+    assert len(leaf_depths) == 1
+    for x, y in [(10, 10), (50, 50), (90, 20)]:
+        assert sorted(packed.search(x, y, 7)) == sorted(incremental.search(x, y, 7))
+
+def test_r_tree_bulk_load_leaves_room_for_updates():
+    random.seed(12)
+    tree = RTree(max_entries=10)
+    tree.bulk_load(((random.uniform(0, 100), random.uniform(0, 100)), f"D{i}") for i in range(2000))
+    leaves = _leaves(tree.root)
+    assert max(len(leaf.entries) for leaf in leaves) == 7
+    # Small GPS moves after the load fit into the free slots instead of splitting leaves
+    for i in range(0, 2000, 5):
+        x, y = tree.get(f"D{i}")
+        tree.update(f"D{i}", (x + random.uniform(-0.5, 0.5), y + random.uniform(-0.5, 0.5)))
+    leaf_depths = set()
+    assert _check_rtree_invariants(tree, tree.root, 0, leaf_depths) == 2000
+    assert len(_leaves(tree.root)) < len(leaves) * 1.1
+
+def test_r_tree_delete_and_update():
+    random.seed(3)
+    tree = RTree(max_entries=4)
+    positions = {}
+    for i in range(300):
+        positions[f"D{i}"] = (random.uniform(0, 100), random.uniform(0, 100))
+        tree.insert(positions[f"D{i}"], f"D{i}")
+
+    # Move everyone a few times: some pings stay in the leaf, others relocate
+    for _ in range(3):
+        for d, (x, y) in positions.items():
+            positions[d] = (x + random.uniform(-5, 5), y + random.uniform(-5, 5))
+            tree.update(d, positions[d])
+    for i in range(0, 300, 2):
+        assert tree.delete(f"D{i}") is True
+        del positions[f"D{i}"]
+    assert tree.delete("D0") is False
+
+    leaf_depths = set()
+    assert _check_rtree_invariants(tree, tree.root, 0, leaf_depths) == len(tree) == 150
+    assert len(leaf_depths) == 1
+    assert sorted(tree.search(50, 50, 200)) == sorted((p, d) for d, p in positions.items())
+    assert tree.get("D1") == positions["D1"]
+
+    for d in list(positions):
+        tree.delete(d)
+    assert len(tree) == 0 and tree.search(50, 50, 200) == []
+
+def test_r_tree_nearest_matches_brute_force():
+    random.seed(5)
+    tree = RTree(max_entries=6)
+    points = [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(800)]
+    for i, p in enumerate(points):
+        tree.insert(p, i)
+
+    for qx, qy in [(0, 0), (50, 50), (99, 1), (-20, 130)]:
+        expected = sorted(math.dist((qx, qy), p) for p in points)
+        got = tree.nearest(qx, qy, k=7)
+        assert [round(d, 9) for d, _, _ in got] == [round(d, 9) for d in expected[:7]]
+
+    # max_dist is a true circle, not the enclosing square
+    within = tree.nearest(50, 50, k=1000, max_dist=8)
+    assert len(within) == sum(1 for p in points if math.dist((50, 50), p) <= 8)
+    assert RTree().nearest(0, 0, k=3) == []
+
+def test_driver_store_ranks_and_reuses_slots():
+    random.seed(9)
+    store = DriverStore(capacity=2)  # forces the columns to grow
+    points = {f"D{i}": (random.uniform(0, 100), random.uniform(0, 100)) for i in range(300)}
+    for d, p in points.items():
+        store.upsert(d, p)
+
+    ranked = store.rank((50, 50), k=4)
+    expected = sorted((math.dist((50, 50), p), d) for d, p in points.items())[:4]
+    assert [d for _, d in ranked] == [d for _, d in expected]
+    assert all(abs(a[0] - b[0]) < 1e-9 for a, b in zip(ranked, expected))
+
+    # A removed driver's slot goes to the next newcomer
+    slot = store._slot_of["D7"]
+    assert store.remove("D7") is True and "D7" not in store
+    assert store.upsert("D_new", (1, 1)) == slot
+    assert len(store) == 300
+    assert store.rank((0, 0), ["D1", "D_new", "D2"], k=1)[0][1] == "D_new"
+
+def test_fibonacci_heap_decrease_key_and_delete():
+    random.seed(13)
+    heap, other = FibonacciHeap(), FibonacciHeap()
+    keys = {}
+    for i in range(200):
+        keys[i] = random.uniform(0, 1000)
+        (heap if i % 2 else other).insert(keys[i], i)
+    heap.merge(other)
+    assert len(heap) == 200 and len(other) == 0
+
+    # Extract a few first so the heap has trees for cascading cuts to act on
+    for _ in range(20):
+        node = heap.extract_min()
+        assert node.key == min(keys.values())
+        del keys[node.value]
+    for value in random.sample(sorted(keys), 60):
+        keys[value] -= random.uniform(0, 500)
+        heap.decrease_key(heap.handle(value), keys[value])
+    for value in random.sample(sorted(keys), 30):
+        assert heap.delete(value).value == value
+        del keys[value]
+
+    with pytest.raises(ValueError):
+        heap.decrease_key(next(iter(keys)), float("inf"))
+    assert heap.peek().key == min(keys.values())
+    drained = [heap.extract_min().key for _ in range(len(heap))]
+    assert drained == sorted(keys.values())
+    assert heap.extract_min() is None and not heap.handles
+
+def test_road_graph_dijkstra_and_astar(tmp_path):
+    random.seed(21)
+    path = tmp_path / "roads.txt"
+    with open(path, "w") as f:
+        for i in range(60):
+            f.write(f"v n{i} {random.uniform(0, 100)} {random.uniform(0, 100)}\n")
+        arcs = set()
+        for _ in range(240):
+            u, v = random.sample(range(60), 2)
+            arcs.add((u, v))
+            f.write(f"a n{u} n{v} {random.uniform(150, 300)}  # long enough to keep A* admissible\n")
+    graph = RoadGraph.load(path)
+    assert len(graph) == 60
+
+    # Bellman-Ford reference over the raw arcs
+    source = graph.index["n0"]
+    ref = [math.inf] * 60
+    ref[source] = 0.0
+    for _ in range(60):
+        for u in range(60):
+            for pos in range(graph.offsets[u], graph.offsets[u + 1]):
+                ref[graph.targets[pos]] = min(ref[graph.targets[pos]], ref[u] + graph.weights[pos])
+
+    dist = graph.dijkstra(source)
+    assert all(abs(dist.get(v, math.inf) - ref[v]) < 1e-9 for v in range(60) if ref[v] < math.inf)
+    assert graph.dijkstra(source, targets=[5, 9]) == {t: dist[t] for t in (5, 9) if t in dist}
+    for target in (5, 17, 42):
+        cost, route = graph.astar(source, target)
+        assert (cost == ref[target] == math.inf) or abs(cost - ref[target]) < 1e-9
+        if route:
+            assert route[0] == source and route[-1] == target
+
+    # Reverse search: time from each source to one destination
+    times = graph.travel_times_to(source, [5, 17])
+    for s in (5, 17):
+        expected = graph.dijkstra(s).get(source)
+        assert times.get(s) == expected or abs(times[s] - expected) < 1e-9
+
+def test_contraction_hierarchy_matches_dijkstra(tmp_path):
+    path = tmp_path / "grid.txt"
+    generate_road_network(12, 12, path, one_way_share=0.2, seed=2)
+    graph = RoadGraph.load(path)
+    ch = ContractionHierarchy.build(graph)
+    ch.save(tmp_path / "grid.ch")
+    loaded = ContractionHierarchy.load(tmp_path / "grid.ch")
+    assert loaded.node_ids == ch.node_ids and loaded.arc_count == ch.arc_count
+
+    random.seed(8)
+    sources = random.sample(range(len(graph)), 6)
+    targets = random.sample(range(len(graph)), 5)
+    table = loaded.many_to_many(sources, targets)
+    for i, s in enumerate(sources):
+        dist = graph.dijkstra(s)
+        for j, t in enumerate(targets):
+            expected = dist.get(t, math.inf)
+            assert math.isclose(loaded.query(s, t), expected) or loaded.query(s, t) == expected
+            assert math.isclose(table[i][j], expected) or table[i][j] == expected
+    assert loaded.travel_times_to(targets[0], sources) == \
+        {s: row[0] for s, row in zip(sources, table) if row[0] < math.inf}
+
+def test_min_cost_assignment_matches_brute_force():
+    random.seed(17)
+    for _ in range(200):
+        rows, cols = random.randint(1, 5), random.randint(1, 5)
+        costs = [{c: random.randint(0, 20) for c in range(cols) if random.random() < 0.6} for _ in range(rows)]
+        result = min_cost_assignment(costs)
+
+        matched = [c for c in result if c is not None]
+        assert len(matched) == len(set(matched))
+        assert all(c is None or c in costs[r] for r, c in enumerate(result))
+
+        # Best possible: most customers served, then lowest total cost
+        best = None
+        for perm in itertools.permutations(range(-rows, cols), rows):
+            pick = [c if c >= 0 else None for c in perm]
+            if any(c is not None and c not in costs[r] for r, c in enumerate(pick)):
+                continue
+            key = (-sum(c is not None for c in pick), sum(costs[r][c] for r, c in enumerate(pick) if c is not None))
+            best = key if best is None else min(best, key)
+        assert (-len(matched), sum(costs[r][c] for r, c in enumerate(result) if c is not None)) == best
+
+def test_bloom_filter_batches_and_false_positive_rate():
+    bf = BloomFilter(expected_elements=5000, false_positive_rate=0.01)
+    bf.add_many(f"bad_{i}" for i in range(2500))
+    for i in range(2500, 5000):
+        bf.add(f"bad_{i}")
+    assert len(bf.bit_array) == (bf.m + 7) // 8  # one bit per slot, not one list item
+
+    # Batch and single-item paths probe exactly the same bits
+    assert bf.check_many(f"bad_{i}" for i in range(0, 5000, 7)) == [True] * len(range(0, 5000, 7))
+    probes = [f"good_{i}" for i in range(20000)]
+    batch = bf.check_many(probes)
+    assert batch == [bf.check(p) for p in probes]
+
+    measured = sum(batch) / len(probes)
+    stats = bf.get_stats()
+    assert stats["elements_added"] == 5000
+    assert abs(measured - stats["estimated_false_positive_rate"]) < 0.005
+    assert 0.3 < bf.fill_ratio() < 0.7
+
+def test_counting_bloom_filter_removal():
+    cbf = CountingBloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    for i in range(1000):
+        cbf.add(f"bad_{i}")
+    assert len(cbf.counters) == (cbf.m + 1) // 2  # two 4-bit counters per byte
+
+    for i in range(0, 1000, 2):
+        assert cbf.remove(f"bad_{i}") is True
+    assert cbf.remove("never_added_xyz") is False
+    # No false negatives for what is left, and removed items are (almost all) gone
+    assert all(cbf.check(f"bad_{i}") for i in range(1, 1000, 2))
+    assert sum(cbf.check(f"bad_{i}") for i in range(0, 1000, 2)) < 25
+    probes = [f"bad_{i}" for i in range(1000)]
+    assert cbf.check_many(probes) == [cbf.check(p) for p in probes]
+
+def test_scalable_bloom_filter_keeps_error_bound_while_growing():
+    sbf = ScalableBloomFilter(initial_capacity=100, false_positive_rate=0.01)
+    sbf.add_many(f"bad_{i}" for i in range(5000))
+    assert len(sbf.filters) > 3
+    assert all(sbf.check(f"bad_{i}") for i in range(5000))
+
+    probes = [f"good_{i}" for i in range(20000)]
+    hits = sbf.check_many(probes)
+    assert hits == [sbf.check(p) for p in probes]
+    assert sum(hits) / len(probes) < 0.015
+    assert sbf.get_stats()["estimated_false_positive_rate"] < 0.01
+    with pytest.raises(TypeError):
+        sbf.remove("bad_1")
+
+def test_scalable_bloom_filter_refuses_ambiguous_removal():
+    sbf = ScalableBloomFilter(initial_capacity=20, false_positive_rate=0.3, filter_class=CountingBloomFilter)
+    items = [f"bad_{i}" for i in range(300)]
+    sbf.add_many(items)
+    stored = [item for item in items if sbf.filters[0].check(item)]
+    # An item of the first sub-filter that a later one also matches by accident
+    ambiguous = next(item for item in stored if any(f.check(item) for f in sbf.filters[1:]))
+
+    count = sbf.count
+    assert sbf.remove(ambiguous) is False
+    assert sbf.count == count and all(sbf.check(item) for item in items)
+
+def test_scalable_counting_filter_counts_false_positive_adds():
+    sbf = ScalableBloomFilter(initial_capacity=1000, false_positive_rate=0.01, filter_class=CountingBloomFilter)
+    bots = [f"bot_{i}" for i in range(900)]
+    sbf.add_many(bots)
+    # An innocent ID that already matches by accident, then gets banned for real
+    innocent = next(f"x_{i}" for i in itertools.count() if sbf.check(f"x_{i}"))
+    count = sbf.count
+    sbf.add(innocent)
+    assert sbf.count == count + 1
+
+    assert sbf.remove(innocent) is True
+    assert all(sbf.check(bot) for bot in bots)
+
+def test_bloom_filter_file_roundtrip_and_atomic_republish(tmp_path):
+    path = str(tmp_path / "blacklist.bloom")
+    bf = BloomFilter(expected_elements=2000, false_positive_rate=0.01)
+    bf.add_many(f"bad_{i}" for i in range(2000))
+    bf.save(path)
+
+    probes = [f"bad_{i}" for i in range(0, 2000, 7)] + [f"good_{i}" for i in range(2000)]
+    shared = BloomFilter.open(path, mmap=True)
+    assert (shared.m, shared.k, shared.count) == (bf.m, bf.k, bf.count)
+    assert [shared.check(p) for p in probes] == [bf.check(p) for p in probes]
+    assert shared.check_many(probes) == bf.check_many(probes)
+    with pytest.raises(ValueError):
+        shared.add("bad_x")
+
+    # Publishing a new version swaps the file atomically; the open mapping keeps the old one
+    assert not shared.is_stale()
+    newer = BloomFilter(expected_elements=2000, false_positive_rate=0.01)
+    newer.add("only_new")
+    newer.save(path)
+    assert shared.is_stale()
+    assert shared.check("bad_5") and not shared.check("only_new")
+    reopened = BloomFilter.open(path, mmap=False)
+    assert reopened.check("only_new") and not reopened.check("bad_5")
+    reopened.add("writable")  # an in-memory copy stays writable
+    shared.close()
+
+    cbf = CountingBloomFilter(expected_elements=100, false_positive_rate=0.01)
+    cbf.add("x")
+    cbf.save(path)
+    assert CountingBloomFilter.open(path, mmap=False).remove("x")
+    with pytest.raises(ValueError):
+        BloomFilter.open(path)  # 4-bit counters are not a bit array
+
+def test_radix_tree_ranked_completion():
+    tree = RadixTree(top_k=3)
+    weights = {"North Street": 50, "North Avenue": 80, "North Boulevard": 10,
+               "North": 5, "Northgate Mall": 60, "South Road": 90}
+    for word, weight in weights.items():
+        tree.insert(word, weight)
+
+    assert tree.complete("Nor", 3) == ["North Avenue", "Northgate Mall", "North Street"]
+    assert tree.complete("North ", 2) == ["North Avenue", "North Street"]
+    assert tree.complete("", 1) == ["South Road"]
+    assert tree.complete("East", 3) == []
+    # Deeper than the cache: falls back to a subtree walk
+    assert tree.complete("North", 10) == ["North Avenue", "Northgate Mall", "North Street",
+                                           "North Boulevard", "North"]
+
+    # Re-inserting updates the weight, in both directions
+    tree.insert("North Boulevard", 100)
+    assert tree.complete("North", 1) == ["North Boulevard"]
+    tree.insert("North Avenue", 1)
+    assert tree.complete("North", 3) == ["North Boulevard", "Northgate Mall", "North Street"]
+    assert tree.search("North Avenue") and not tree.search("Nort")
+
+def test_frozen_radix_tree_matches_and_roundtrips(tmp_path):
+    tree = RadixTree(top_k=3)
+    words = {"North Street": 50, "North Avenue": 80, "North": 5, "Northgate Mall": 60,
+             "Café Royal": 30, "Caféteria": 40, "Cab Rank": 20, "South Road": 90}
+    for word, weight in words.items():
+        tree.insert(word, weight)
+
+    path = str(tmp_path / "registry.rx")
+    tree.freeze().save(path)
+    probes = list(words) + ["", "N", "Nor", "North ", "Caf", "Café", "Cafe", "Nowhere", "Northgate Mall X"]
+    for frozen in (tree.freeze(), FrozenRadixTree.open(path, mmap=True), FrozenRadixTree.open(path, mmap=False)):
+        assert len(frozen) == len(words)
+        for probe in probes:
+            assert frozen.search(probe) == tree.search(probe)
+            assert frozen.complete(probe, 2) == tree.complete(probe, 2)
+            assert frozen.complete(probe, 10) == tree.complete(probe, 10)
+        frozen.close()
+
+    # Republishing replaces the file; a reader that mapped the old one keeps it intact
+    shared = FrozenRadixTree.open(path, mmap=True)
+    tree.insert("West End", 70)
+    tree.freeze().save(path)
+    assert shared.search("North Street") and not shared.search("West End") and len(shared) == len(words)
+    assert FrozenRadixTree.open(path, mmap=False).search("West End")
+    shared.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["registry.rx"]
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        FrozenRadixTree.open(path)
+
+def test_radix_tree_fuzzy_search_matches_brute_force():
+    def edit_distance(a, b):
+        prev = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            cur = [i]
+            for j, cb in enumerate(b, 1):
+                cur.append(min(cur[j - 1] + 1, prev[j] + 1, prev[j - 1] + (ca != cb)))
+            prev = cur
+        return prev[-1]
+
+    rng = random.Random(11)
+    tree = RadixTree()
+    words = {}
+    for _ in range(400):
+        word = "".join(rng.choice("abcd ") for _ in range(rng.randint(1, 7)))
+        words[word] = rng.randint(1, 9)
+        tree.insert(word, words[word])
+
+    for query in ["abc", "dd a", "b", "cabbage", "a b c"]:
+        for max_edits in (0, 1, 2):
+            expected = sorted((edit_distance(query, w), -weight, w) for w, weight in words.items()
+                              if edit_distance(query, w) <= max_edits)
+            assert tree.fuzzy_search(query, max_edits) == [(d, w) for d, _, w in expected]
+
+def test_metrics_histogram_buckets_and_quantiles():
+    h = Histogram((1, 2, 5))
+    h.observe_many([0.5, 1, 2, 3, 3, 10])
+    assert h.cumulative() == [(1.0, 2), (2.0, 3), (5.0, 5), (float("inf"), 6)]
+    assert (h.count, h.sum) == (6, 19.5)
+    assert h.quantile(0.5) == 2.0 and h.quantile(0.99) == float("inf")
+    assert Histogram((1,)).quantile(0.5) is None
+
+def test_frozen_radix_tree_thaws_into_an_equal_tree():
+    tree = RadixTree(top_k=2)
+    for word, weight in {"North Street": 50, "North Avenue": 80, "North": 5, "Café Royal": 30}.items():
+        tree.insert(word, weight)
+    thawed = tree.freeze().thaw()
+    assert (len(thawed), thawed.node_count) == (len(tree), tree.node_count)
+    for probe in ["", "N", "North", "North ", "Caf", "Nowhere"]:
+        assert thawed.search(probe) == tree.search(probe)
+        assert thawed.complete(probe, 2) == tree.complete(probe, 2)
+    thawed.insert("North Pole", 100)
+    assert thawed.complete("North", 2) == ["North Pole", "North Avenue"]
+
+def test_packed_r_tree_thaws_into_the_same_tree():
+    rng = random.Random(11)
+    tree = RTree(max_entries=6)
+    for i in range(800):
+        tree.insert((rng.uniform(0, 100), rng.uniform(0, 100)), f"D{i}")
+    tree.delete("D3")
+
+    f = io.BytesIO()
+    PackedRTree.from_tree(tree)._write(f)
+    thawed = PackedRTree._from_buffer(memoryview(f.getvalue()), "test").thaw()
+    assert (len(thawed), thawed.height()) == (len(tree), tree.height())
+    for _ in range(100):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        assert thawed.nearest(x, y, 4) == tree.nearest(x, y, 4)
+    thawed.update("D5", (1, 1))
+    assert thawed.delete("D6") and "D6" not in thawed and thawed.get("D5") == (1, 1)
+
+    mixed = RTree()
+    mixed.insert((1, 1), 42)
+    mixed.insert((2, 2), "42")
+    f = io.BytesIO()
+    PackedRTree.from_tree(mixed)._write(f)
+    thawed = PackedRTree._from_buffer(memoryview(f.getvalue()), "test").thaw()
+    assert thawed.get(42) == (1, 1) and thawed.get("42") == (2, 2)
+    mixed.insert((3, 3), ("D", 1))
+    with pytest.raises(TypeError):
+        PackedRTree.from_tree(mixed)
+
+def test_r_tree_clusters_count_every_point_in_view():
+    rng = random.Random(17)
+    tree = RTree(max_entries=5)
+    tree.bulk_load(((rng.uniform(0, 100), rng.uniform(0, 100)), f"D{i}") for i in range(3000))
+    views = [(0, 0, 100, 100), (10, 20, 60, 45), (70.5, 70.5, 71, 71)]
+
+    def check():
+        points = [p for p, _ in tree._all_entries()]
+        for view in views:
+            clusters = tree.clusters(*view, cell_size=5)
+            inside = [p for p in points if view[0] <= p[0] <= view[2] and view[1] <= p[1] <= view[3]]
+            assert sum(n for _, _, n in clusters) == len(inside) == len(tree.search_box(*view))
+            for x, y, n in clusters:
+                assert view[0] <= x <= view[2] and view[1] <= y <= view[3] and n > 0
+
+    check()
+    # Cached subtree counts must follow inserts, deletes and moves
+    for i in range(500):
+        tree.update(f"D{rng.randrange(3000)}", (rng.uniform(0, 100), rng.uniform(0, 100)))
+        tree.delete(f"D{rng.randrange(3000)}")
+        tree.insert((rng.uniform(0, 100), rng.uniform(0, 100)), f"N{i}")
+    check()
+    assert sum(n for _, _, n in tree.clusters(0, 0, 100, 100, 100)) == len(tree)